@@ -1,8 +1,10 @@
 """
-Simple backtesting module (minimal for demo).
+Backtesting module
+Single-series metrics, a streaming metrics accumulator for very long
+series and a vectorized multi-asset, multi-strategy engine.
 """
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
 import numpy as np
 
 
@@ -13,38 +15,278 @@ class BacktestResult:
     volatility: float
     sharpe_ratio: float
     max_drawdown: float
+    sortino_ratio: float = 0.0
+    calmar_ratio: float = 0.0
 
 
-def run_backtest(returns: List[float], risk_free_rate: float = 0.02) -> BacktestResult:
+@dataclass
+class PortfolioBacktest:
+    """Strategies x periods paths of a weights-schedule backtest"""
+    strategies: List[str]
+    nav: np.ndarray  # (S, T) net asset value at the end of each period, starting from 1
+    returns: np.ndarray  # (S, T) period returns after costs
+    turnover: np.ndarray  # (S, T) sum |traded weight| at the start of each period
+    costs: np.ndarray  # (S, T) transaction costs as a fraction of NAV
+    metrics: Dict[str, np.ndarray]  # compute_metrics_batch of returns
+
+    def results(self) -> List[BacktestResult]:
+        """One BacktestResult per strategy (fields match the backtest_results columns)"""
+        return [
+            BacktestResult(**{name: float(values[s]) for name, values in self.metrics.items()})
+            for s in range(len(self.strategies))
+        ]
+
+
+def compute_metrics_batch(
+    returns: np.ndarray,
+    risk_free_rate: float = 0.02,
+    periods_per_year: int = 252
+) -> Dict[str, np.ndarray]:
     """
-    Simple backtest calculation from returns series.
+    Performance metrics for each row of a (strategies x periods) returns
+    matrix, as in run_backtest; Sortino uses the annualized downside
+    deviation below the per-period risk-free rate and Calmar divides the
+    annual return by the magnitude of the maximum drawdown
     """
-    returns_arr = np.array(returns)
-    
-    # Total return
-    total_return = np.prod(1 + returns_arr) - 1
-    
-    # Annualized return (assuming daily returns)
-    n_periods = len(returns_arr)
-    annual_return = (1 + total_return) ** (252 / n_periods) - 1
-    
-    # Volatility
-    volatility = np.std(returns_arr) * np.sqrt(252)
-    
-    # Sharpe ratio
+    returns = np.atleast_2d(np.asarray(returns, dtype=float))
+    n_periods = returns.shape[1]
+
+    cumulative = np.cumprod(1 + returns, axis=1)
+    total_return = cumulative[:, -1] - 1
+    annual_return = (1 + total_return) ** (periods_per_year / n_periods) - 1
+    volatility = np.std(returns, axis=1) * np.sqrt(periods_per_year)
+
     excess_return = annual_return - risk_free_rate
-    sharpe_ratio = excess_return / volatility if volatility > 0 else 0
-    
-    # Max drawdown
-    cumulative = np.cumprod(1 + returns_arr)
-    running_max = np.maximum.accumulate(cumulative)
-    drawdown = (cumulative - running_max) / running_max
-    max_drawdown = np.min(drawdown)
-    
-    return BacktestResult(
-        total_return=float(total_return),
-        annual_return=float(annual_return),
-        volatility=float(volatility),
-        sharpe_ratio=float(sharpe_ratio),
-        max_drawdown=float(max_drawdown)
+    shortfall = np.minimum(returns - risk_free_rate / periods_per_year, 0.0)
+    downside = np.sqrt(np.mean(shortfall ** 2, axis=1) * periods_per_year)
+
+    running_max = np.maximum.accumulate(cumulative, axis=1)
+    max_drawdown = np.min((cumulative - running_max) / running_max, axis=1)
+
+    def ratio(numerator, denominator):
+        return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+    return {
+        'total_return': total_return,
+        'annual_return': annual_return,
+        'volatility': volatility,
+        'sharpe_ratio': ratio(excess_return, volatility),
+        'max_drawdown': max_drawdown,
+        'sortino_ratio': ratio(excess_return, downside),
+        'calmar_ratio': ratio(annual_return, -max_drawdown)
+    }
+
+
+def run_backtest(returns: Union[List[float], np.ndarray], risk_free_rate: float = 0.02) -> BacktestResult:
+    """
+    Simple backtest calculation from returns series.
+    """
+    metrics = compute_metrics_batch(np.asarray(returns)[None, :], risk_free_rate)
+    return BacktestResult(**{name: float(values[0]) for name, values in metrics.items()})
+
+
+class StreamingMetrics:
+    """
+    Online version of run_backtest for series too long to hold in memory
+
+    Returns are consumed in chunks: variance by Welford updates merged per
+    chunk (Chan et al.), compounded wealth, running peak and maximum
+    drawdown, and the downside sum of squares for Sortino. State is O(1)
+    and a chunk is processed with NumPy in O(chunk) memory; result()
+    equals run_backtest on the concatenated series up to rounding.
+    """
+
+    def __init__(self, risk_free_rate: float = 0.02, periods_per_year: int = 252):
+        self.risk_free_rate = risk_free_rate
+        self.periods_per_year = periods_per_year
+        self.n_periods = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._downside_sq = 0.0
+        self.wealth = 1.0
+        self.peak: Optional[float] = None  # running max of wealth, seeded by the first update as in run_backtest
+        self.max_drawdown = 0.0
+
+    def update(self, returns: Union[float, Sequence[float], np.ndarray]) -> None:
+        """Add one return or a chunk of returns"""
+        chunk = np.atleast_1d(np.asarray(returns, dtype=float))
+        if chunk.size == 0:
+            return
+        n = chunk.size
+        chunk_mean = chunk.mean()
+        delta = chunk_mean - self.mean
+        total = self.n_periods + n
+        self._m2 += np.sum((chunk - chunk_mean) ** 2) + delta ** 2 * self.n_periods * n / total
+        self.mean += delta * n / total
+        self.n_periods = total
+
+        shortfall = np.minimum(chunk - self.risk_free_rate / self.periods_per_year, 0.0)
+        self._downside_sq += np.sum(shortfall ** 2)
+
+        cumulative = self.wealth * np.cumprod(1 + chunk)
+        running_max = np.maximum.accumulate(cumulative)
+        if self.peak is not None:
+            running_max = np.maximum(running_max, self.peak)
+        self.max_drawdown = min(self.max_drawdown, np.min((cumulative - running_max) / running_max))
+        self.wealth = cumulative[-1]
+        self.peak = running_max[-1]
+
+    def consume(
+        self,
+        returns: Iterable,
+        chunk_size: int = 65536,
+        on_snapshot: Optional[Callable[[Dict], None]] = None,
+        snapshot_every: Optional[int] = None
+    ) -> BacktestResult:
+        """
+        Feed an iterator of returns (floats or arrays) through update in
+        chunks of about chunk_size; on_snapshot receives snapshot() each
+        time another snapshot_every periods have been consumed
+        """
+        pending: List[float] = []
+        next_snapshot = self.n_periods + (snapshot_every or 0)
+
+        def feed(chunk):
+            nonlocal next_snapshot
+            self.update(chunk)
+            if on_snapshot is not None and snapshot_every and self.n_periods >= next_snapshot:
+                on_snapshot(self.snapshot())
+                next_snapshot = self.n_periods + snapshot_every
+
+        for item in returns:
+            if np.ndim(item):
+                # Arrays are already chunks
+                if pending:
+                    feed(pending)
+                    pending = []
+                feed(item)
+            else:
+                pending.append(item)
+                if len(pending) >= chunk_size:
+                    feed(pending)
+                    pending = []
+        if pending:
+            feed(pending)
+        return self.result()
+
+    def result(self) -> BacktestResult:
+        if self.n_periods == 0:
+            raise ValueError("No returns consumed")
+        total_return = self.wealth - 1
+        annual_return = (1 + total_return) ** (self.periods_per_year / self.n_periods) - 1
+        volatility = np.sqrt(self._m2 / self.n_periods * self.periods_per_year)
+        downside = np.sqrt(self._downside_sq / self.n_periods * self.periods_per_year)
+        excess_return = annual_return - self.risk_free_rate
+        return BacktestResult(
+            total_return=float(total_return),
+            annual_return=float(annual_return),
+            volatility=float(volatility),
+            sharpe_ratio=float(excess_return / volatility) if volatility > 0 else 0.0,
+            max_drawdown=float(self.max_drawdown),
+            sortino_ratio=float(excess_return / downside) if downside > 0 else 0.0,
+            calmar_ratio=float(annual_return / -self.max_drawdown) if self.max_drawdown < 0 else 0.0
+        )
+
+    def snapshot(self) -> Dict:
+        """Metrics of the returns consumed so far, with the period count"""
+        return {'n_periods': self.n_periods, **vars(self.result())}
+
+
+def returns_from_prices(prices: np.ndarray) -> np.ndarray:
+    """(T + 1) x N prices to T x N simple returns"""
+    prices = np.asarray(prices, dtype=float)
+    return prices[1:] / prices[:-1] - 1
+
+
+def weight_schedule(
+    weights: Union[np.ndarray, Callable[[np.ndarray], np.ndarray]],
+    returns: np.ndarray,
+    rebalance_every: int = 21,
+    start: int = 0
+) -> np.ndarray:
+    """
+    T x N schedule of target weights for backtest_portfolios: rows at
+    start, start + rebalance_every, ... hold the targets, other rows are
+    NaN (hold the drifted position)
+
+    weights is a fixed (N,) vector, or an optimizer called at each
+    rebalance date with the returns observed so far (returns[:t]).
+    """
+    returns = np.asarray(returns, dtype=float)
+    schedule = np.full(returns.shape, np.nan)
+    for t in range(start, len(returns), rebalance_every):
+        schedule[t] = weights(returns[:t]) if callable(weights) else weights
+    return schedule
+
+
+def backtest_portfolios(
+    returns: np.ndarray,
+    schedules: np.ndarray,
+    transaction_cost: Union[float, np.ndarray] = 0.001,
+    names: Optional[Sequence[str]] = None,
+    risk_free_rate: float = 0.02,
+    periods_per_year: int = 252
+) -> PortfolioBacktest:
+    """
+    Simulate weights schedules over a T x N asset returns matrix
+
+    schedules is T x N (one strategy) or S x T x N. Row t holds the
+    target weights traded at the start of period t, before returns[t];
+    NaN rows keep the drifted holdings. Weights summing to less than one
+    leave the rest in cash at zero return, and the book starts in cash.
+    Trading to a target costs transaction_cost (scalar or per asset) per
+    unit of weight traded, paid out of NAV.
+
+    Between trades holdings are fixed, so value is a dot product of the
+    holdings with cumulative asset growth. The only Python loop is over
+    the dates on which some strategy trades; each holding period is one
+    (S x N) @ (N x periods) product for all strategies at once.
+    """
+    returns = np.asarray(returns, dtype=float)
+    schedules = np.asarray(schedules, dtype=float)
+    if schedules.ndim == 2:
+        schedules = schedules[None]
+    n_strategies, n_periods, n_assets = schedules.shape
+    if returns.shape != (n_periods, n_assets):
+        raise ValueError("Schedules and returns must cover the same periods and assets")
+    cost_rate = np.broadcast_to(np.asarray(transaction_cost, dtype=float), (n_assets,))
+
+    trades = ~np.isnan(schedules[:, :, 0])  # S x T; hold rows are all NaN
+    dates = np.flatnonzero(trades.any(axis=0))
+    if dates.size == 0 or dates[0] != 0:
+        dates = np.insert(dates, 0, 0)
+    bounds = np.append(dates, n_periods)
+
+    # Growth of one unit of each asset from the start of the backtest
+    growth = np.vstack([np.ones(n_assets), np.cumprod(1 + returns, axis=0)])
+    nav = np.empty((n_strategies, n_periods))
+    turnover = np.zeros((n_strategies, n_periods))
+    costs = np.zeros((n_strategies, n_periods))
+
+    weights = np.zeros((n_strategies, n_assets))  # start in cash
+    value = np.ones(n_strategies)
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        trading = trades[:, begin]
+        target = np.where(trading[:, None], np.nan_to_num(schedules[:, begin]), weights)
+        traded = np.abs(target - weights)
+        turnover[:, begin] = traded.sum(axis=1)
+        costs[:, begin] = traded @ cost_rate
+        value = value * (1 - costs[:, begin])
+
+        # Asset growth over the holding period relative to its start
+        relative = growth[begin + 1:end + 1] / growth[begin]
+        path = target @ relative.T + (1 - target.sum(axis=1))[:, None]
+        nav[:, begin:end] = value[:, None] * path
+        weights = target * relative[-1] / path[:, -1:]
+        value = nav[:, end - 1]
+
+    previous = np.hstack([np.ones((n_strategies, 1)), nav[:, :-1]])
+    period_returns = nav / previous - 1
+    return PortfolioBacktest(
+        strategies=list(names) if names is not None else [f'strategy_{s}' for s in range(n_strategies)],
+        nav=nav,
+        returns=period_returns,
+        turnover=turnover,
+        costs=costs,
+        metrics=compute_metrics_batch(period_returns, risk_free_rate, periods_per_year)
     )
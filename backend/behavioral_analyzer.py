@@ -2,11 +2,13 @@
 Behavioral Finance Analysis Engine
 Detects and measures investor biases from trading patterns
 """
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
+from lot_matching import ClosedLots, match_lots
+
 
 class BehavioralEvent:
     """Represents a detected behavioral event"""
@@ -37,11 +39,12 @@ class BehavioralAnalyzer:
     Detects investor biases from trading patterns
     """
 
-    def __init__(self):
+    def __init__(self, lot_method: str = 'fifo'):
         self.min_trades = 10  # Minimum trades to make assessment
         self.confidence_threshold = 0.6
+        self.lot_method = lot_method  # how sells close buys: 'fifo', 'lifo' or 'average' (lot_matching)
 
-    def analyze_user_trades(self, trades: List[Dict]) -> Tuple[BiasScore, List[BehavioralEvent]]:
+    def analyze_user_trades(self, trades: Union[List[Dict], pd.DataFrame]) -> Tuple[BiasScore, List[BehavioralEvent]]:
         """
         Main analysis function
         Returns bias scores and detected behavioral events
@@ -49,22 +52,25 @@ class BehavioralAnalyzer:
         if len(trades) < self.min_trades:
             return BiasScore(), []
 
-        # Convert to DataFrame for easier analysis
-        df_trades = pd.DataFrame(trades)
+        # Convert to DataFrame for easier analysis (a shallow copy keeps the caller's frame intact)
+        df_trades = trades.copy(deep=False) if isinstance(trades, pd.DataFrame) else pd.DataFrame(trades)
         df_trades['trade_date'] = pd.to_datetime(df_trades['trade_date'])
-        df_trades = df_trades.sort_values('trade_date')
+        df_trades = df_trades.sort_values('trade_date', kind='stable')
+
+        # Closed lots shared by the detectors that need buy/sell pairings
+        lots = match_lots(df_trades, self.lot_method)
 
         # Calculate various behavioral metrics
         bias_score = BiasScore()
         events = []
 
         # 1. Disposition Effect (selling winners too early, holding losers too long)
-        disposition_effect, disposition_events = self._detect_disposition_effect(df_trades)
+        disposition_effect, disposition_events = self._detect_disposition_effect(df_trades, lots)
         bias_score.disposition_effect = disposition_effect
         events.extend(disposition_events)
 
         # 2. Loss Aversion (reluctance to sell losers)
-        loss_aversion, loss_events = self._detect_loss_aversion(df_trades)
+        loss_aversion, loss_events = self._detect_loss_aversion(df_trades, lots)
         bias_score.loss_aversion = loss_aversion
         events.extend(loss_events)
 
@@ -89,12 +95,12 @@ class BehavioralAnalyzer:
         events.extend(confirmation_events)
 
         # 7. Anchoring Bias (holding prices/expectations)
-        anchoring, anchoring_events = self._detect_anchoring_bias(df_trades)
+        anchoring, anchoring_events = self._detect_anchoring_bias(df_trades, lots)
         bias_score.anchoring_bias = anchoring
         events.extend(anchoring_events)
 
         # 8. Regret Aversion (avoiding past mistakes)
-        regret, regret_events = self._detect_regret_aversion(df_trades)
+        regret, regret_events = self._detect_regret_aversion(df_trades, lots)
         bias_score.regret_aversion = regret
         events.extend(regret_events)
 
@@ -106,41 +112,24 @@ class BehavioralAnalyzer:
 
         return bias_score, events
 
-    def _detect_disposition_effect(self, trades: pd.DataFrame) -> Tuple[float, List[BehavioralEvent]]:
+    def _detect_disposition_effect(
+        self, trades: pd.DataFrame, lots: Optional[ClosedLots] = None
+    ) -> Tuple[float, List[BehavioralEvent]]:
         """
         Disposition Effect: Tendency to sell winners too early and hold losers too long
         Metric: Ratio of realized gains to realized losses
         """
         events = []
 
-        # Calculate returns on closed positions
-        sells = trades[trades['action'] == 'SELL']
-        buys = trades[trades['action'] == 'BUY']
+        # Returns on closed lots, weighted by the quantity closed
+        lots = lots if lots is not None else match_lots(trades, self.lot_method)
 
-        if len(sells) == 0:
+        if len(lots) == 0:
             return 0.0, events
 
-        realized_gains = 0
-        realized_losses = 0
-        sold_positions = 0
-
-        for _, sell in sells.iterrows():
-            # Find corresponding buy
-            prior_buys = buys[
-                (buys['symbol'] == sell['symbol']) &
-                (buys['trade_date'] < sell['trade_date'])
-            ]
-
-            if len(prior_buys) > 0:
-                avg_cost = prior_buys['price'].mean()
-                return_pct = (sell['price'] - avg_cost) / avg_cost
-
-                if return_pct > 0:
-                    realized_gains += sell['quantity'] * return_pct
-                else:
-                    realized_losses += abs(sell['quantity'] * return_pct)
-
-                sold_positions += 1
+        weighted = lots.quantity * lots.return_pct
+        realized_gains = float(weighted[weighted > 0].sum())
+        realized_losses = float(-weighted[weighted < 0].sum())
 
         # Calculate disposition effect score
         if realized_gains + realized_losses > 0:
@@ -163,38 +152,23 @@ class BehavioralAnalyzer:
 
         return 0.0, events
 
-    def _detect_loss_aversion(self, trades: pd.DataFrame) -> Tuple[float, List[BehavioralEvent]]:
+    def _detect_loss_aversion(
+        self, trades: pd.DataFrame, lots: Optional[ClosedLots] = None
+    ) -> Tuple[float, List[BehavioralEvent]]:
         """
         Loss Aversion: Reluctance to realize losses
         Metric: Average holding period for losses vs gains
         """
         events = []
 
-        # Group by symbol and calculate holding periods
-        buys = trades[trades['action'] == 'BUY']
-        sells = trades[trades['action'] == 'SELL']
-
-        loss_holding_periods = []
-        gain_holding_periods = []
-
-        for _, buy in buys.iterrows():
-            # Find corresponding sell
-            future_sells = sells[
-                (sells['symbol'] == buy['symbol']) &
-                (sells['trade_date'] > buy['trade_date'])
-            ]
-
-            if len(future_sells) > 0:
-                sell = future_sells.iloc[0]
-                holding_period = (sell['trade_date'] - buy['trade_date']).days
-
-                if sell['price'] < buy['price']:
-                    loss_holding_periods.append(holding_period)
-                else:
-                    gain_holding_periods.append(holding_period)
+        # Holding periods of closed lots, split by outcome
+        lots = lots if lots is not None else match_lots(trades, self.lot_method)
+        is_loss = lots.close_price < lots.open_price
+        loss_holding_periods = lots.holding_days[is_loss]
+        gain_holding_periods = lots.holding_days[~is_loss]
 
         # Calculate loss aversion score
-        if loss_holding_periods and gain_holding_periods:
+        if len(loss_holding_periods) and len(gain_holding_periods):
             avg_loss_holding = np.mean(loss_holding_periods)
             avg_gain_holding = np.mean(gain_holding_periods)
 
@@ -358,27 +332,19 @@ class BehavioralAnalyzer:
 
         return 0.0, events
 
-    def _detect_anchoring_bias(self, trades: pd.DataFrame) -> Tuple[float, List[BehavioralEvent]]:
+    def _detect_anchoring_bias(
+        self, trades: pd.DataFrame, lots: Optional[ClosedLots] = None
+    ) -> Tuple[float, List[BehavioralEvent]]:
         """
         Anchoring Bias: Sticking to initial price targets/expectations
-        Metric: Distance from initial entry price for same symbols
+        Metric: Distance of exit prices from the entry price of each closed lot
         """
         events = []
 
-        symbols = trades['symbol'].unique()
-
-        price_deviations = []
-        for symbol in symbols:
-            symbol_trades = trades[trades['symbol'] == symbol].sort_values('trade_date')
+        lots = lots if lots is not None else match_lots(trades, self.lot_method)
+        price_deviations = np.abs(lots.return_pct)
 
-            if len(symbol_trades) > 1:
-                first_price = symbol_trades.iloc[0]['price']
-
-                for _, trade in symbol_trades.iloc[1:].iterrows():
-                    deviation = abs(trade['price'] - first_price) / first_price
-                    price_deviations.append(deviation)
-
-        if price_deviations:
+        if len(price_deviations):
             avg_deviation = np.mean(price_deviations)
             # If trading within small range of initial price, indicates anchoring
             score = min(1.0, 1.0 - avg_deviation)  # Inverted: less deviation = more anchoring
@@ -389,7 +355,7 @@ class BehavioralAnalyzer:
                     severity=score,
                     context={
                         'avg_price_deviation': avg_deviation,
-                        'symbols_analyzed': len(symbols)
+                        'symbols_analyzed': len(np.unique(lots.symbol))
                     }
                 ))
 
@@ -397,41 +363,32 @@ class BehavioralAnalyzer:
 
         return 0.0, events
 
-    def _detect_regret_aversion(self, trades: pd.DataFrame) -> Tuple[float, List[BehavioralEvent]]:
+    def _detect_regret_aversion(
+        self, trades: pd.DataFrame, lots: Optional[ClosedLots] = None
+    ) -> Tuple[float, List[BehavioralEvent]]:
         """
         Regret Aversion: Avoiding/repeating past mistakes
         Metric: Behavioral change after significant losses
         """
         events = []
 
-        # Find significant losses
-        trades_with_returns = trades.copy()
-        sells = trades[trades['action'] == 'SELL']
+        lots = lots if lots is not None else match_lots(trades, self.lot_method)
 
-        if len(sells) < 5:
+        if lots.n_sells < 5:
             return 0.0, events
 
-        # Calculate returns on closed positions
-        significant_losses = []
-        for _, sell in sells.iterrows():
-            buys = trades[
-                (trades['action'] == 'BUY') &
-                (trades['symbol'] == sell['symbol']) &
-                (trades['trade_date'] < sell['trade_date'])
-            ]
-
-            if len(buys) > 0:
-                avg_cost = buys['price'].mean()
-                loss_pct = (sell['price'] - avg_cost) / avg_cost
-
-                if loss_pct < -0.1:  # 10%+ loss
-                    significant_losses.append((sell['trade_date'], loss_pct))
+        # Return of each sell over the cost of the lots it closed
+        sells, position = np.unique(lots.sell_index, return_inverse=True)
+        cost = np.bincount(position, weights=lots.open_price * lots.quantity, minlength=len(sells))
+        pnl = np.bincount(position, weights=lots.pnl, minlength=len(sells))
+        loss_pct = pnl / cost
+        significant_losses = loss_pct[loss_pct < -0.1]  # 10%+ loss
 
         if len(significant_losses) == 0:
             return 0.0, events
 
         # Check if behavior changed after losses
-        score = min(1.0, len(significant_losses) / len(sells))
+        score = min(1.0, len(significant_losses) / lots.n_sells)
 
         if score > 0.2:
             events.append(BehavioralEvent(
@@ -439,8 +396,8 @@ class BehavioralAnalyzer:
                 severity=score,
                 context={
                     'significant_losses': len(significant_losses),
-                    'avg_loss_magnitude': np.mean([loss for _, loss in significant_losses]),
-                    'total_sells': len(sells)
+                    'avg_loss_magnitude': np.mean(significant_losses),
+                    'total_sells': lots.n_sells
                 }
             ))
 
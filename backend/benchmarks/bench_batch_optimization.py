@@ -0,0 +1,59 @@
+"""
+Benchmark: optimize_portfolio_batch vs one optimize_portfolio call per profile
+
+Usage (from backend/):
+    python benchmarks/bench_batch_optimization.py --assets 200 --profiles 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from portfolio_optimizer import BehavioralPortfolioOptimizer, optimize_portfolio_batch  # noqa: E402
+from bench_behavioral_mvo import make_problem  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, default=200)
+    parser.add_argument('--profiles', type=int, default=1000)
+    parser.add_argument('--sequential-sample', type=int, default=50,
+                        help='Profiles solved one by one to estimate per-profile cost')
+    args = parser.parse_args()
+
+    expected_returns, cov = make_problem(args.assets)
+    rng = np.random.default_rng(0)
+    profiles = [
+        {
+            'loss_aversion_coefficient': rng.uniform(1.0, 4.0),
+            'overconfidence_score': rng.uniform(),
+            'risk_tolerance': rng.uniform()
+        }
+        for _ in range(args.profiles)
+    ]
+    constraints = {'min_weight': 0.0, 'max_weight': 0.2, 'min_positions': 5}
+
+    start = time.perf_counter()
+    optimize_portfolio_batch(profiles, expected_returns, cov, constraints)
+    batch_time = time.perf_counter() - start
+
+    sample = profiles[:args.sequential_sample]
+    for solver in ('slsqp', 'qp'):
+        start = time.perf_counter()
+        for profile in sample:
+            BehavioralPortfolioOptimizer(profile).optimize_portfolio(
+                expected_returns, cov, constraints, solver=solver
+            )
+        per_profile = (time.perf_counter() - start) / len(sample)
+        print(f"sequential {solver:>5}: {per_profile * 1e3:8.2f} ms/profile")
+
+    print(f"batch            : {batch_time / len(profiles) * 1e3:8.2f} ms/profile "
+          f"({len(profiles)} profiles, {args.assets} assets, {batch_time:.2f}s total)")
+
+
+if __name__ == '__main__':
+    main()
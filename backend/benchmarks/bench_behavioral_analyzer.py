@@ -0,0 +1,91 @@
+"""
+Benchmark: per-trade iterrows scans vs the lot-based bias detectors
+(disposition, loss aversion, anchoring, regret aversion) and the full
+analyze_user_trades, with lot matching by each method
+
+Usage (from backend/):
+    python benchmarks/bench_behavioral_analyzer.py --sizes 1000 10000 100000 --reference-max 10000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from behavioral_analyzer import BehavioralAnalyzer  # noqa: E402
+from lot_matching import LOT_METHODS, match_lots  # noqa: E402
+
+
+def trade_history(n_trades, n_symbols=50, seed=0):
+    rng = np.random.default_rng(seed)
+    minutes = np.sort(rng.integers(0, n_trades * 60, n_trades))
+    return pd.DataFrame({
+        'symbol': rng.choice([f'SYM{i}' for i in range(n_symbols)], n_trades),
+        'action': rng.choice(['BUY', 'SELL'], n_trades),
+        'quantity': rng.integers(1, 100, n_trades).astype(float),
+        'price': 100 * np.exp(rng.normal(0, 0.2, n_trades)),
+        'trade_date': pd.Timestamp('2020-01-01') + pd.to_timedelta(minutes, unit='min')
+    })
+
+
+def reference_scans(trades):
+    """The iterrows loops of the previous detectors, without their scoring"""
+    buys, sells = trades[trades['action'] == 'BUY'], trades[trades['action'] == 'SELL']
+    for _, sell in sells.iterrows():  # disposition effect
+        buys[(buys['symbol'] == sell['symbol']) & (buys['trade_date'] < sell['trade_date'])]['price'].mean()
+    for _, buy in buys.iterrows():  # loss aversion
+        sells[(sells['symbol'] == buy['symbol']) & (sells['trade_date'] > buy['trade_date'])]
+    for _, sell in sells.iterrows():  # regret aversion
+        trades[(trades['action'] == 'BUY') & (trades['symbol'] == sell['symbol']) &
+               (trades['trade_date'] < sell['trade_date'])]['price'].mean()
+    for symbol in trades['symbol'].unique():  # anchoring
+        for _ in trades[trades['symbol'] == symbol].sort_values('trade_date').iloc[1:].iterrows():
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--reference-max', type=int, default=10000,
+                        help='largest history to run the quadratic scans on')
+    args = parser.parse_args()
+    analyzer = BehavioralAnalyzer()
+
+    for n_trades in args.sizes:
+        trades = trade_history(n_trades)
+
+        matching = {}
+        for method in LOT_METHODS:
+            start = time.perf_counter()
+            lots = match_lots(trades, method)
+            matching[method] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        lots = match_lots(trades)
+        analyzer._detect_disposition_effect(trades, lots)
+        analyzer._detect_loss_aversion(trades, lots)
+        analyzer._detect_anchoring_bias(trades, lots)
+        analyzer._detect_regret_aversion(trades, lots)
+        detectors = time.perf_counter() - start
+
+        start = time.perf_counter()
+        analyzer.analyze_user_trades(trades)
+        full = time.perf_counter() - start
+
+        if n_trades <= args.reference_max:
+            start = time.perf_counter()
+            reference_scans(trades)
+            reference = f"{time.perf_counter() - start:8.2f}s"
+        else:
+            reference = '  skipped'
+        print(f"{n_trades:7d} trades: iterrows scans {reference}, lots + detectors {detectors:6.3f}s, "
+              f"analyze_user_trades {full:6.3f}s")
+        print("               match_lots " + ", ".join(f"{m} {t:6.3f}s" for m, t in matching.items()))
+
+
+if __name__ == '__main__':
+    main()
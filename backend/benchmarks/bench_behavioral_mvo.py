@@ -0,0 +1,63 @@
+"""
+Benchmark: behavioral_mvo wall time, SLSQP (finite differences) vs the QP engine
+
+Usage (from backend/):
+    python benchmarks/bench_behavioral_mvo.py --sizes 50 500 2000 --slsqp-max 500
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from portfolio_optimizer import BehavioralPortfolioOptimizer  # noqa: E402
+
+
+def make_problem(n_assets: int, seed: int = 0):
+    """Random factor-style covariance and expected returns"""
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(0, 0.15, size=(n_assets, 5))
+    cov = loadings @ loadings.T + np.diag(rng.uniform(0.01, 0.06, n_assets))
+    expected_returns = rng.normal(0.08, 0.05, n_assets)
+    return expected_returns, cov
+
+
+def objective_value(optimizer, weights, expected_returns, cov):
+    adjusted_returns = optimizer._apply_behavioral_adjustments_to_returns(
+        expected_returns, expected_returns.mean()
+    )
+    adjusted_cov = optimizer._adjust_risk_perception(cov)
+    p = weights @ adjusted_returns
+    utility = p if p >= 0 else optimizer.loss_aversion * p
+    return -utility + 0.5 * weights @ adjusted_cov @ weights
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 500, 2000])
+    parser.add_argument('--slsqp-max', type=int, default=500,
+                        help='Skip SLSQP above this many assets (it takes minutes)')
+    args = parser.parse_args()
+
+    optimizer = BehavioralPortfolioOptimizer({'loss_aversion_coefficient': 2.25})
+
+    print(f"{'assets':>7} {'solver':>6} {'seconds':>9} {'objective':>12}")
+    for n in args.sizes:
+        expected_returns, cov = make_problem(n)
+        constraints = {'min_weight': 0.0, 'max_weight': max(0.30, 2.0 / n), 'min_positions': 5}
+        solvers = ['qp'] if n > args.slsqp_max else ['slsqp', 'qp']
+        for solver in solvers:
+            start = time.perf_counter()
+            result = optimizer.optimize_portfolio(
+                expected_returns, cov, constraints, solver=solver
+            )
+            elapsed = time.perf_counter() - start
+            value = objective_value(optimizer, result['weights'], expected_returns, cov)
+            print(f"{n:>7} {solver:>6} {elapsed:>9.3f} {value:>12.6f}")
+
+
+if __name__ == '__main__':
+    main()
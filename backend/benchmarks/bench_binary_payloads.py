@@ -0,0 +1,87 @@
+"""
+Benchmark: decoding request bodies as JSON (Pydantic) vs .npy, Arrow IPC
+and Parquet, for a returns series and a trade history
+
+Usage (from backend/):
+    python benchmarks/bench_binary_payloads.py --periods 2000000 --trades 200000
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pydantic import TypeAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from binary_payloads import ARROW_STREAM, NPY, PARQUET, decode_returns, decode_table  # noqa: E402
+
+
+def arrow_body(table):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def parquet_body(table):
+    sink = pa.BufferOutputStream()
+    pq.write_table(table, sink)
+    return sink.getvalue().to_pybytes()
+
+
+def timed(label, decode, body, repeat=3):
+    best = min(_elapsed(decode, body) for _ in range(repeat))
+    print(f"  {label:8s}: {best * 1000:9.2f} ms  ({len(body) / 2 ** 20:7.1f} MiB body)")
+
+
+def _elapsed(decode, body):
+    start = time.perf_counter()
+    decode(body)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--periods', type=int, default=2_000_000)
+    parser.add_argument('--trades', type=int, default=200_000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    returns = rng.normal(0.0003, 0.01, args.periods)
+    table = pa.table({'returns': returns})
+    npy = io.BytesIO()
+    np.save(npy, returns)
+    list_of_floats = TypeAdapter(List[float])
+    print(f"Returns ({args.periods} periods)")
+    timed('json', lambda body: np.asarray(list_of_floats.validate_json(body)), json.dumps(returns.tolist()).encode())
+    timed('npy', lambda body: decode_returns(body, NPY), npy.getvalue())
+    timed('arrow', lambda body: decode_returns(body, ARROW_STREAM), arrow_body(table))
+    timed('parquet', lambda body: decode_returns(body, PARQUET), parquet_body(table))
+
+    trades = pd.DataFrame({
+        'symbol': rng.choice(['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA'], args.trades),
+        'action': rng.choice(['BUY', 'SELL'], args.trades),
+        'quantity': rng.integers(1, 100, args.trades).astype(float),
+        'price': rng.uniform(50, 500, args.trades),
+        'trade_date': pd.Timestamp('2020-01-01') + pd.to_timedelta(np.arange(args.trades), unit='min'),
+        'pnl': rng.normal(0, 100, args.trades)
+    })
+    records = json.dumps(trades.assign(trade_date=trades['trade_date'].astype(str)).to_dict('records')).encode()
+    table = pa.Table.from_pandas(trades, preserve_index=False)
+    list_of_dicts = TypeAdapter(List[Dict])
+    print(f"Trades ({args.trades} rows, to a DataFrame)")
+    timed('json', lambda body: pd.DataFrame(list_of_dicts.validate_json(body)), records)
+    timed('arrow', lambda body: decode_table(body, ARROW_STREAM), arrow_body(table))
+    timed('parquet', lambda body: decode_table(body, PARQUET), parquet_body(table))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark: Black-Litterman posterior, K x K Woodbury solve vs N x N inversion
+
+Usage (from backend/):
+    python benchmarks/bench_black_litterman.py --sizes 500 2000 5000 --views 10
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from black_litterman import posterior_returns  # noqa: E402
+from bench_factor_covariance import make_factor_problem  # noqa: E402
+
+
+def textbook_posterior(cov, prior, pick, view_returns, omega, tau):
+    tau_cov_inv = np.linalg.inv(tau * cov)
+    omega_inv = np.diag(1 / omega)
+    return np.linalg.solve(
+        tau_cov_inv + pick.T @ omega_inv @ pick,
+        tau_cov_inv @ prior + pick.T @ omega_inv @ view_returns
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 2000, 5000])
+    parser.add_argument('--views', type=int, default=10)
+    parser.add_argument('--factors', type=int, default=20)
+    parser.add_argument('--dense-max', type=int, default=2000,
+                        help='Skip the N x N inversion above this many assets')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'assets':>7} {'woodbury ms':>12} {'factor ms':>10} {'inverse ms':>11} {'max diff':>10}")
+    for n in args.sizes:
+        prior, factor_cov = make_factor_problem(n, args.factors)
+        cov = factor_cov.to_dense()
+        pick = rng.normal(size=(args.views, n))
+        view_returns = rng.normal(0.05, 0.02, args.views)
+        omega = rng.uniform(0.001, 0.01, args.views)
+
+        start = time.perf_counter()
+        fast = posterior_returns(cov, prior, pick, view_returns, omega)
+        woodbury = (time.perf_counter() - start) * 1e3
+
+        start = time.perf_counter()
+        posterior_returns(factor_cov, prior, pick, view_returns, omega)
+        factor = (time.perf_counter() - start) * 1e3
+
+        if n <= args.dense_max:
+            start = time.perf_counter()
+            slow = textbook_posterior(cov, prior, pick, view_returns, omega, 0.05)
+            inverse = (time.perf_counter() - start) * 1e3
+            diff = np.max(np.abs(fast - slow))
+        else:
+            inverse = diff = float('nan')
+        print(f"{n:>7} {woodbury:>12.2f} {factor:>10.2f} {inverse:>11.1f} {diff:>10.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmark: bootstrap intervals by a per-resample run_backtest loop vs
+chunked (resamples x T) evaluation
+
+Usage (from backend/):
+    python benchmarks/bench_bootstrap.py --periods 2520 --resamples 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtesting import run_backtest  # noqa: E402
+from bootstrap import bootstrap_indices, bootstrap_metrics  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--periods', type=int, default=2520)
+    parser.add_argument('--resamples', type=int, default=5000)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--method', default='stationary')
+    args = parser.parse_args()
+
+    returns = np.random.default_rng(0).normal(0.0004, 0.01, args.periods)
+
+    start = time.perf_counter()
+    indices = bootstrap_indices(args.periods, args.resamples, args.method, rng=np.random.default_rng(1))
+    sharpe = [run_backtest(list(returns[row])).sharpe_ratio for row in indices]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    intervals = bootstrap_metrics(
+        returns, n_resamples=args.resamples, method=args.method, chunk_size=args.chunk_size, seed=1
+    )
+    batch_time = time.perf_counter() - start
+
+    print(f"loop    : {loop_time:6.2f}s  sharpe 95% [{np.percentile(sharpe, 2.5):.3f}, "
+          f"{np.percentile(sharpe, 97.5):.3f}]")
+    print(f"chunked : {batch_time:6.2f}s  sharpe 95% [{intervals['sharpe_ratio']['lower']:.3f}, "
+          f"{intervals['sharpe_ratio']['upper']:.3f}] ({args.resamples} resamples x {args.periods} periods)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark: minimum-CVaR optimization over return scenarios
+
+Times the row/column-generation solver against the full sparse
+Rockafellar-Uryasev LP (one HiGHS solve over every scenario and asset).
+The full LP takes about a minute at 10k x 500; skip it with --no-full.
+
+Usage (from backend/):
+    python benchmarks/bench_cvar.py --sizes 2000x100 10000x500 --alpha 0.95
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cvar import scenario_cvar, solve_min_cvar  # noqa: E402
+from scenario_engine import simulate_asset_returns  # noqa: E402
+
+
+def full_lp(returns, alpha, lower, upper):
+    """Every scenario row and asset column in one sparse LP"""
+    s, n = returns.shape
+    cost = np.concatenate([np.zeros(n), [1.0], np.full(s, 1 / ((1 - alpha) * s))])
+    a_ub = sparse.hstack([
+        sparse.csr_matrix(-returns), sparse.csr_matrix(-np.ones((s, 1))), -sparse.identity(s, format='csr')
+    ], format='csr')
+    a_eq = sparse.csr_matrix(np.concatenate([np.ones(n), np.zeros(1 + s)])[None, :])
+    bounds = [(lower, upper)] * n + [(None, None)] + [(0, None)] * s
+    solution = linprog(cost, A_ub=a_ub, b_ub=np.zeros(s), A_eq=a_eq, b_eq=[1], bounds=bounds, method='highs')
+    return solution.x[:n]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', nargs='+', default=['2000x100', '10000x500'],
+                        help='Scenarios x assets')
+    parser.add_argument('--alpha', type=float, default=0.95)
+    parser.add_argument('--max-weight', type=float, default=0.1)
+    parser.add_argument('--no-full', action='store_true', help='Skip the full LP')
+    args = parser.parse_args()
+
+    print(f"{'size':>10} {'generated (s)':>13} {'rounds':>6} {'rows':>6} {'cols':>5} "
+          f"{'CVaR':>8} {'full LP (s)':>11} {'CVaR':>8}")
+    for size in args.sizes:
+        n_scenarios, n_assets = map(int, size.split('x'))
+        rng = np.random.default_rng(0)
+        loadings = rng.normal(0, 0.05, size=(n_assets, 5))
+        cov = loadings @ loadings.T + np.diag(rng.uniform(0.01, 0.05, n_assets))
+        returns = simulate_asset_returns(rng.normal(0.08, 0.03, n_assets), cov, n_scenarios, seed=1)
+
+        start = time.perf_counter()
+        result = solve_min_cvar(returns, args.alpha, 0.0, args.max_weight)
+        generated = time.perf_counter() - start
+        line = (f"{size:>10} {generated:>13.2f} {result.rounds:>6} {result.scenarios_used:>6} "
+                f"{result.assets_used:>5} {result.cvar:>8.4f}")
+
+        if not args.no_full:
+            start = time.perf_counter()
+            weights = full_lp(returns, args.alpha, 0.0, args.max_weight)
+            full = time.perf_counter() - start
+            line += f" {full:>11.2f} {scenario_cvar(-(returns @ weights), args.alpha)[1]:>8.4f}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark: HRP allocation time on large universes
+
+Usage (from backend/):
+    python benchmarks/bench_hrp.py --sizes 500 2000 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from portfolio_optimizer import BehavioralPortfolioOptimizer  # noqa: E402
+
+
+def make_problem(n_assets: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(0, 0.15, size=(n_assets, 20))
+    cov = loadings @ loadings.T
+    cov.flat[::n_assets + 1] += rng.uniform(0.01, 0.06, n_assets)
+    return rng.normal(0.08, 0.05, n_assets), cov
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 2000, 5000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    optimizer = BehavioralPortfolioOptimizer({'loss_aversion_coefficient': 2.25})
+    constraints = {'min_weight': 0.0, 'max_weight': 1.0}
+    print(f"{'assets':>7} {'hrp s':>9}")
+    for n in args.sizes:
+        expected_returns, cov = make_problem(n)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            optimizer.optimize_portfolio(expected_returns, cov, constraints, method='hrp')
+        print(f"{n:>7} {(time.perf_counter() - start) / args.repeat:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
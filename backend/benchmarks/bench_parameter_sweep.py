@@ -0,0 +1,59 @@
+"""
+Benchmark: sequential optimize_portfolio + run_backtest calls vs
+parameter_sweep over a loss-aversion x overconfidence x max-weight grid
+
+Usage (from backend/):
+    python benchmarks/bench_parameter_sweep.py --assets 30 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtesting import backtest_portfolios, run_backtest, weight_schedule  # noqa: E402
+from parameter_sweep import expand_grid, parameter_sweep  # noqa: E402
+from portfolio_optimizer import BehavioralPortfolioOptimizer  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, default=30)
+    parser.add_argument('--periods', type=int, default=2520)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    returns = np.random.default_rng(0).normal(0.0004, 0.01, (args.periods, args.assets))
+    history, future = returns[:args.periods // 2], returns[args.periods // 2:]
+    er, cov = history.mean(axis=0) * 252, np.cov(history.T) * 252
+    constraints = {'min_weight': 0.0, 'max_weight': 0.3, 'min_positions': 0}
+    grid = {
+        'loss_aversion_coefficient': list(np.linspace(1.0, 3.5, 10)),
+        'overconfidence_score': list(np.linspace(0.0, 1.0, 10)),
+        'max_weight': [0.1, 0.15, 0.2, 0.3, 0.5]
+    }
+    cells = expand_grid(grid)
+
+    start = time.perf_counter()
+    for cell in cells:
+        profile = {k: v for k, v in cell.items() if k != 'max_weight'}
+        result = BehavioralPortfolioOptimizer(profile).optimize_portfolio(
+            er, cov, {**constraints, 'max_weight': cell['max_weight']}
+        )
+        book = backtest_portfolios(future, weight_schedule(result['weights'], future, 21))
+        run_backtest(list(book.returns[0]))
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sweep = parameter_sweep(grid, er, cov, future, constraints=constraints, max_workers=args.workers)
+    sweep_time = time.perf_counter() - start
+
+    print(f"sequential calls : {loop_time:6.2f}s ({len(cells)} cells)")
+    print(f"parameter_sweep  : {sweep_time:6.2f}s ({sweep.unique_cells} unique cells, {args.workers} workers)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: intraday re-optimization, cold start vs warm start vs reuse
+
+Simulates a stream of small input updates for one portfolio and times
+each re-solve started cold, warm-started from the previous weights, and
+through ReoptimizationStore (which also skips sub-tolerance updates).
+
+Usage (from backend/):
+    python benchmarks/bench_reoptimization.py --assets 200 --updates 20
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from portfolio_optimizer import BehavioralPortfolioOptimizer  # noqa: E402
+from reoptimization import ReoptimizationStore  # noqa: E402
+from bench_behavioral_mvo import make_problem  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, default=200)
+    parser.add_argument('--updates', type=int, default=20)
+    parser.add_argument('--drift', type=float, default=1e-3,
+                        help='Relative size of each input update')
+    parser.add_argument('--methods', nargs='+',
+                        default=['behavioral_mvo:slsqp', 'behavioral_mvo:qp', 'risk_parity:slsqp'])
+    args = parser.parse_args()
+
+    profile = {'loss_aversion_coefficient': 2.25}
+    optimizer = BehavioralPortfolioOptimizer(profile)
+    n = args.assets
+    constraints = {'min_weight': 0.0, 'max_weight': max(0.30, 2.0 / n), 'min_positions': 5}
+    rng = np.random.default_rng(1)
+    base_returns, base_cov = make_problem(n)
+
+    # Random walk of the inputs; every other update is below the reuse tolerance
+    updates = []
+    returns, cov = base_returns, base_cov
+    for i in range(args.updates):
+        size = args.drift if i % 2 == 0 else 1e-6
+        returns = returns * (1 + size * rng.standard_normal(n))
+        scale = 1 + size * rng.standard_normal(n)
+        cov = cov * np.outer(scale, scale)
+        updates.append((returns, cov))
+
+    print(f"{'method':>22} {'cold ms':>9} {'warm ms':>9} {'store ms':>9} {'reused':>7}")
+    for spec in args.methods:
+        method, solver = spec.split(':')
+        first = optimizer.optimize_portfolio(base_returns, base_cov, constraints, method, solver)
+
+        start = time.perf_counter()
+        for returns, cov in updates:
+            optimizer.optimize_portfolio(returns, cov, constraints, method, solver)
+        cold = (time.perf_counter() - start) / len(updates) * 1e3
+
+        start = time.perf_counter()
+        weights = first['weights']
+        for returns, cov in updates:
+            weights = optimizer.optimize_portfolio(
+                returns, cov, constraints, method, solver, initial_weights=weights
+            )['weights']
+        warm = (time.perf_counter() - start) / len(updates) * 1e3
+
+        store = ReoptimizationStore(tolerance=1e-4)
+        store.record('p', profile, base_returns, base_cov, constraints, method, solver, first)
+        reused = 0
+        start = time.perf_counter()
+        for returns, cov in updates:
+            mode, state = store.plan('p', profile, returns, cov, constraints, method, solver)
+            if mode == 'reuse':
+                reused += 1
+                continue
+            result = optimizer.optimize_portfolio(
+                returns, cov, constraints, method, solver, initial_weights=state.weights
+            )
+            store.record('p', profile, returns, cov, constraints, method, solver, result)
+        stored = (time.perf_counter() - start) / len(updates) * 1e3
+
+        print(f"{spec:>22} {cold:>9.2f} {warm:>9.2f} {stored:>9.2f} {reused:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: equal-risk-contribution engine vs the previous SLSQP formulation
+
+Usage (from backend/):
+    python benchmarks/bench_risk_parity.py --sizes 50 200 1000 3000 --slsqp-max 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.optimize import minimize
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from risk_parity import solve_equal_risk_contribution  # noqa: E402
+
+
+def make_cov(n_assets: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(0, 0.15, size=(n_assets, 10))
+    return loadings @ loadings.T + np.diag(rng.uniform(0.01, 0.06, n_assets))
+
+
+def slsqp_risk_parity(cov: np.ndarray, lower: float, upper: float) -> np.ndarray:
+    """The squared-contribution-difference objective previously used"""
+    n = len(cov)
+
+    def objective(weights):
+        weights = np.maximum(weights, 0)
+        weights = weights / weights.sum()
+        risk_contrib = weights * (cov @ weights)
+        return np.sum((risk_contrib - risk_contrib.sum() / n) ** 2)
+
+    result = minimize(
+        objective, np.ones(n) / n, method='SLSQP',
+        bounds=[(lower, upper)] * n,
+        constraints={'type': 'eq', 'fun': lambda x: np.sum(x) - 1}
+    )
+    return result.x / result.x.sum()
+
+
+def spread(cov: np.ndarray, weights: np.ndarray) -> float:
+    """max/min risk contribution ratio (1 = exact parity)"""
+    contrib = weights * (cov @ weights)
+    return contrib.max() / contrib.min()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 200, 1000, 3000])
+    parser.add_argument('--slsqp-max', type=int, default=200,
+                        help='Skip SLSQP above this many assets')
+    args = parser.parse_args()
+
+    print(f"{'assets':>7} {'solver':>8} {'ms':>10} {'RC max/min':>11}")
+    for n in args.sizes:
+        cov = make_cov(n)
+        lower, upper = 0.0, 1.0
+
+        start = time.perf_counter()
+        result = solve_equal_risk_contribution(cov, lower, upper)
+        cold = (time.perf_counter() - start) * 1e3
+        print(f"{n:>7} {'erc':>8} {cold:>10.2f} {spread(cov, result.weights):>11.6f}")
+
+        start = time.perf_counter()
+        warm = solve_equal_risk_contribution(cov * 1.01, lower, upper, x0=result.weights)
+        elapsed = (time.perf_counter() - start) * 1e3
+        print(f"{n:>7} {'erc-warm':>8} {elapsed:>10.2f} {spread(cov, warm.weights):>11.6f}")
+
+        if n <= args.slsqp_max:
+            start = time.perf_counter()
+            weights = slsqp_risk_parity(cov, lower, upper)
+            elapsed = (time.perf_counter() - start) * 1e3
+            print(f"{n:>7} {'slsqp':>8} {elapsed:>10.2f} {spread(cov, weights):>11.6f}")
+
+
+if __name__ == '__main__':
+    main()
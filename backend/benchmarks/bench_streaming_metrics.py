@@ -0,0 +1,53 @@
+"""
+Benchmark: run_backtest on a full list vs StreamingMetrics over chunks
+
+Usage (from backend/):
+    python benchmarks/bench_streaming_metrics.py --periods 5000000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtesting import StreamingMetrics, run_backtest  # noqa: E402
+
+
+def chunks(n_periods, chunk_size, seed=0):
+    """Generated returns, never all in memory at once"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_periods, chunk_size):
+        yield rng.normal(0.00001, 0.001, min(chunk_size, n_periods - start))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--periods', type=int, default=5_000_000)
+    parser.add_argument('--chunk-size', type=int, default=65536)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    streamed = StreamingMetrics().consume(chunks(args.periods, args.chunk_size))
+    stream_time = time.perf_counter() - start
+    stream_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+
+    start = time.perf_counter()
+    returns = np.concatenate(list(chunks(args.periods, args.chunk_size))).tolist()
+    full = run_backtest(returns)
+    full_time = time.perf_counter() - start
+    full_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    print(f"run_backtest (list) : {full_time:6.2f}s, peak {full_peak / 2 ** 20:8.1f} MiB")
+    print(f"StreamingMetrics    : {stream_time:6.2f}s, peak {stream_peak / 2 ** 20:8.1f} MiB "
+          f"({args.periods} periods, sharpe diff {abs(full.sharpe_ratio - streamed.sharpe_ratio):.1e})")
+
+
+if __name__ == '__main__':
+    main()
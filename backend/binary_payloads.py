@@ -0,0 +1,159 @@
+"""
+Binary request bodies
+Decodes .npy, Arrow IPC and Parquet uploads into NumPy arrays and
+DataFrames for endpoints that also take JSON. .npy and Arrow IPC bodies are
+viewed in place (no per-element parsing or copy); Parquet is decompressed
+by pyarrow. pyarrow is optional and only needed for Arrow and Parquet.
+"""
+from typing import Dict, Optional
+import ast
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    pa = None
+
+
+NPY = 'application/x-npy'
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+ARROW_FILE = 'application/vnd.apache.arrow.file'
+PARQUET = 'application/vnd.apache.parquet'
+
+BINARY_MEDIA_TYPES = (NPY, ARROW_STREAM, ARROW_FILE, PARQUET)
+_ALIASES = {
+    'application/octet-stream+npy': NPY,
+    'application/x-parquet': PARQUET,
+    'application/parquet': PARQUET
+}
+
+
+class UnsupportedPayloadError(Exception):
+    """Content type that cannot be decoded here (unknown, or pyarrow is missing)"""
+
+
+def media_type(content_type: Optional[str]) -> str:
+    """Bare, lower-case media type of a Content-Type header"""
+    bare = (content_type or '').split(';')[0].strip().lower()
+    return _ALIASES.get(bare, bare)
+
+
+def is_binary(content_type: Optional[str]) -> bool:
+    return media_type(content_type) in BINARY_MEDIA_TYPES
+
+
+def decode_returns(body: bytes, content_type: str, column: str = 'returns') -> np.ndarray:
+    """
+    1-D float returns from a binary body: a float .npy vector, or the
+    `column` (else the only) column of an Arrow or Parquet table
+
+    Raises:
+        ValueError: for a malformed body or a shape other than one series
+        UnsupportedPayloadError: for other content types
+    """
+    kind = media_type(content_type)
+    if kind == NPY:
+        values = _read_npy(body)
+        if values.dtype.names:
+            values = values[column if column in values.dtype.names else values.dtype.names[0]]
+    else:
+        table = _read_table(body, kind)
+        if column in table.column_names:
+            values = _column_to_numpy(table.column(column))
+        elif table.num_columns == 1:
+            values = _column_to_numpy(table.column(0))
+        else:
+            raise ValueError(f"Table has no '{column}' column")
+    if values.ndim == 2 and 1 in values.shape:
+        values = values.reshape(-1)
+    if values.ndim != 1:
+        raise ValueError("Returns must be a single series")
+    if values.dtype.kind not in 'fiu':
+        raise ValueError(f"Returns must be numeric, got {values.dtype}")
+    return values.astype(float, copy=False)
+
+
+def decode_table(body: bytes, content_type: str) -> pd.DataFrame:
+    """
+    DataFrame from a binary body: an Arrow or Parquet table, or a
+    structured (record) .npy array with one field per column
+
+    Raises:
+        ValueError: for a malformed body or a .npy without named fields
+        UnsupportedPayloadError: for other content types
+    """
+    kind = media_type(content_type)
+    if kind == NPY:
+        records = _read_npy(body)
+        if not records.dtype.names:
+            raise ValueError("A .npy table must be a structured array with named fields")
+        return pd.DataFrame({name: records[name] for name in records.dtype.names})
+    return _read_table(body, kind).to_pandas()
+
+
+def request_body_schema(json_schema: Dict, description: str) -> Dict:
+    """OpenAPI requestBody listing the JSON schema and the binary media types"""
+    content = {'application/json': {'schema': json_schema}}
+    for kind in BINARY_MEDIA_TYPES:
+        content[kind] = {'schema': {'type': 'string', 'format': 'binary'}}
+    return {'requestBody': {'required': True, 'description': description, 'content': content}}
+
+
+def _read_npy(body: bytes) -> np.ndarray:
+    """View of a .npy body without copying the data"""
+    header_end, dtype, shape, fortran_order = _npy_header(body)
+    if dtype.hasobject:
+        raise ValueError("Object arrays are not accepted")
+    count = int(np.prod(shape))
+    if len(body) - header_end < count * dtype.itemsize:
+        raise ValueError("Truncated .npy body")
+    values = np.frombuffer(body, dtype=dtype, count=count, offset=header_end)
+    return values.reshape(shape, order='F' if fortran_order else 'C')
+
+
+def _npy_header(body: bytes):
+    """Header length, dtype, shape and order of a .npy body (format 1.0-3.0)"""
+    magic = b'\x93NUMPY'
+    if not body.startswith(magic) or len(body) < 10:
+        raise ValueError("Not a .npy body")
+    major = body[6]
+    if major == 1:
+        length, start = int.from_bytes(body[8:10], 'little'), 10
+    elif major in (2, 3):
+        length, start = int.from_bytes(body[8:12], 'little'), 12
+    else:
+        raise ValueError(f"Unsupported .npy version {major}")
+    try:
+        header = ast.literal_eval(body[start:start + length].decode('latin1' if major < 3 else 'utf8'))
+        dtype = np.lib.format.descr_to_dtype(header['descr'])
+        shape = tuple(header['shape'])
+        fortran_order = bool(header['fortran_order'])
+    except (SyntaxError, ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Malformed .npy header: {e}")
+    return start + length, dtype, shape, fortran_order
+
+
+def _read_table(body: bytes, kind: str):
+    if kind not in (ARROW_STREAM, ARROW_FILE, PARQUET):
+        raise UnsupportedPayloadError(f"Unsupported content type: {kind or 'none'}")
+    if pa is None:
+        raise UnsupportedPayloadError(f"{kind} bodies need pyarrow installed")
+    buffer = pa.py_buffer(body)
+    if kind == ARROW_STREAM:
+        return pa.ipc.open_stream(buffer).read_all()
+    if kind == ARROW_FILE:
+        return pa.ipc.open_file(buffer).read_all()
+    return pa.parquet.read_table(pa.BufferReader(buffer))
+
+
+def _column_to_numpy(column) -> np.ndarray:
+    """Arrow column to NumPy, zero-copy for a single chunk without nulls"""
+    if column.null_count:
+        raise ValueError("Returns must not contain nulls")
+    if column.num_chunks == 1:
+        return column.chunk(0).to_numpy(zero_copy_only=False)
+    return column.to_numpy()
@@ -0,0 +1,137 @@
+"""
+Black-Litterman posterior returns
+Market-cap equilibrium prior, views (P, Q, Omega) and a K x K Cholesky solve.
+"""
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve
+
+
+def equilibrium_returns(cov_matrix, market_weights: np.ndarray, risk_aversion: float) -> np.ndarray:
+    """Reverse-optimized prior: pi = delta * Σ w_mkt"""
+    return risk_aversion * (cov_matrix @ market_weights)
+
+
+def market_cap_weights(market_caps: Optional[np.ndarray], n_assets: int) -> np.ndarray:
+    """Normalized market caps, or equal weights when none are given"""
+    if market_caps is None:
+        return np.ones(n_assets) / n_assets
+    caps = np.maximum(np.asarray(market_caps, dtype=float), 0.0)
+    if caps.sum() <= 0:
+        return np.ones(n_assets) / n_assets
+    return caps / caps.sum()
+
+
+def view_uncertainty(
+    cov_matrix,
+    pick_matrix: np.ndarray,
+    confidences: np.ndarray,
+    tau: float
+) -> np.ndarray:
+    """
+    Diagonal Omega from view confidences in (0, 1]:
+    omega_k = tau * p_k Σ p_k' * (1 - c_k) / c_k
+
+    c = 1 makes a view exact and c = 0.5 weights it like the prior
+    (the Idzorek/He-Litterman scaling). Returned as the K diagonal entries.
+    """
+    confidences = np.clip(np.asarray(confidences, dtype=float), 1e-6, 1.0)
+    view_var = np.sum(pick_matrix * (cov_matrix @ pick_matrix.T).T, axis=1)
+    return tau * view_var * (1.0 - confidences) / confidences
+
+
+def posterior_returns(
+    cov_matrix,
+    prior_returns: np.ndarray,
+    pick_matrix: np.ndarray,
+    view_returns: np.ndarray,
+    omega: np.ndarray,
+    tau: float = 0.05
+) -> np.ndarray:
+    """
+    Black-Litterman posterior mean
+
+        mu = pi + tau Σ P' (tau P Σ P' + Omega)^-1 (Q - P pi)
+
+    This is the Woodbury form of the textbook
+    [(tau Σ)^-1 + P' Omega^-1 P]^-1 [(tau Σ)^-1 pi + P' Omega^-1 Q]:
+    it needs Σ P' (K products with Σ, so FactorCovariance works) and one
+    Cholesky factorization of a K x K matrix, never an N x N inverse.
+
+    Args:
+        cov_matrix: Dense covariance or FactorCovariance
+        prior_returns: Equilibrium returns pi (N,)
+        pick_matrix: P, K x N (one row per view)
+        view_returns: Q (K,)
+        omega: View covariance, K x K or its diagonal (K,)
+        tau: Prior uncertainty scalar
+    """
+    pick_matrix = np.atleast_2d(np.asarray(pick_matrix, dtype=float))
+    view_returns = np.asarray(view_returns, dtype=float)
+    if pick_matrix.shape[0] == 0:
+        return np.asarray(prior_returns, dtype=float).copy()
+
+    omega = np.asarray(omega, dtype=float)
+    if omega.ndim == 1:
+        omega = np.diag(omega)
+
+    sigma_pt = cov_matrix @ pick_matrix.T  # N x K
+    system = tau * (pick_matrix @ sigma_pt) + omega
+    surprise = view_returns - pick_matrix @ prior_returns
+    weights = cho_solve(cho_factor(system), surprise)
+    return prior_returns + tau * (sigma_pt @ weights)
+
+
+def views_from_sentiment(
+    cov_matrix,
+    prior_returns: np.ndarray,
+    sentiment_scores: np.ndarray,
+    sentiment_confidence: np.ndarray,
+    view_scale: float = 0.25
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Absolute views from sentiment: each asset with a nonzero score gets
+    Q_i = pi_i + score_i * view_scale * sigma_i (a score of +/-1 moves the
+    prior by view_scale standard deviations), with the analyzer's
+    confidence as the view confidence
+
+    Returns:
+        (pick_matrix, view_returns, confidences)
+    """
+    scores = np.asarray(sentiment_scores, dtype=float)
+    assets = np.flatnonzero(scores != 0)
+    pick_matrix = np.zeros((assets.size, len(scores)))
+    pick_matrix[np.arange(assets.size), assets] = 1.0
+    sigma = np.sqrt(cov_matrix.diagonal()[assets])
+    view_returns = prior_returns[assets] + scores[assets] * view_scale * sigma
+    confidences = np.asarray(sentiment_confidence, dtype=float)[assets]
+    return pick_matrix, view_returns, confidences
+
+
+def views_from_specs(view_specs: List[Dict], assets: List[str]) -> Dict:
+    """
+    Build pick matrix, view returns and confidences from request-style
+    view dicts: {'weights': {symbol: weight}, 'expected_return': q,
+    'confidence': c, 'variance': omega_kk (optional, overrides c for that view)}
+
+    Returns a views dict with plain lists (see BehavioralPortfolioOptimizer)
+    """
+    index = {symbol.upper(): i for i, symbol in enumerate(assets)}
+    pick_matrix = []
+    for spec in view_specs:
+        row = [0.0] * len(assets)
+        for symbol, weight in spec['weights'].items():
+            if symbol.upper() not in index:
+                raise ValueError(f"View references unknown asset: {symbol}")
+            row[index[symbol.upper()]] = float(weight)
+        pick_matrix.append(row)
+
+    return {
+        'pick_matrix': pick_matrix,
+        'view_returns': [float(spec['expected_return']) for spec in view_specs],
+        'confidences': [float(spec.get('confidence', 0.5)) for spec in view_specs],
+        'variances': [
+            None if spec.get('variance') is None else float(spec['variance'])
+            for spec in view_specs
+        ]
+    }
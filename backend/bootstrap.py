@@ -0,0 +1,158 @@
+"""
+Bootstrap inference for backtest metrics
+Block and stationary bootstrap of return series, evaluated as chunks of
+(resamples x T) matrices through compute_metrics_batch.
+"""
+from typing import Dict, Optional
+import numpy as np
+
+from backtesting import BacktestResult, compute_metrics_batch
+
+
+BOOTSTRAP_METHODS = ('stationary', 'block')
+METRICS = tuple(BacktestResult.__dataclass_fields__)
+
+
+def bootstrap_indices(
+    n_periods: int,
+    n_resamples: int,
+    method: str = 'stationary',
+    block_size: Optional[float] = None,
+    rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
+    """
+    (resamples x n_periods) indices into a series, wrapping circularly
+
+    'block' concatenates blocks of block_size consecutive periods from
+    uniform starts; 'stationary' (Politis-Romano) uses geometric block
+    lengths with mean block_size, so resampled series stay stationary.
+    block_size defaults to n_periods ** (1/3).
+    """
+    if method not in BOOTSTRAP_METHODS:
+        raise ValueError(f"Unknown bootstrap method: {method}")
+    rng = rng or np.random.default_rng()
+    block_size = max(1.0, block_size or round(n_periods ** (1 / 3)))
+    offsets = np.arange(n_periods)
+
+    if method == 'block':
+        length = int(round(block_size))
+        starts = rng.integers(0, n_periods, (n_resamples, -(-n_periods // length)))
+        return (np.repeat(starts, length, axis=1)[:, :n_periods] + offsets % length) % n_periods
+
+    # A new block starts at each period with probability 1 / block_size
+    new_block = rng.random((n_resamples, n_periods), dtype=np.float32) < 1.0 / block_size
+    new_block[:, 0] = True
+    first = np.maximum.accumulate(np.where(new_block, offsets, 0), axis=1)
+    # One uniform start per block; every row begins a block, so ids never cross rows
+    block_id = np.cumsum(new_block, axis=None).reshape(new_block.shape) - 1
+    starts = rng.integers(0, n_periods, block_id[-1, -1] + 1)
+    return (starts[block_id] + offsets - first) % n_periods
+
+
+def bootstrap_metrics(
+    returns: np.ndarray,
+    n_resamples: int = 5000,
+    method: str = 'stationary',
+    block_size: Optional[float] = None,
+    confidence: float = 0.95,
+    risk_free_rate: float = 0.02,
+    periods_per_year: int = 252,
+    chunk_size: int = 1000,
+    seed: Optional[int] = None
+) -> Dict[str, Dict[str, float]]:
+    """
+    Confidence intervals for every BacktestResult field of one returns series
+
+    Returns:
+        {field: {'estimate', 'lower', 'upper', 'std'}}: the point estimate
+        of run_backtest and percentile intervals over the resamples
+    """
+    returns = np.asarray(returns, dtype=float)
+    point = compute_metrics_batch(returns[None, :], risk_free_rate, periods_per_year)
+    samples = _resampled_metrics(
+        returns[None, :], n_resamples, method, block_size, risk_free_rate,
+        periods_per_year, chunk_size, seed
+    )
+    tail = 100 * (1 - confidence) / 2
+    return {
+        field: {
+            'estimate': float(point[field][0]),
+            'lower': float(np.percentile(samples[field][0], tail)),
+            'upper': float(np.percentile(samples[field][0], 100 - tail)),
+            'std': float(np.std(samples[field][0]))
+        }
+        for field in METRICS
+    }
+
+
+def paired_bootstrap_test(
+    returns_a: np.ndarray,
+    returns_b: np.ndarray,
+    metric: str = 'sharpe_ratio',
+    n_resamples: int = 5000,
+    method: str = 'stationary',
+    block_size: Optional[float] = None,
+    confidence: float = 0.95,
+    risk_free_rate: float = 0.02,
+    periods_per_year: int = 252,
+    chunk_size: int = 1000,
+    seed: Optional[int] = None
+) -> Dict[str, float]:
+    """
+    Whether strategy A beats strategy B on a metric over the same periods
+
+    Both series are resampled with the same indices, which keeps their
+    correlation, and the metric difference A - B is computed per
+    resample. The two-sided p-value is twice the smaller share of
+    resampled differences on either side of zero.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric}")
+    pair = np.vstack([np.asarray(returns_a, dtype=float), np.asarray(returns_b, dtype=float)])
+    point = compute_metrics_batch(pair, risk_free_rate, periods_per_year)[metric]
+    samples = _resampled_metrics(
+        pair, n_resamples, method, block_size, risk_free_rate,
+        periods_per_year, chunk_size, seed
+    )[metric]
+    difference = samples[0] - samples[1]
+    tail = 100 * (1 - confidence) / 2
+    p_value = 2 * min(np.mean(difference <= 0), np.mean(difference >= 0))
+    return {
+        'metric': metric,
+        'estimate_a': float(point[0]),
+        'estimate_b': float(point[1]),
+        'difference': float(point[0] - point[1]),
+        'lower': float(np.percentile(difference, tail)),
+        'upper': float(np.percentile(difference, 100 - tail)),
+        'probability_a_better': float(np.mean(difference > 0)),
+        'p_value': float(min(p_value, 1.0))
+    }
+
+
+def _resampled_metrics(
+    series: np.ndarray,
+    n_resamples: int,
+    method: str,
+    block_size: Optional[float],
+    risk_free_rate: float,
+    periods_per_year: int,
+    chunk_size: int,
+    seed: Optional[int]
+) -> Dict[str, np.ndarray]:
+    """
+    Metrics of every resample for S aligned series, as {field: (S, resamples)}
+
+    Each chunk draws one index matrix shared by all series, so peak memory
+    is O(S * chunk_size * T) whatever n_resamples is.
+    """
+    rng = np.random.default_rng(seed)
+    n_series, n_periods = series.shape
+    metrics = {field: np.empty((n_series, n_resamples)) for field in METRICS}
+    for start in range(0, n_resamples, chunk_size):
+        size = min(chunk_size, n_resamples - start)
+        indices = bootstrap_indices(n_periods, size, method, block_size, rng)
+        resampled = series[:, indices].reshape(n_series * size, n_periods)
+        chunk = compute_metrics_batch(resampled, risk_free_rate, periods_per_year)
+        for field in METRICS:
+            metrics[field][:, start:start + size] = chunk[field].reshape(n_series, size)
+    return metrics
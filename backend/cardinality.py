@@ -0,0 +1,203 @@
+"""
+Cardinality-constrained behavioral mean-variance optimization
+Relaxation + rounding inside a depth-first branch-and-bound with a time budget.
+"""
+from dataclasses import dataclass
+from typing import Optional
+import math
+import time
+
+import numpy as np
+
+from qp_solver import POSITION_THRESHOLD, solve_prospect_mvo
+
+
+# Weight below which an asset counts as not held
+SUPPORT_TOL = 1e-8
+
+
+@dataclass
+class CardinalityResult:
+    x: np.ndarray
+    objective: float
+    positions: int
+    nodes: int
+    optimal: bool  # search finished within the budget (x is optimal)
+    bound: float  # lower bound on the optimal objective
+
+
+def solve_cardinality_mvo(
+    adjusted_returns: np.ndarray,
+    adjusted_cov,
+    loss_aversion: float,
+    min_weight: float,
+    max_weight: float,
+    min_positions: int = 0,
+    max_positions: Optional[int] = None,
+    time_budget: float = 2.0,
+    max_nodes: int = 100000,
+    x0: Optional[np.ndarray] = None
+) -> CardinalityResult:
+    """
+    Prospect-utility MVO holding between min_positions and max_positions assets
+
+    Holdings are semi-continuous: an asset is either not held (weight 0)
+    or held with max(min_weight, POSITION_THRESHOLD) <= w <= max_weight.
+
+    Each node fixes some assets in (lower bound raised) or out (upper bound
+    zero) and solves the continuous relaxation with solve_prospect_mvo,
+    warm-started from its parent; the relaxation value bounds every
+    completion of the node. Nodes whose bound cannot beat the incumbent
+    are pruned. Otherwise the node's relaxation is rounded (keep the
+    largest weights, top up by gradient, re-solve on that support) to
+    improve the incumbent, and the search branches on the asset that
+    breaks the cardinality or minimum-holding rule.
+
+    The best feasible portfolio found within time_budget seconds is
+    returned; optimal is True only if the search tree was exhausted.
+
+    Raises:
+        ValueError: if no portfolio can satisfy the constraints
+    """
+    returns = np.asarray(adjusted_returns, dtype=float)
+    n = len(returns)
+    held_min = max(float(min_weight), POSITION_THRESHOLD)
+    max_weight = float(max_weight)
+    k_min = max(int(min_positions), math.ceil(1.0 / max_weight - 1e-9))
+    k_max = min(n if max_positions is None else int(max_positions), math.floor(1.0 / held_min + 1e-9))
+    if k_min > k_max or held_min > max_weight:
+        raise ValueError(
+            f"Cardinality constraints are infeasible: need {k_min} to {k_max} positions "
+            f"with weights in [{held_min}, {max_weight}]"
+        )
+
+    deadline = time.perf_counter() + time_budget
+
+    def objective(x):
+        p = x @ returns
+        utility = p if p >= 0 else loss_aversion * p
+        return -utility + 0.5 * x @ (adjusted_cov @ x)
+
+    def relax(lower, upper, start):
+        if lower.sum() > 1.0 + 1e-12 or upper.sum() < 1.0 - 1e-12:
+            return None
+        return solve_prospect_mvo(returns, adjusted_cov, loss_aversion, lower, upper, x0=start).x
+
+    def round_support(x, forced_in, forced_out):
+        """Feasible portfolio on the k best assets of a relaxed solution"""
+        support = x > SUPPORT_TOL
+        k = int(np.clip(np.sum(support | forced_in), max(k_min, forced_in.sum()), k_max))
+        gradient = adjusted_cov @ x - returns
+        # Forced-in first, then by weight, then by gradient (most attractive)
+        order = np.lexsort((gradient, -x, ~forced_in))
+        order = order[~forced_out[order]][:k]
+        if len(order) < k_min:
+            return None
+        lower = np.zeros(n)
+        upper = np.zeros(n)
+        lower[order] = held_min
+        upper[order] = max_weight
+        return relax(lower, upper, x)
+
+    best_x, best_f = None, np.inf
+    if x0 is not None:
+        start = np.asarray(x0, dtype=float)
+        if _is_feasible(start, held_min, max_weight, k_min, k_max):
+            best_x, best_f = start, objective(start)
+
+    root_lower = np.zeros(n)
+    root_upper = np.full(n, max_weight)
+    root_x = relax(root_lower, root_upper, x0)
+    if root_x is None:
+        raise ValueError("Weight bounds are infeasible")
+
+    # Depth-first stack of (bound, lower, upper, parent solution)
+    stack = [(objective(root_x), root_lower, root_upper, root_x)]
+    nodes = 0
+    exhausted = True
+    while stack:
+        # Always get past the root so there is an incumbent to return
+        if nodes >= max_nodes or (best_x is not None and time.perf_counter() > deadline):
+            exhausted = False
+            break
+        bound, lower, upper, x = stack.pop()
+        if bound >= best_f - 1e-10 * (1 + abs(best_f)):
+            continue
+        nodes += 1
+
+        forced_in = lower > 0
+        forced_out = upper <= 0
+        support = x > SUPPORT_TOL
+        count = int(np.sum(support))
+        below_min = support & (x < held_min - 1e-9) & ~forced_in
+
+        if k_min <= count <= k_max and not below_min.any():
+            best_x, best_f = x, bound
+            continue
+
+        candidate = round_support(x, forced_in, forced_out)
+        if candidate is not None:
+            value = objective(candidate)
+            if value < best_f:
+                best_x, best_f = candidate, value
+
+        free = ~forced_in & ~forced_out
+        if count > k_max:
+            # Too many holdings: the smallest free holding is the likeliest to drop
+            options = np.flatnonzero(support & free)
+            asset = options[np.argmin(x[options])]
+            out_first = True
+        elif count < k_min:
+            # Too few: the most attractive unheld asset by gradient
+            options = np.flatnonzero(~support & free)
+            if options.size == 0:
+                continue
+            gradient = adjusted_cov @ x - returns
+            asset = options[np.argmin(gradient[options])]
+            out_first = False
+        else:
+            options = np.flatnonzero(below_min)
+            asset = options[np.argmin(x[options])]
+            out_first = True
+
+        children = []
+        for take in (True, False) if not out_first else (False, True):
+            child_lower, child_upper = lower.copy(), upper.copy()
+            if take:
+                child_lower[asset] = held_min
+            else:
+                child_upper[asset] = 0.0
+            if take and np.sum(child_lower > 0) > k_max:
+                continue
+            if not take and np.sum(child_upper > 0) < k_min:
+                continue
+            child_x = relax(child_lower, child_upper, x)
+            if child_x is not None:
+                children.append((objective(child_x), child_lower, child_upper, child_x))
+        # Explore the preferred child first (pushed last)
+        stack.extend(reversed(children))
+
+    if best_x is None:
+        raise ValueError("No feasible portfolio found within the time budget")
+
+    open_bounds = [entry[0] for entry in stack]
+    bound = best_f if exhausted else min([best_f] + open_bounds)
+    return CardinalityResult(
+        x=best_x,
+        objective=float(best_f),
+        positions=int(np.sum(best_x > SUPPORT_TOL)),
+        nodes=nodes,
+        optimal=exhausted,
+        bound=float(bound)
+    )
+
+
+def _is_feasible(x, held_min, max_weight, k_min, k_max) -> bool:
+    held = x > SUPPORT_TOL
+    return (
+        abs(x.sum() - 1.0) <= 1e-8
+        and k_min <= int(held.sum()) <= k_max
+        and bool(np.all(x[held] >= held_min - 1e-9))
+        and bool(np.all(x <= max_weight + 1e-9))
+        and bool(np.all(x >= -1e-12))
+    )
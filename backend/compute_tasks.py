@@ -0,0 +1,170 @@
+"""
+CPU-bound jobs run in ComputeExecutor workers
+Module-level functions so they pickle; each returns only plain arrays,
+floats and dicts so little has to be serialized back to the event loop.
+"""
+from typing import Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+
+from behavioral_analyzer import BehavioralAnalyzer
+from backtesting import run_backtest
+from bootstrap import bootstrap_metrics, paired_bootstrap_test
+from portfolio_optimizer import BehavioralPortfolioOptimizer, optimize_portfolio_batch
+from efficient_frontier import efficient_frontier, locate_on_frontier
+
+
+def optimize_task(
+    user_profile: Dict,
+    expected_returns: np.ndarray,
+    cov_matrix: np.ndarray,
+    constraints: Optional[Dict],
+    method: str,
+    solver: str = 'slsqp',
+    initial_weights: Optional[np.ndarray] = None,
+    views: Optional[Dict] = None,
+    scenarios: Optional[np.ndarray] = None,
+    current_weights: Optional[np.ndarray] = None,
+    transaction_costs: Optional[Dict] = None
+) -> Dict:
+    """Single-profile optimization, optionally warm-started or rebalanced from current weights"""
+    optimizer = BehavioralPortfolioOptimizer(user_profile)
+    result = optimizer.optimize_portfolio(
+        expected_returns,
+        cov_matrix,
+        constraints=constraints,
+        method=method,
+        solver=solver,
+        initial_weights=initial_weights,
+        views=views,
+        scenarios=scenarios,
+        current_weights=current_weights,
+        transaction_costs=transaction_costs
+    )
+    return {
+        'weights': np.asarray(result['weights'], dtype=float),
+        'method': result['method'],
+        'expected_return': float(result.get('expected_return', np.nan)),
+        'expected_volatility': float(result['expected_volatility']),
+        'sharpe_ratio': float(result.get('sharpe_ratio', np.nan)),
+        'behavioral_adjustments': result.get('behavioral_adjustments', {}),
+        'risk_contributions': result.get('risk_contributions'),
+        'rebalance': result.get('rebalance'),
+        'telemetry': result['telemetry']
+    }
+
+
+def optimize_batch_task(
+    profiles: List[Dict],
+    expected_returns: np.ndarray,
+    cov_matrix: np.ndarray,
+    constraints: Optional[Dict],
+    method: str
+) -> Dict:
+    """Many profiles against one covariance"""
+    result = optimize_portfolio_batch(
+        profiles, expected_returns, cov_matrix, constraints=constraints, method=method
+    )
+    return {
+        'weights': result['weights'],
+        'expected_return': result['expected_return'],
+        'expected_volatility': result['expected_volatility'],
+        'sharpe_ratio': result['sharpe_ratio'],
+        'method': result['method'],
+        'telemetry': result['telemetry']
+    }
+
+
+def frontier_task(
+    user_profile: Dict,
+    expected_returns: np.ndarray,
+    cov_matrix: np.ndarray,
+    constraints: Dict,
+    n_points: int,
+    method: str,
+    solver: str = 'slsqp',
+    chunks: int = 1
+) -> Dict:
+    """Efficient frontier within the weight bounds, with the profile's behavioral_mvo portfolio located on it"""
+    frontier = efficient_frontier(
+        expected_returns, cov_matrix, n_points=n_points, method=method,
+        lower=constraints['min_weight'], upper=constraints['max_weight'], chunks=chunks
+    )
+    profile = BehavioralPortfolioOptimizer(user_profile).optimize_portfolio(
+        expected_returns, cov_matrix, constraints=constraints, method='behavioral_mvo', solver=solver
+    )
+    return {
+        'risk_aversion': frontier.risk_aversion,
+        'weights': frontier.weights,
+        'expected_return': frontier.expected_return,
+        'volatility': frontier.volatility,
+        'sharpe_ratio': frontier.sharpe_ratio,
+        'profile': {
+            'weights': np.asarray(profile['weights'], dtype=float),
+            **locate_on_frontier(frontier, profile['weights'], expected_returns, cov_matrix)
+        }
+    }
+
+
+def backtest_task(returns: Union[List[float], np.ndarray], risk_free_rate: float) -> Dict:
+    """Backtest metrics for one returns series"""
+    result = run_backtest(returns, risk_free_rate)
+    return {
+        'total_return': result.total_return,
+        'annual_return': result.annual_return,
+        'volatility': result.volatility,
+        'sharpe_ratio': result.sharpe_ratio,
+        'max_drawdown': result.max_drawdown,
+        'sortino_ratio': result.sortino_ratio,
+        'calmar_ratio': result.calmar_ratio
+    }
+
+
+def bootstrap_task(
+    returns: List[float],
+    benchmark_returns: Optional[List[float]],
+    risk_free_rate: float,
+    n_resamples: int,
+    method: str,
+    block_size: Optional[float],
+    confidence: float,
+    metric: str,
+    seed: Optional[int] = None
+) -> Dict:
+    """Bootstrap intervals for a returns series, and a paired test against a benchmark when given"""
+    options = dict(
+        n_resamples=n_resamples, method=method, block_size=block_size,
+        confidence=confidence, risk_free_rate=risk_free_rate, seed=seed
+    )
+    result = {'metrics': bootstrap_metrics(returns, **options)}
+    if benchmark_returns is not None:
+        result['comparison'] = paired_bootstrap_test(returns, benchmark_returns, metric=metric, **options)
+    return result
+
+
+def bias_analysis_task(trades: Union[List[Dict], pd.DataFrame]) -> Dict:
+    """Bias scores and detected events for a trade history (records or a DataFrame)"""
+    analyzer = BehavioralAnalyzer()
+    bias_scores, behavioral_events = analyzer.analyze_user_trades(trades)
+    return {
+        'bias_scores': {
+            'confirmation_bias': bias_scores.confirmation_bias,
+            'recency_bias': bias_scores.recency_bias,
+            'anchoring_bias': bias_scores.anchoring_bias,
+            'herding_behavior': bias_scores.herding_behavior,
+            'loss_aversion': bias_scores.loss_aversion,
+            'overconfidence': bias_scores.overconfidence,
+            'disposition_effect': bias_scores.disposition_effect,
+            'regret_aversion': bias_scores.regret_aversion,
+            'overall_bias_score': bias_scores.overall_score
+        },
+        'events': [
+            {
+                'event_type': event.event_type,
+                'severity': event.severity,
+                'timestamp': event.timestamp,
+                'context': event.context
+            }
+            for event in behavioral_events
+        ]
+    }
@@ -0,0 +1,184 @@
+"""
+Conditional Value-at-Risk portfolio optimization
+Rockafellar-Uryasev linear program over a scenario matrix, solved by HiGHS
+with delayed scenario (row) and asset (column) generation.
+"""
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+import math
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+
+@dataclass
+class CVaRResult:
+    weights: np.ndarray
+    cvar: float  # expected loss in the worst (1 - alpha) tail of the scenarios
+    var: float  # loss level of that tail
+    rounds: int  # restricted LPs solved
+    scenarios_used: int  # scenario rows in the final restricted LP
+    assets_used: int  # asset columns in the final restricted LP
+    converged: bool
+
+
+def scenario_cvar(losses: np.ndarray, alpha: float = 0.95) -> Tuple[float, float]:
+    """
+    (VaR, CVaR) of equally likely scenario losses: VaR is the
+    ceil((1 - alpha) S)-th largest loss and CVaR = min over zeta of
+    zeta + E[(L - zeta)+] / (1 - alpha), attained at zeta = VaR
+    """
+    losses = np.asarray(losses, dtype=float)
+    k = _tail_size(len(losses), alpha)
+    var = float(np.partition(losses, len(losses) - k)[len(losses) - k])
+    cvar = var + np.maximum(losses - var, 0.0).sum() / ((1.0 - alpha) * len(losses))
+    return var, float(cvar)
+
+
+def solve_min_cvar(
+    scenarios: np.ndarray,
+    alpha: float = 0.95,
+    lower: Union[float, np.ndarray] = 0.0,
+    upper: Union[float, np.ndarray] = 1.0,
+    expected_returns: Optional[np.ndarray] = None,
+    return_weight: float = 0.0,
+    tol: float = 1e-10,
+    max_rounds: int = 100
+) -> CVaRResult:
+    """
+    Long-only, fully invested weights minimizing
+    CVaR_alpha(-R w) - return_weight * mu'w
+
+    With u_s the excess loss of scenario s over the VaR level zeta:
+
+        min   zeta + sum(u) / ((1 - alpha) S) - return_weight * mu'w
+        s.t.  -R w - zeta - u <= 0,  sum(w) = 1,
+              lower <= w <= upper,  u >= 0
+
+    At the optimum only the ~(1 - alpha) S tail scenarios have u_s > 0
+    and only a few dozen assets sit above their lower bound, so the full
+    S x N program is not built. A restricted LP over a subset of scenario
+    rows and asset columns (other assets fixed at their lower bound) is
+    solved in its dual form, which has one row per asset and so suits
+    HiGHS dual simplex. Scenarios whose loss exceeds zeta and assets with
+    negative reduced cost are then added, and the loop stops when there
+    are none: the restricted solution is then optimal for the full LP.
+    Each restricted constraint matrix is assembled in sparse form.
+
+    Args:
+        scenarios: S x N matrix of equally likely asset returns
+        alpha: Confidence level of the tail (0.95 = worst 5% of scenarios)
+        lower, upper: Per-asset weight bounds (scalars or arrays)
+        expected_returns: mu for the return term (defaults to scenario means)
+        return_weight: Trade-off between tail loss and expected return
+        tol: Violation tolerance for adding scenarios and assets
+        max_rounds: Cap on restricted LP solves
+
+    Raises:
+        ValueError: if the bounds cannot sum to one or HiGHS fails
+    """
+    returns = np.asarray(scenarios, dtype=float)
+    n_scenarios, n_assets = returns.shape
+    lower = np.broadcast_to(np.asarray(lower, dtype=float), n_assets)
+    upper = np.broadcast_to(np.asarray(upper, dtype=float), n_assets)
+    span = upper - lower
+    budget = 1.0 - lower.sum()
+    if budget < -1e-12 or span.sum() < budget - 1e-12 or np.any(span < 0):
+        raise ValueError("Weight bounds are infeasible")
+    if expected_returns is None:
+        expected_returns = returns.mean(axis=0)
+    cost = -return_weight * np.asarray(expected_returns, dtype=float)
+    k = _tail_size(n_scenarios, alpha)
+    base_returns = returns @ lower  # scenario returns of the lower-bound holdings
+
+    # Start from the tail of a bound-respecting equal-spread portfolio and the
+    # assets that did best in it, enough of them to reach the budget
+    weights = lower + budget * span / max(span.sum(), 1e-300)
+    losses = -(returns @ weights)
+    rows = np.zeros(n_scenarios, dtype=bool)
+    rows[np.argsort(-losses)[:min(n_scenarios, 2 * k)]] = True
+    order = np.argsort((1.0 - alpha) * cost - returns[rows].mean(axis=0))
+    n_cols = max(int(np.searchsorted(np.cumsum(span[order]), budget)) + 1, 50)
+    cols = np.zeros(n_assets, dtype=bool)
+    cols[order[:min(n_assets, n_cols)]] = True
+
+    converged = False
+    for rounds in range(1, max_rounds + 1):
+        row_index = np.flatnonzero(rows)
+        col_index = np.flatnonzero(cols)
+        offsets, tail_prices, budget_price = _restricted_dual(
+            returns[np.ix_(row_index, col_index)],
+            base_returns[row_index],
+            span[col_index],
+            cost[col_index],
+            budget,
+            1.0 / ((1.0 - alpha) * n_scenarios)
+        )
+        weights = lower.copy()
+        weights[col_index] += offsets
+        losses = -(returns @ weights)
+
+        # zeta: the largest optimal VaR level of the restricted problem
+        zeta = np.partition(losses[row_index], len(row_index) - k)[len(row_index) - k]
+        reduced_cost = cost - returns[row_index].T @ tail_prices - budget_price
+        new_rows = np.flatnonzero(~rows & (losses > zeta + tol))
+        new_cols = np.flatnonzero(~cols & (reduced_cost < -tol))
+        if new_rows.size == 0 and new_cols.size == 0:
+            converged = True
+            break
+        rows[new_rows[np.argsort(-losses[new_rows])[:k]]] = True
+        cols[new_cols[np.argsort(reduced_cost[new_cols])[:50]]] = True
+
+    weights = np.clip(weights, lower, upper)
+    weights = weights / weights.sum()
+    var, cvar = scenario_cvar(-(returns @ weights), alpha)
+    return CVaRResult(
+        weights=weights,
+        cvar=cvar,
+        var=var,
+        rounds=rounds,
+        scenarios_used=int(rows.sum()),
+        assets_used=int(cols.sum()),
+        converged=converged
+    )
+
+
+def _tail_size(n_scenarios: int, alpha: float) -> int:
+    return min(max(math.ceil((1.0 - alpha) * n_scenarios - 1e-9), 1), n_scenarios)
+
+
+def _restricted_dual(returns, base_returns, span, cost, budget, tail_weight):
+    """
+    Dual of the restricted Rockafellar-Uryasev LP in v = w - lower:
+
+        min   base'q - budget * nu + span'b
+        s.t.  R'q + nu - b <= cost,  sum(q) = 1,
+              0 <= q <= tail_weight,  b >= 0
+
+    Returns (v, q, nu); v is recovered from the row marginals.
+    """
+    m, n = returns.shape
+    objective = np.concatenate([base_returns, [-budget], span])
+    a_ub = sparse.hstack([
+        sparse.csr_matrix(returns.T),
+        sparse.csr_matrix(np.ones((n, 1))),
+        -sparse.identity(n, format='csr')
+    ], format='csr')
+    a_eq = sparse.csr_matrix(np.concatenate([np.ones(m), np.zeros(1 + n)])[None, :])
+    bounds = np.column_stack([
+        np.concatenate([np.zeros(m), [-np.inf], np.zeros(n)]),
+        np.concatenate([np.full(m, tail_weight), [np.inf], np.full(n, np.inf)])
+    ])
+    solution = linprog(
+        objective,
+        A_ub=a_ub,
+        b_ub=cost,
+        A_eq=a_eq,
+        b_eq=[1.0],
+        bounds=bounds,
+        method='highs-ds'
+    )
+    if solution.status != 0:
+        raise ValueError(f"CVaR linear program failed: {solution.message}")
+    offsets = np.clip(-solution.ineqlin.marginals, 0.0, span)
+    return offsets, solution.x[:m], solution.x[m]
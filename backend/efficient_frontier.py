@@ -0,0 +1,250 @@
+"""
+Efficient frontier
+Mean-variance frontier under the budget/box constraints, traced by a
+warm-started sweep of the risk-aversion or target-return parameter.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+from qp_solver import estimate_lipschitz, solve_active_set_qp, solve_box_budget_qp
+
+
+FRONTIER_METHODS = ('risk_aversion', 'target_return')
+
+
+@dataclass
+class FrontierResult:
+    risk_aversion: np.ndarray  # (P,) delta of each point; inf at the minimum-variance end
+    weights: np.ndarray  # (P, N)
+    expected_return: np.ndarray
+    volatility: np.ndarray
+    sharpe_ratio: np.ndarray
+    solves: int  # QP solves, including root-finding steps for target returns
+    warm_solves: int  # solves finished by the warm-started active-set step
+
+
+def efficient_frontier(
+    expected_returns: np.ndarray,
+    cov_matrix,
+    n_points: int = 25,
+    method: str = 'target_return',
+    lower: float = 0.0,
+    upper: float = 1.0,
+    chunks: int = 1,
+    max_workers: Optional[int] = None
+) -> FrontierResult:
+    """
+    Portfolios minimizing 0.5 w'Σw - t mu'w over sum(w) = 1,
+    lower <= w <= upper, for t = 1 / risk_aversion from 0 (minimum
+    variance) up to the smallest t that reaches the maximum-return
+    portfolio
+
+    Between changes of the active set the solution is affine in t, so
+    each point is warm-started from its neighbour with the exact
+    active-set step of solve_active_set_qp and usually costs one or two
+    small linear solves; FISTA is only the fallback.
+
+    Args:
+        cov_matrix: Dense covariance or a FactorCovariance
+        method: 'risk_aversion' spaces t evenly; 'target_return' spaces
+            expected returns evenly between the two ends and finds each
+            t by safeguarded regula falsi (returns are nondecreasing in t)
+        lower, upper: Weight bounds
+        chunks: Split the sweep into this many contiguous chunks, each
+            warm-started within itself, run on a thread pool
+        max_workers: Threads for the chunks (defaults to chunks)
+
+    Raises:
+        ValueError: for an unknown method or infeasible bounds
+    """
+    if method not in FRONTIER_METHODS:
+        raise ValueError(f"Unknown frontier method: {method}")
+    returns = np.asarray(expected_returns, dtype=float)
+    n = len(returns)
+    if lower * n > 1.0 + 1e-12 or upper * n < 1.0 - 1e-12:
+        raise ValueError("Weight bounds are infeasible")
+    lipschitz = estimate_lipschitz(lambda v: cov_matrix @ v, n)
+    sweep = _Sweep(returns, cov_matrix, lower, upper, lipschitz)
+
+    start = sweep.solve(0.0, None)
+    t_max, end = sweep.max_return_end(_max_return(returns, lower, upper), start)
+
+    if method == 'risk_aversion':
+        targets = np.linspace(0.0, t_max, n_points)
+    else:
+        targets = np.linspace(start @ returns, end @ returns, n_points)
+    pieces = [piece for piece in np.array_split(np.arange(n_points), max(1, min(chunks, n_points))) if piece.size]
+
+    def run(piece):
+        # One sweep per chunk keeps the solve counters thread-local
+        chunk = _Sweep(returns, cov_matrix, lower, upper, lipschitz)
+        return chunk, chunk.run(method, targets[piece], (0.0, start), (t_max, end))
+
+    if len(pieces) == 1:
+        results = [run(pieces[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers or len(pieces)) as pool:
+            results = list(pool.map(run, pieces))
+
+    parameters = np.concatenate([r[1][0] for r in results])
+    weights = np.vstack([r[1][1] for r in results])
+    expected_return = weights @ returns
+    volatility = np.sqrt(np.maximum(np.sum((weights @ cov_matrix) * weights, axis=1), 0.0))
+    with np.errstate(divide='ignore'):
+        risk_aversion = np.where(parameters > 0, 1.0 / parameters, np.inf)
+    return FrontierResult(
+        risk_aversion=risk_aversion,
+        weights=weights,
+        expected_return=expected_return,
+        volatility=volatility,
+        sharpe_ratio=np.divide(expected_return, volatility, out=np.zeros(len(weights)), where=volatility > 0),
+        solves=sweep.solves + sum(r[0].solves for r in results),
+        warm_solves=sweep.warm_solves + sum(r[0].warm_solves for r in results)
+    )
+
+
+def locate_on_frontier(
+    frontier: FrontierResult,
+    weights: np.ndarray,
+    expected_returns: np.ndarray,
+    cov_matrix
+) -> Dict:
+    """
+    Where a portfolio sits relative to the frontier: its return and risk,
+    the frontier return at the same volatility (interpolated) and the gap
+    to it, and the nearest frontier point by volatility
+    """
+    weights = np.asarray(weights, dtype=float)
+    expected_return = float(weights @ expected_returns)
+    volatility = float(np.sqrt(max(weights @ (cov_matrix @ weights), 0.0)))
+    frontier_return = float(np.interp(volatility, frontier.volatility, frontier.expected_return))
+    return {
+        'expected_return': expected_return,
+        'volatility': volatility,
+        'frontier_return': frontier_return,
+        'return_gap': frontier_return - expected_return,
+        'nearest_index': int(np.argmin(np.abs(frontier.volatility - volatility)))
+    }
+
+
+def _max_return(returns: np.ndarray, lower: float, upper: float) -> float:
+    """Highest mu'w over the budget/box set: fill the best assets first"""
+    weights = np.full(len(returns), lower)
+    room = 1.0 - weights.sum()
+    for i in np.argsort(-returns):
+        add = min(upper - lower, room)
+        weights[i] += add
+        room -= add
+        if room <= 0:
+            break
+    return float(weights @ returns)
+
+
+class _Sweep:
+    """Warm-started solves along t, counting how many took the warm step"""
+
+    def __init__(self, returns, cov, lower, upper, lipschitz):
+        self.returns = returns
+        self.cov = cov
+        self.lower = np.full(len(returns), lower)
+        self.upper = np.full(len(returns), upper)
+        self.lipschitz = lipschitz
+        self.solves = 0
+        self.warm_solves = 0
+
+    def solve(self, t: float, x_prev: Optional[np.ndarray]) -> np.ndarray:
+        self.solves += 1
+        linear = t * self.returns
+        if x_prev is not None:
+            warm = solve_active_set_qp(self.cov, linear, self.lower, self.upper, x_prev)
+            if warm is not None:
+                self.warm_solves += 1
+                return warm[0]
+        result = solve_box_budget_qp(
+            lambda v: self.cov @ v, linear, self.lower, self.upper, self.lipschitz, x0=x_prev
+        )
+        # Snap the iterative solution onto its active set
+        polished = solve_active_set_qp(self.cov, linear, self.lower, self.upper, result.x)
+        return result.x if polished is None else polished[0]
+
+    def max_return_end(self, max_return: float, start: np.ndarray) -> Tuple[float, np.ndarray]:
+        """Smallest power-of-two t whose solution reaches max_return"""
+        tol = 1e-9 * (1.0 + abs(max_return))
+        t, x = 1.0, start
+        for _ in range(200):
+            x = self.solve(t, x)
+            if x @ self.returns >= max_return - tol:
+                return t, x
+            t *= 2.0
+        return t, x
+
+    def run(self, method: str, targets: np.ndarray, start: Tuple, end: Tuple):
+        """Solve the targets in order; start and end are (t, weights) at the two ends"""
+        parameters = np.empty(len(targets))
+        weights = np.empty((len(targets), len(self.returns)))
+        t, x = start
+        slope = None  # dt / d(return) between the last two points
+        for k, target in enumerate(targets):
+            if method == 'risk_aversion':
+                t, x = target, self.solve(target, x)
+            else:
+                t_prev, r_prev = t, x @ self.returns
+                guess = None if slope is None else t + slope * (target - r_prev)
+                t, x = self._solve_target(target, (t, x), end, guess)
+                if x @ self.returns > r_prev:
+                    slope = (t - t_prev) / (x @ self.returns - r_prev)
+            parameters[k], weights[k] = t, x
+        return parameters, weights
+
+    def _solve_target(self, target, lo, hi, guess=None, max_steps=60):
+        """
+        t with mu'w(t) = target, bracketed by the solved points lo and hi,
+        by regula falsi with the Illinois step
+
+        The bracket to the maximum-return end is wide, so it is first
+        narrowed by stepping out from lo to a guess extrapolated from the
+        previous points (returns are affine in t between active-set
+        changes, so the guess is often exact).
+        """
+        tol = 1e-10 * (1.0 + abs(target))
+        (t_lo, x_lo), (t_hi, x_hi) = lo, hi
+        f_lo = x_lo @ self.returns - target
+        if f_lo >= -tol:
+            return lo
+        f_hi = x_hi @ self.returns - target
+        if f_hi <= tol:
+            return hi
+        if guess is not None and t_lo < guess < t_hi:
+            # Step out from lo, doubling until the target is overshot
+            step = guess - t_lo
+            while t_lo + step < t_hi:
+                t = t_lo + step
+                x = self.solve(t, x_lo)
+                f = x @ self.returns - target
+                if abs(f) <= tol:
+                    return t, x
+                if f > 0:
+                    t_hi, x_hi, f_hi = t, x, f
+                    break
+                t_lo, x_lo, f_lo = t, x, f
+                step *= 2.0
+        side = 0
+        for _ in range(max_steps):
+            t = (t_lo * f_hi - t_hi * f_lo) / (f_hi - f_lo)
+            x = self.solve(t, x_lo if side <= 0 else x_hi)
+            f = x @ self.returns - target
+            if abs(f) <= tol or t_hi - t_lo <= 1e-14 * t_hi:
+                return t, x
+            if f < 0:
+                t_lo, x_lo, f_lo = t, x, f
+                if side < 0:
+                    f_hi *= 0.5
+                side = -1
+            else:
+                t_hi, x_hi, f_hi = t, x, f
+                if side > 0:
+                    f_lo *= 0.5
+                side = 1
+        return t, x
@@ -0,0 +1,185 @@
+"""
+Lot matching
+Pairs sells with the buys they close (FIFO, LIFO or average cost) once per
+trade history, as arrays of closed lots for the bias detectors.
+"""
+from dataclasses import dataclass
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+
+
+LOT_METHODS = ('fifo', 'lifo', 'average')
+
+# Quantities below this (relative to the quantity traded) are rounding slivers
+_QUANTITY_TOL = 1e-9
+
+
+@dataclass
+class ClosedLots:
+    """Bought-then-sold quantities, one entry per (buy lot, closing sell) pair"""
+    symbol: np.ndarray
+    open_date: np.ndarray  # datetime64 of the buy (average cost: the first buy of the position)
+    close_date: np.ndarray  # datetime64 of the sell
+    open_price: np.ndarray  # buy price (average cost: the position's average cost)
+    close_price: np.ndarray
+    quantity: np.ndarray
+    pnl: np.ndarray  # (close_price - open_price) * quantity
+    holding_days: np.ndarray  # whole days between open and close
+    sell_index: np.ndarray  # position of the closing sell among the date-ordered trades
+    n_sells: int  # sells in the history, including those that closed nothing
+
+    def __len__(self) -> int:
+        return len(self.quantity)
+
+    @property
+    def return_pct(self) -> np.ndarray:
+        return self.close_price / self.open_price - 1
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({name: value for name, value in vars(self).items() if name != 'n_sells'})
+
+
+def match_lots(trades: pd.DataFrame, method: str = 'fifo') -> ClosedLots:
+    """
+    Closed lots of a trade history (symbol, action, price, trade_date and
+    optionally quantity, which defaults to one share)
+
+    Trades are taken in date order, same-day trades in their given order.
+    A sell closes open quantity of its symbol oldest-first ('fifo'),
+    newest-first ('lifo'), or at the running average cost ('average');
+    quantity sold beyond the open position closes nothing.
+
+    FIFO needs no per-trade loop: a sell covers an interval of the
+    symbol's cumulative bought quantity, so lots are the overlaps of the
+    sell intervals with the buy intervals, found by searchsorted. LIFO and
+    average cost walk the trades once.
+
+    Raises:
+        ValueError: for an unknown method
+    """
+    if method not in LOT_METHODS:
+        raise ValueError(f"Unknown lot matching method: {method}")
+    dates = pd.to_datetime(trades['trade_date'])
+    if not dates.is_monotonic_increasing:
+        order = np.argsort(dates.to_numpy(), kind='stable')
+        trades, dates = trades.iloc[order], dates.iloc[order]
+    columns = {
+        'symbol': trades['symbol'].to_numpy(),
+        'is_buy': (trades['action'] == 'BUY').to_numpy(),
+        'is_sell': (trades['action'] == 'SELL').to_numpy(),
+        'price': trades['price'].to_numpy(dtype=float),
+        'quantity': (trades['quantity'].to_numpy(dtype=float) if 'quantity' in trades
+                     else np.ones(len(trades))),
+        'date': dates.to_numpy()
+    }
+    if method == 'fifo':
+        buy_rows, sell_rows, quantity = _match_fifo(
+            columns['symbol'], columns['is_buy'], columns['is_sell'], columns['quantity']
+        )
+        # In order of the closing sells, oldest buy first
+        order = np.lexsort((buy_rows, sell_rows))
+        buy_rows, sell_rows, quantity = buy_rows[order], sell_rows[order], quantity[order]
+        return _closed_lots(columns, buy_rows, sell_rows, quantity, columns['price'][buy_rows])
+    return _match_sequential(columns, method)
+
+
+def _match_fifo(symbol, is_buy, is_sell, quantity):
+    """(buy row, sell row, quantity) of every FIFO lot"""
+    codes = pd.factorize(symbol)[0]
+    # Rows grouped by symbol, in date order within each symbol
+    order = np.lexsort((np.arange(len(codes)), codes))
+    codes, buy, sell = codes[order], is_buy[order], is_sell[order]
+    bought = np.where(buy, quantity[order], 0.0)
+    sold = np.where(sell, quantity[order], 0.0)
+
+    # Cumulative quantities within each symbol
+    cum_bought = pd.Series(bought).groupby(codes).cumsum().to_numpy()
+    cum_sold = pd.Series(sold).groupby(codes).cumsum().to_numpy()
+
+    # Sells cannot close more than has been bought so far:
+    # closed_j = min(closed_{j-1} + sold_j, bought_j) = sold_j + min(0, min_{i<=j}(bought_i - sold_i))
+    shortfall = pd.Series(np.minimum(cum_bought - cum_sold, 0.0)).groupby(codes).cummin().to_numpy()
+    closed = cum_sold + shortfall
+
+    # Shift each symbol onto its own stretch of one global quantity axis
+    totals = np.bincount(codes, weights=bought)
+    offset = np.concatenate([[0.0], np.cumsum(totals)[:-1]])[codes]
+    buy_end = (cum_bought + offset)[buy]
+    buy_start = buy_end - bought[buy]
+    first_of_symbol = np.r_[True, codes[1:] != codes[:-1]]
+    closed_before = np.where(first_of_symbol, 0.0, np.r_[0.0, closed[:-1]])
+    sell_rows = np.flatnonzero(sell)
+    closed_start = (closed_before + offset)[sell_rows]
+    closed_end = (closed + offset)[sell_rows]
+
+    tol = _QUANTITY_TOL * max(float(totals.max(initial=0.0)), 1.0)
+    live = closed_end - closed_start > tol
+    sell_rows, closed_start, closed_end = sell_rows[live], closed_start[live], closed_end[live]
+
+    # Buys overlapping each sell's interval
+    first = np.searchsorted(buy_end, closed_start + tol, side='left')
+    last = np.searchsorted(buy_start, closed_end - tol, side='left') - 1
+    counts = np.maximum(last - first + 1, 0)
+    pair_sell = np.repeat(np.arange(len(sell_rows)), counts)
+    pair_buy = np.repeat(first, counts) + (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts))
+    lot_quantity = (np.minimum(closed_end[pair_sell], buy_end[pair_buy])
+                    - np.maximum(closed_start[pair_sell], buy_start[pair_buy]))
+    keep = lot_quantity > tol
+
+    buy_positions = np.flatnonzero(buy)
+    return (order[buy_positions[pair_buy[keep]]], order[sell_rows[pair_sell[keep]]], lot_quantity[keep])
+
+
+def _match_sequential(columns: Dict, method: str) -> ClosedLots:
+    """LIFO or average-cost lots by one walk over the trades"""
+    symbol, price, quantity = columns['symbol'], columns['price'], columns['quantity']
+    open_lots: Dict = {}  # symbol -> [[buy row, open price, quantity], ...]
+    buy_rows: List[int] = []
+    sell_rows: List[int] = []
+    lot_quantity: List[float] = []
+    open_price: List[float] = []
+    for i in range(len(symbol)):
+        lots = open_lots.setdefault(symbol[i], [])
+        if columns['is_buy'][i]:
+            if method == 'average' and lots:
+                # One lot at the running average cost, dated by the position's first buy
+                held = lots[0][2] + quantity[i]
+                lots[0][1] = (lots[0][1] * lots[0][2] + price[i] * quantity[i]) / held
+                lots[0][2] = held
+            else:
+                lots.append([i, price[i], quantity[i]])
+        elif columns['is_sell'][i]:
+            remaining = quantity[i]
+            while remaining > _QUANTITY_TOL * quantity[i] and lots:
+                lot = lots[-1]  # LIFO; average cost keeps a single lot
+                take = min(remaining, lot[2])
+                buy_rows.append(lot[0])
+                sell_rows.append(i)
+                lot_quantity.append(take)
+                open_price.append(lot[1])
+                lot[2] -= take
+                remaining -= take
+                if lot[2] <= _QUANTITY_TOL * take:
+                    lots.pop()
+    return _closed_lots(
+        columns, np.array(buy_rows, dtype=int), np.array(sell_rows, dtype=int),
+        np.array(lot_quantity, dtype=float), np.array(open_price, dtype=float)
+    )
+
+
+def _closed_lots(columns: Dict, buy_rows, sell_rows, quantity, open_price) -> ClosedLots:
+    open_date, close_date = columns['date'][buy_rows], columns['date'][sell_rows]
+    close_price = columns['price'][sell_rows]
+    return ClosedLots(
+        symbol=columns['symbol'][sell_rows],
+        open_date=open_date,
+        close_date=close_date,
+        open_price=open_price,
+        close_price=close_price,
+        quantity=quantity,
+        pnl=(close_price - open_price) * quantity,
+        holding_days=(close_date - open_date) // np.timedelta64(1, 'D'),
+        sell_index=sell_rows,
+        n_sells=int(columns['is_sell'].sum())
+    )
@@ -2,10 +2,11 @@
 FastAPI Application for Behavioral Portfolio Optimizer
 Main API server with endpoints for portfolio management and bias detection
 """
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, TypeAdapter, ValidationError
 from typing import List, Dict, Optional
 import uvicorn
 from datetime import datetime
@@ -14,11 +15,26 @@ import traceback
 
 # Import core modules
 from database import UserProfile, Portfolio, Position, get_db, init_db
-from behavioral_analyzer import BehavioralAnalyzer, detect_real_time_bias
-from portfolio_optimizer import BehavioralPortfolioOptimizer, calculate_portfolio_metrics
+from behavioral_analyzer import detect_real_time_bias
+from portfolio_optimizer import calculate_portfolio_metrics
 from data_collector import DataCollector
 from sentiment_analyzer import SentimentAnalyzer
-from backtesting import run_backtest
+from risk_model import ESTIMATORS, RiskModel
+from black_litterman import views_from_specs
+from task_executor import ExecutorBusyError, JobTimeoutError, executor_from_env
+from optimization_cache import cache_from_env, optimization_fingerprint
+from reoptimization import ReoptimizationStore
+from efficient_frontier import FRONTIER_METHODS
+from telemetry import TelemetryRegistry
+from rebalancing import current_weights_from_positions, trade_list
+from backtesting import StreamingMetrics
+from bootstrap import BOOTSTRAP_METHODS
+from binary_payloads import (
+    UnsupportedPayloadError, decode_returns, decode_table, is_binary, request_body_schema
+)
+from compute_tasks import (
+    optimize_task, optimize_batch_task, frontier_task, backtest_task, bootstrap_task, bias_analysis_task
+)
 import numpy as np
 import pandas as pd
 
@@ -32,6 +48,19 @@ app = FastAPI(
 # Initialize helpers
 data_collector = DataCollector()
 sentiment_analyzer = SentimentAnalyzer()
+risk_model = RiskModel(data_collector)
+
+# CPU-bound work (solves, backtests, bias analysis) runs off the event loop
+compute_executor = executor_from_env()
+
+# Repeated optimize requests (same profile, universe, constraints, method)
+optimization_cache = cache_from_env()
+
+# Last solution per portfolio, for warm starts and near-identical re-requests
+reoptimization_store = ReoptimizationStore()
+
+# Solver timings and convergence per method, aggregated in the API process
+telemetry_registry = TelemetryRegistry()
 
 # CORS configuration
 app.add_middleware(
@@ -78,12 +107,36 @@ class TradeRequest(BaseModel):
     trade_date: datetime
 
 
+class BlackLittermanView(BaseModel):
+    """One Black-Litterman view: a portfolio of assets and its expected return"""
+    weights: Dict[str, float]  # pick-matrix row, e.g. {"AAPL": 1, "MSFT": -1}
+    expected_return: float
+    confidence: float = 0.5  # 0-1
+    variance: Optional[float] = None  # explicit view variance, overrides confidence
+
+
+class TransactionCosts(BaseModel):
+    """Trading costs for rebalancing, in units of portfolio weight"""
+    linear_cost: float = 0.001  # proportional cost (0.001 = 10 bp of the amount traded)
+    quadratic_cost: float = 0.0  # market-impact coefficient
+    no_trade_band: float = 0.0  # skip trades smaller than this weight change
+
+
 class OptimizationRequest(BaseModel):
     """Portfolio optimization request"""
     portfolio_id: str
     assets: List[str]
     method: str = "behavioral_mvo"
     constraints: Optional[Dict] = None
+    solver: str = "slsqp"  # 'slsqp' or 'qp' (analytic-gradient engine)
+    estimator: str = "ledoit_wolf"  # 'sample', 'ledoit_wolf', 'ewma'
+    lookback_window: int = 252
+    incremental: bool = True  # warm-start from / reuse this portfolio's last solve
+    views: Optional[List[BlackLittermanView]] = None  # black_litterman only
+    market_caps: Optional[Dict[str, float]] = None  # equilibrium weights (black_litterman)
+    sentiment_views: bool = False  # add views from SentimentAnalyzer (black_litterman)
+    rebalance: bool = False  # trade from the portfolio's current positions (behavioral_mvo)
+    transaction_costs: TransactionCosts = TransactionCosts()
 
 
 class OptimizationResponse(BaseModel):
@@ -95,6 +148,66 @@ class OptimizationResponse(BaseModel):
     expected_volatility: float
     sharpe_ratio: float
     behavioral_adjustments: Dict
+    risk_contributions: Optional[Dict[str, float]] = None
+    solve_mode: str = "cold"  # 'cached', 'reused', 'warm' or 'cold'
+    trades: Optional[List[Dict]] = None  # rebalance only, largest first
+    turnover: Optional[float] = None
+    transaction_cost: Optional[float] = None
+    telemetry: Optional[Dict] = None  # of the solve that produced these weights
+
+
+class BatchOptimizationRequest(BaseModel):
+    """Batch optimization request: many investor profiles, one universe"""
+    assets: List[str]
+    profiles: List[Dict]  # risk_tolerance, loss_aversion_coefficient, overconfidence_score
+    method: str = "behavioral_mvo"
+    constraints: Optional[Dict] = None
+    estimator: str = "ledoit_wolf"
+    lookback_window: int = 252
+
+
+class BatchOptimizationResponse(BaseModel):
+    """Batch optimization response (one weights row per profile)"""
+    method: str
+    assets: List[str]
+    weights: List[List[float]]
+    expected_return: List[float]
+    expected_volatility: List[float]
+    sharpe_ratio: List[float]
+    telemetry: Optional[Dict] = None
+
+
+class FrontierRequest(BaseModel):
+    """Efficient frontier request; the profile comes from portfolio_id when given"""
+    assets: List[str]
+    portfolio_id: Optional[str] = None
+    n_points: int = 25
+    method: str = "target_return"  # 'target_return' or 'risk_aversion' spacing
+    constraints: Optional[Dict] = None  # min_weight/max_weight bound the frontier
+    solver: str = "slsqp"  # for the profile's behavioral_mvo portfolio
+    estimator: str = "ledoit_wolf"
+    lookback_window: int = 252
+
+
+class FrontierResponse(BaseModel):
+    """Frontier points (lowest risk first) and where the user's portfolio sits"""
+    method: str
+    assets: List[str]
+    points: List[Dict]  # risk_aversion, expected_return, volatility, sharpe_ratio, weights
+    profile: Dict  # weights, expected_return, volatility, frontier_return, return_gap, nearest_index
+
+
+class BootstrapRequest(BaseModel):
+    """Bootstrap confidence intervals; benchmark_returns adds a paired test on metric"""
+    returns: List[float]
+    benchmark_returns: Optional[List[float]] = None
+    risk_free_rate: float = 0.02
+    n_resamples: int = 5000
+    method: str = "stationary"  # 'stationary' or 'block'
+    block_size: Optional[float] = None  # mean block length; defaults to T^(1/3)
+    confidence: float = 0.95
+    metric: str = "sharpe_ratio"
+    seed: Optional[int] = None
 
 
 class BiasScoreResponse(BaseModel):
@@ -119,6 +232,207 @@ class BiasEventResponse(BaseModel):
     context: Dict
 
 
+# ============================================================================
+# Helpers
+# ============================================================================
+
+def _mock_market_inputs(n_assets: int):
+    """Mock expected returns and covariance for the demo universe"""
+    expected_returns = np.array([0.085, 0.095, 0.075])[:n_assets]
+    cov_matrix = np.array([[0.04, 0.015, 0.010],
+                           [0.015, 0.05, 0.012],
+                           [0.010, 0.012, 0.035]])[:n_assets, :n_assets]
+    return expected_returns, cov_matrix
+
+
+async def _market_inputs(assets: List[str], estimator: str, lookback_window: int):
+    """
+    Expected returns and covariance for the assets from cached market history,
+    falling back to the mock inputs when history is unavailable
+    """
+    if estimator not in ESTIMATORS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown estimator: {estimator}"
+        )
+
+    try:
+        estimate = await asyncio.to_thread(
+            risk_model.estimate, assets, lookback_window, estimator
+        )
+        return estimate.expected_returns, estimate.cov_matrix
+    except Exception as e:
+        print("Risk model unavailable, using mock market inputs:", e)
+        return _mock_market_inputs(len(assets))
+
+
+def _normalize_constraints(constraints: Optional[Dict], n_assets: int) -> Dict:
+    """Fill constraint defaults and make them feasible for n_assets"""
+    if not isinstance(constraints, dict):
+        constraints = {}
+
+    min_weight = float(constraints.get('min_weight', 0.01))
+    max_weight = float(constraints.get('max_weight', 0.30))
+    max_positions = constraints.get('max_positions')
+
+    # With a holdings cap, min_weight applies to held assets only, so the
+    # default is no minimum count rather than every asset
+    default_min_positions = n_assets if max_positions is None else 0
+    min_positions = int(constraints.get('min_positions', default_min_positions))
+
+    # Min positions cannot exceed number of assets
+    if min_positions > n_assets:
+        min_positions = n_assets
+
+    normalized = {}
+    held_limit = n_assets
+    if max_positions is not None:
+        max_positions = min(max(int(max_positions), min_positions, 1), n_assets)
+        held_limit = max_positions
+        normalized['max_positions'] = max_positions
+        normalized['time_budget'] = float(constraints.get('time_budget', 2.0))
+
+    # Make sure max_weight allows weights to sum to 1
+    if max_weight * held_limit < 1.0:
+        max_weight = 1.0 / held_limit
+
+    # CVaR settings (method='cvar')
+    if 'cvar_alpha' in constraints:
+        normalized['cvar_alpha'] = min(max(float(constraints['cvar_alpha']), 0.5), 0.999)
+    if 'cvar_scenarios' in constraints:
+        normalized['cvar_scenarios'] = min(max(int(constraints['cvar_scenarios']), 100), 100000)
+
+    return {
+        'min_weight': min_weight,
+        'max_weight': max_weight,
+        'min_positions': min_positions,
+        **normalized
+    }
+
+
+def _black_litterman_views(request: OptimizationRequest) -> Optional[Dict]:
+    """Views dict for the optimizer from the request's views, market caps and sentiment"""
+    views = {}
+    try:
+        if request.views:
+            views.update(views_from_specs([view.model_dump() for view in request.views], request.assets))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if request.market_caps:
+        caps = {symbol.upper(): cap for symbol, cap in request.market_caps.items()}
+        views['market_weights'] = [float(caps.get(symbol.upper(), 0.0)) for symbol in request.assets]
+
+    if request.sentiment_views:
+        sentiments = [sentiment_analyzer.get_sentiment(symbol) for symbol in request.assets]
+        views['sentiment_scores'] = [s['sentiment_score'] for s in sentiments]
+        views['sentiment_confidence'] = [s['confidence'] for s in sentiments]
+
+    return views or None
+
+
+def _portfolio_profile(db, portfolio_id: Optional[str]):
+    """
+    (portfolio, user, behavioral profile dict) for a portfolio id; a missing
+    portfolio or user gets the demo defaults
+    """
+    # Get portfolio (optional - use defaults if not found for demo)
+    portfolio = None
+    if portfolio_id is not None:
+        portfolio = db.query(Portfolio).filter(
+            Portfolio.portfolio_id == portfolio_id
+        ).first()
+
+    # Use defaults if portfolio doesn't exist (for demo)
+    if portfolio:
+        user = db.query(UserProfile).filter(
+            UserProfile.user_id == portfolio.user_id
+        ).first()
+    else:
+        user = None
+
+    # User profile with defaults for demo
+    user_profile_dict = {
+        'risk_tolerance': user.risk_tolerance if user else 0.5,
+        'loss_aversion_coefficient': user.loss_aversion_coefficient if user else 2.25,
+        'overconfidence_score': user.overconfidence_score if user else 0.5,
+        'experience_years': user.experience_years if user else 0,
+        'investment_objective': user.investment_objective if user else 'balanced'
+    }
+    return portfolio, user, user_profile_dict
+
+
+def _current_holdings(db, portfolio, assets: List[str]):
+    """
+    Current weights, book value and per-share prices of the universe from
+    the portfolio's Position rows (all cash when it has none)
+    """
+    positions = []
+    if portfolio is not None:
+        positions = db.query(Position).filter(
+            Position.portfolio_id == portfolio.portfolio_id
+        ).all()
+
+    universe = {symbol.upper(): symbol for symbol in assets}
+    held = [pos for pos in positions if pos.symbol.upper() in universe]
+    value = sum(pos.current_value or 0.0 for pos in held)
+    if value <= 0 and portfolio is not None:
+        value = portfolio.total_value
+    prices = {
+        universe[pos.symbol.upper()]: pos.current_value / pos.quantity
+        for pos in held if pos.quantity and pos.current_value
+    }
+    return current_weights_from_positions(held, assets), value or None, prices
+
+
+# JSON bodies of the endpoints that also take binary uploads
+RETURNS_BODY = TypeAdapter(List[float])
+TRADES_BODY = TypeAdapter(List[Dict])
+
+
+async def _read_body(request: Request, json_body: TypeAdapter, decode):
+    """
+    Request body as JSON validated by json_body, or decoded by decode for
+    the binary media types (binary_payloads); decoding runs in a thread as
+    Parquet bodies are decompressed
+    """
+    body = await request.body()
+    content_type = request.headers.get('content-type')
+    if not is_binary(content_type):
+        try:
+            return json_body.validate_json(body)
+        except ValidationError as e:
+            raise RequestValidationError([{**error, 'loc': ('body', *error['loc'])} for error in e.errors()])
+    try:
+        return await asyncio.to_thread(decode, body, content_type)
+    except UnsupportedPayloadError as e:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+async def _run_compute(func, *args):
+    """Run a compute_tasks job on the process pool, mapping pool errors to HTTP"""
+    try:
+        return await compute_executor.run(func, *args)
+    except ExecutorBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except JobTimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e)
+        )
+
+
 # ============================================================================
 # Endpoints
 # ============================================================================
@@ -215,68 +529,73 @@ async def optimize_portfolio(request: OptimizationRequest, db = Depends(get_db))
     Optimize portfolio with behavioral adjustments
     """
     try:
-        # Get portfolio (optional - use defaults if not found for demo)
-        portfolio = db.query(Portfolio).filter(
-            Portfolio.portfolio_id == request.portfolio_id
-        ).first()
-
-        # Use defaults if portfolio doesn't exist (for demo)
-        if portfolio:
-            user = db.query(UserProfile).filter(
-                UserProfile.user_id == portfolio.user_id
-            ).first()
-        else:
-            user = None
-
-        # User profile with defaults for demo
-        user_profile_dict = {
-            'risk_tolerance': user.risk_tolerance if user else 0.5,
-            'loss_aversion_coefficient': user.loss_aversion_coefficient if user else 2.25,
-            'overconfidence_score': user.overconfidence_score if user else 0.5,
-            'experience_years': user.experience_years if user else 0,
-            'investment_objective': user.investment_objective if user else 'balanced'
-        }
+        portfolio, user, user_profile_dict = _portfolio_profile(db, request.portfolio_id)
 
-        optimizer = BehavioralPortfolioOptimizer(user_profile_dict)
-
-        # Mock market data
+        # Market inputs from cached price history
         n_assets = len(request.assets)
-        np.random.seed(hash(request.portfolio_id) % 2**32)  # Deterministic for demo
-        expected_returns = np.array([0.085, 0.095, 0.075])[:n_assets]
-        cov_matrix = np.array([[0.04, 0.015, 0.010],
-                               [0.015, 0.05, 0.012],
-                               [0.010, 0.012, 0.035]])[:n_assets, :n_assets]
+        expected_returns, cov_matrix = await _market_inputs(
+            request.assets, request.estimator, request.lookback_window
+        )
 
         # Ensure constraints are feasible for the number of assets
-        constraints = request.constraints or {}
-        if not isinstance(constraints, dict):
-            constraints = {}
-
-        min_weight = float(constraints.get('min_weight', 0.01))
-        max_weight = float(constraints.get('max_weight', 0.30))
-        min_positions = int(constraints.get('min_positions', n_assets))
-
-        # Make sure max_weight allows weights to sum to 1
-        if max_weight * n_assets < 1.0:
-            max_weight = 1.0 / n_assets
-
-        # Min positions cannot exceed number of assets
-        if min_positions > n_assets:
-            min_positions = n_assets
-
-        constraints = {
-            'min_weight': min_weight,
-            'max_weight': max_weight,
-            'min_positions': min_positions
-        }
-
-        # Run optimization
-        result = optimizer.optimize_portfolio(
-            expected_returns,
-            cov_matrix,
-            constraints=constraints,
-            method=request.method
+        constraints = _normalize_constraints(request.constraints, n_assets)
+
+        views = _black_litterman_views(request) if request.method == 'black_litterman' else None
+
+        # Rebalancing starts from the current positions and pays to trade
+        current_weights, transaction_costs, rebalance = None, None, None
+        if request.rebalance:
+            if request.method != 'behavioral_mvo':
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Rebalancing is only supported for behavioral_mvo"
+                )
+            current_weights, book_value, prices = _current_holdings(db, portfolio, request.assets)
+            transaction_costs = request.transaction_costs.model_dump()
+            rebalance = {'current_weights': current_weights.tolist(), **transaction_costs}
+
+        # Run optimization (or reuse an identical earlier result)
+        cache_key = optimization_fingerprint(
+            user_profile_dict, expected_returns, cov_matrix, constraints,
+            request.method, solver=request.solver, views=views, rebalance=rebalance
         )
+        result = optimization_cache.get(cache_key)
+        solve_mode = 'cached'
+        if result is None:
+            # Reuse or warm-start from this portfolio's previous solution
+            state_key = (request.portfolio_id, tuple(request.assets), request.method, request.solver)
+            solve_mode, state = 'cold', None
+            if request.incremental:
+                solve_mode, state = reoptimization_store.plan(
+                    state_key, user_profile_dict, expected_returns, cov_matrix,
+                    constraints, request.method, request.solver, views=views,
+                    rebalance=rebalance
+                )
+
+            if solve_mode == 'reuse':
+                solve_mode, result = 'reused', state.result
+            else:
+                result = await _run_compute(
+                    optimize_task,
+                    user_profile_dict,
+                    expected_returns,
+                    cov_matrix,
+                    constraints,
+                    request.method,
+                    request.solver,
+                    state.weights if state is not None else None,
+                    views,
+                    None,
+                    current_weights,
+                    transaction_costs
+                )
+                telemetry_registry.record(result['telemetry'])
+                reoptimization_store.record(
+                    state_key, user_profile_dict, expected_returns, cov_matrix,
+                    constraints, request.method, request.solver, result, views=views,
+                    rebalance=rebalance
+                )
+            optimization_cache.set(cache_key, result, tag=user.user_id if user else None)
 
         # Format weights
         weights_dict = {
@@ -291,9 +610,23 @@ async def optimize_portfolio(request: OptimizationRequest, db = Depends(get_db))
             expected_return=float(result['expected_return']),
             expected_volatility=float(result['expected_volatility']),
             sharpe_ratio=float(result['sharpe_ratio']),
-            behavioral_adjustments=result['behavioral_adjustments']
+            behavioral_adjustments=result['behavioral_adjustments'],
+            risk_contributions=(
+                dict(zip(request.assets, map(float, result['risk_contributions'])))
+                if result['risk_contributions'] is not None else None
+            ),
+            solve_mode=solve_mode,
+            trades=(
+                trade_list(request.assets, current_weights, result['weights'], book_value, prices)
+                if rebalance is not None else None
+            ),
+            turnover=result['rebalance']['turnover'] if rebalance is not None else None,
+            transaction_cost=result['rebalance']['transaction_cost'] if rebalance is not None else None,
+            telemetry=result.get('telemetry')
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -301,15 +634,150 @@ async def optimize_portfolio(request: OptimizationRequest, db = Depends(get_db))
         )
 
 
-@app.post("/api/bias/analyze")
+@app.post("/api/optimization/optimize-batch", response_model=BatchOptimizationResponse)
+async def optimize_portfolio_batch_endpoint(request: BatchOptimizationRequest):
+    """
+    Optimize many investor profiles against one asset universe in one call
+    """
+    n_assets = len(request.assets)
+    if n_assets == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No assets provided"
+        )
+
+    try:
+        expected_returns, cov_matrix = await _market_inputs(
+            request.assets, request.estimator, request.lookback_window
+        )
+        constraints = _normalize_constraints(request.constraints, n_assets)
+
+        result = await _run_compute(
+            optimize_batch_task,
+            request.profiles,
+            expected_returns,
+            cov_matrix,
+            constraints,
+            request.method
+        )
+        telemetry_registry.record(result['telemetry'])
+
+        return BatchOptimizationResponse(
+            method=result['method'],
+            assets=request.assets,
+            weights=result['weights'].tolist(),
+            expected_return=result['expected_return'].tolist(),
+            expected_volatility=result['expected_volatility'].tolist(),
+            sharpe_ratio=result['sharpe_ratio'].tolist(),
+            telemetry=result['telemetry']
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@app.post("/api/optimization/frontier", response_model=FrontierResponse)
+async def optimization_frontier(request: FrontierRequest, db = Depends(get_db)):
+    """
+    Efficient frontier for the assets, with the user's behavioral portfolio
+    located against it
+    """
+    n_assets = len(request.assets)
+    if n_assets == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No assets provided"
+        )
+    if request.method not in FRONTIER_METHODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown frontier method: {request.method}"
+        )
+
+    try:
+        _, _, user_profile_dict = _portfolio_profile(db, request.portfolio_id)
+        expected_returns, cov_matrix = await _market_inputs(
+            request.assets, request.estimator, request.lookback_window
+        )
+        constraints = _normalize_constraints(request.constraints, n_assets)
+
+        result = await _run_compute(
+            frontier_task,
+            user_profile_dict,
+            expected_returns,
+            cov_matrix,
+            constraints,
+            min(max(request.n_points, 2), 200),
+            request.method,
+            request.solver
+        )
+
+        points = [
+            {
+                'risk_aversion': float(result['risk_aversion'][k]) if np.isfinite(result['risk_aversion'][k]) else None,
+                'expected_return': float(result['expected_return'][k]),
+                'volatility': float(result['volatility'][k]),
+                'sharpe_ratio': float(result['sharpe_ratio'][k]),
+                'weights': dict(zip(request.assets, map(float, result['weights'][k])))
+            }
+            for k in range(len(result['weights']))
+        ]
+        profile = dict(result['profile'])
+        profile['weights'] = dict(zip(request.assets, map(float, profile['weights'])))
+
+        return FrontierResponse(
+            method=request.method,
+            assets=request.assets,
+            points=points,
+            profile=profile
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@app.get("/api/optimization/cache-stats")
+async def optimization_cache_stats():
+    """
+    Hit/miss statistics for the optimization result cache
+    """
+    return optimization_cache.stats()
+
+
+@app.get("/api/optimization/telemetry")
+async def optimization_telemetry():
+    """
+    Solver telemetry per method since startup: call and status counts,
+    wall-time and iteration histograms, time per phase
+    """
+    return telemetry_registry.snapshot()
+
+
+@app.post(
+    "/api/bias/analyze",
+    openapi_extra=request_body_schema(
+        TRADES_BODY.json_schema(), "Trades as a JSON array of objects or an Arrow/Parquet/structured .npy table"
+    )
+)
 async def analyze_behavioral_biases(
     user_id: str,
-    trades: List[Dict],
+    request: Request,
     db = Depends(get_db)
 ):
     """
     Analyze user's behavioral biases from trading history
     """
+    trades = await _read_body(request, TRADES_BODY, decode_table)
     try:
         # Get user
         user = db.query(UserProfile).filter(
@@ -323,44 +791,29 @@ async def analyze_behavioral_biases(
             )
 
         # Analyze trades
-        analyzer = BehavioralAnalyzer()
-        bias_scores, behavioral_events = analyzer.analyze_user_trades(trades)
+        analysis = await _run_compute(bias_analysis_task, trades)
+        bias_scores = analysis['bias_scores']
+        events = analysis['events']
 
         # Update user profile with detected biases
-        user.loss_aversion_coefficient = 2.25 + (bias_scores.loss_aversion * 0.5)
-        user.overconfidence_score = bias_scores.overconfidence
+        user.loss_aversion_coefficient = 2.25 + (bias_scores['loss_aversion'] * 0.5)
+        user.overconfidence_score = bias_scores['overconfidence']
 
         db.commit()
 
-        # Format events
-        events = [
-            {
-                'event_type': event.event_type,
-                'severity': event.severity,
-                'timestamp': event.timestamp,
-                'context': event.context
-            }
-            for event in behavioral_events
-        ]
+        # Cached optimizations for this user used the old profile
+        optimization_cache.invalidate_tag(user_id)
 
         return {
             'user_id': user_id,
-            'bias_scores': {
-                'confirmation_bias': bias_scores.confirmation_bias,
-                'recency_bias': bias_scores.recency_bias,
-                'anchoring_bias': bias_scores.anchoring_bias,
-                'herding_behavior': bias_scores.herding_behavior,
-                'loss_aversion': bias_scores.loss_aversion,
-                'overconfidence': bias_scores.overconfidence,
-                'disposition_effect': bias_scores.disposition_effect,
-                'regret_aversion': bias_scores.regret_aversion,
-                'overall_bias_score': bias_scores.overall_score
-            },
+            'bias_scores': bias_scores,
             'behavioral_events': events,
-            'num_events_detected': len(behavioral_events),
+            'num_events_detected': len(events),
             'analysis_timestamp': datetime.utcnow()
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -500,20 +953,72 @@ async def get_sentiment(symbol: str):
         )
 
 
-@app.post("/api/backtest/run")
-async def run_backtest_endpoint(returns: List[float], risk_free_rate: float = 0.02):
+@app.post(
+    "/api/backtest/run",
+    openapi_extra=request_body_schema(
+        RETURNS_BODY.json_schema(), "Returns as a JSON array, a float .npy vector or a one-column Arrow/Parquet table"
+    )
+)
+async def run_backtest_endpoint(request: Request, risk_free_rate: float = 0.02):
     """
     Run simple backtest on returns series
     """
+    returns = await _read_body(request, RETURNS_BODY, decode_returns)
     try:
-        result = run_backtest(returns, risk_free_rate)
-        return {
-            "total_return": result.total_return,
-            "annual_return": result.annual_return,
-            "volatility": result.volatility,
-            "sharpe_ratio": result.sharpe_ratio,
-            "max_drawdown": result.max_drawdown
-        }
+        return await _run_compute(backtest_task, returns, risk_free_rate)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@app.post("/api/backtest/bootstrap")
+async def bootstrap_backtest_endpoint(request: BootstrapRequest):
+    """
+    Confidence intervals for every backtest metric by block or stationary
+    bootstrap, with a paired comparison when benchmark_returns is given
+    """
+    if request.method not in BOOTSTRAP_METHODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"method must be one of {list(BOOTSTRAP_METHODS)}"
+        )
+    if len(request.returns) < 2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="returns must have at least 2 periods"
+        )
+    if request.n_resamples < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="n_resamples must be at least 1"
+        )
+    if not 0 < request.confidence < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="confidence must be between 0 and 1"
+        )
+    if request.benchmark_returns is not None and len(request.benchmark_returns) != len(request.returns):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="benchmark_returns must cover the same periods as returns"
+        )
+    try:
+        return await _run_compute(
+            bootstrap_task, request.returns, request.benchmark_returns, request.risk_free_rate,
+            request.n_resamples, request.method, request.block_size, request.confidence,
+            request.metric, request.seed
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -521,6 +1026,38 @@ async def run_backtest_endpoint(returns: List[float], risk_free_rate: float = 0.
         )
 
 
+def _stream_chunk(metrics: StreamingMetrics, partial: str, chunk: bytes) -> str:
+    """Fold the complete returns of partial + chunk into metrics and return the unfinished last token"""
+    text = partial + chunk.decode().replace(',', ' ')
+    # The last token may continue in the next chunk
+    tokens = text.split()
+    partial = tokens.pop() if tokens and not text[-1].isspace() else ''
+    metrics.update(np.array(tokens, dtype=float))
+    return partial
+
+
+@app.post("/api/backtest/stream")
+async def stream_backtest_endpoint(request: Request, risk_free_rate: float = 0.02):
+    """
+    Backtest metrics for a long returns series sent as a plain-text body
+    of whitespace- or comma-separated returns, read chunk by chunk
+    without holding the series in memory
+    """
+    metrics = StreamingMetrics(risk_free_rate)
+    partial = ''
+    try:
+        async for chunk in request.stream():
+            # Parsing and the metric update run off the event loop, one chunk at a time
+            partial = await asyncio.to_thread(_stream_chunk, metrics, partial, chunk)
+        await asyncio.to_thread(_stream_chunk, metrics, partial, b' ')
+        return {'n_periods': metrics.n_periods, **vars(metrics.result())}
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
 # ============================================================================
 # Startup/Shutdown Events
 # ============================================================================
@@ -532,12 +1069,15 @@ async def startup_event():
     print("CONFIDENTIAL - Property of Zetheta Algorithms Private Limited")
     init_db()
     print("Database initialized")
+    compute_executor.start()
+    print(f"Compute pool started ({compute_executor.max_workers} workers)")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     print("Shutting down Behavioral Portfolio Optimizer API...")
+    compute_executor.shutdown(wait=True)
 
 
 # ============================================================================
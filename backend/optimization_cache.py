@@ -0,0 +1,157 @@
+"""
+LRU + TTL cache for optimization results
+Keyed by a stable fingerprint of the optimizer inputs; entries are tagged
+by user so a profile update can drop that user's results.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Set
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from risk_model import FactorCovariance
+
+
+PROFILE_FIELDS = (
+    'risk_tolerance',
+    'loss_aversion_coefficient',
+    'overconfidence_score',
+    'experience_years',
+    'investment_objective'
+)
+
+
+def _hash_array(digest, array: np.ndarray) -> None:
+    array = np.ascontiguousarray(array, dtype=float)
+    digest.update(str(array.shape).encode())
+    digest.update(array.tobytes())
+
+
+def optimization_fingerprint(
+    user_profile: Dict,
+    expected_returns: np.ndarray,
+    cov_matrix,
+    constraints: Optional[Dict],
+    method: str,
+    **options
+) -> str:
+    """
+    Stable hash of everything an optimization result depends on
+
+    Profile fields and constraints are serialized with sorted keys, arrays
+    by shape and raw float64 bytes (a FactorCovariance by its components).
+    Extra keyword options (e.g. solver) are folded in the same way.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    profile = {field: user_profile.get(field) for field in PROFILE_FIELDS}
+    digest.update(json.dumps(profile, sort_keys=True, default=str).encode())
+    digest.update(json.dumps(constraints, sort_keys=True, default=str).encode())
+    digest.update(json.dumps({'method': method, **options}, sort_keys=True, default=str).encode())
+
+    _hash_array(digest, expected_returns)
+    if isinstance(cov_matrix, FactorCovariance):
+        digest.update(b'factor')
+        for part in (cov_matrix.loadings, cov_matrix.factor_cov, cov_matrix.specific_var):
+            _hash_array(digest, part)
+    else:
+        _hash_array(digest, cov_matrix)
+    return digest.hexdigest()
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    tag: Optional[Hashable]
+
+
+class OptimizationCache:
+    """
+    Bounded result cache: least-recently-used entries are evicted beyond
+    max_entries, and entries older than ttl_seconds are treated as misses
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._store: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._tags: Dict[Hashable, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._store.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at < time.time():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._store.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(self, key: str, value: Any, tag: Optional[Hashable] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        if key in self._store:
+            self._remove(key)
+        self._store[key] = _Entry(value, time.time() + self.ttl_seconds, tag)
+        if tag is not None:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._store) > self.max_entries:
+            self._remove(next(iter(self._store)))
+            self.evictions += 1
+
+    def invalidate_tag(self, tag: Hashable) -> int:
+        """Drop every entry stored under tag (e.g. a user_id); returns the count"""
+        keys = self._tags.pop(tag, set())
+        for key in keys:
+            self._store.pop(key, None)
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._store.clear()
+        self._tags.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._store),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations
+        }
+
+    def _remove(self, key: str) -> None:
+        entry = self._store.pop(key, None)
+        if entry is not None and entry.tag is not None:
+            keys = self._tags.get(entry.tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[entry.tag]
+
+
+def cache_from_env() -> OptimizationCache:
+    """
+    Build an OptimizationCache from environment settings:
+    OPTIMIZATION_CACHE_SIZE (default 1024, 0 = disabled),
+    OPTIMIZATION_CACHE_TTL seconds (default 300)
+    """
+    return OptimizationCache(
+        max_entries=int(os.getenv("OPTIMIZATION_CACHE_SIZE", "1024")),
+        ttl_seconds=float(os.getenv("OPTIMIZATION_CACHE_TTL", "300"))
+    )
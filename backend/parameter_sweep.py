@@ -0,0 +1,299 @@
+"""
+Parameter sweeps
+Optimize and backtest every cell of a grid of behavioral-profile and
+constraint parameters on a process pool, streaming results to Parquet.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+import glob
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+
+import numpy as np
+import pandas as pd
+
+from backtesting import BacktestResult, backtest_portfolios, weight_schedule
+from portfolio_optimizer import DEFAULT_CONSTRAINTS, BehavioralPortfolioOptimizer
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    pa = None
+
+
+# Grid keys that go to the constraints dict and to optimize_portfolio;
+# any other key is a user-profile field (loss_aversion_coefficient, ...)
+CONSTRAINT_KEYS = (
+    'min_weight', 'max_weight', 'min_positions', 'max_positions', 'time_budget',
+    'cvar_alpha', 'cvar_scenarios'
+)
+OPTION_KEYS = ('method', 'solver')
+BACKTEST_FIELDS = tuple(BacktestResult.__dataclass_fields__)
+
+
+@dataclass
+class SweepResult:
+    results: pd.DataFrame  # one row per grid cell in grid order; duplicate cells share a row's values
+    unique_cells: int  # distinct cells after deduplication
+    solved_cells: int  # cells solved by this call (the rest were read back from output_path)
+
+
+def expand_grid(grid: Dict[str, Sequence]) -> List[Dict]:
+    """Cartesian product of the grid values, last key varying fastest"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def parameter_sweep(
+    grid: Dict[str, Sequence],
+    expected_returns: np.ndarray,
+    cov_matrix: np.ndarray,
+    backtest_returns: np.ndarray,
+    base_profile: Optional[Dict] = None,
+    constraints: Optional[Dict] = None,
+    method: str = 'behavioral_mvo',
+    solver: str = 'slsqp',
+    assets: Optional[Sequence[str]] = None,
+    rebalance_every: int = 21,
+    transaction_cost: float = 0.001,
+    risk_free_rate: float = 0.02,
+    periods_per_year: int = 252,
+    max_workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    output_path: Optional[str] = None,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> SweepResult:
+    """
+    optimize_portfolio and a backtest for every cell of a parameter grid
+
+    Each cell overrides base_profile, constraints (CONSTRAINT_KEYS) and
+    method/solver, e.g. {'loss_aversion_coefficient': [1.5, 2.25, 3],
+    'overconfidence_score': [0.2, 0.8], 'max_weight': [0.2, 0.4]}. The
+    cell's weights are rebalanced to every rebalance_every periods of
+    backtest_returns (T x N, out of sample) with backtesting.backtest_portfolios.
+
+    Identical cells (equal values, whatever their order or int/float
+    type) are solved once. The unique cells are split into chunks of
+    consecutive grid cells; a chunk warm-starts each solve from the
+    previous cell's weights and backtests all its cells in one call.
+    Chunks run on a spawn-context process pool that receives the inputs
+    once per worker; with max_workers=0 they run in this process.
+
+    With an output_path (a directory), each finished chunk is written as
+    its own Parquet file, replaced atomically, so a crash loses at most the
+    chunks in flight; rerunning the same sweep reads them back and only
+    solves the missing cells. Needs pyarrow.
+
+    Args:
+        grid: Parameter name -> values (see expand_grid)
+        assets: Names for the weight_<asset> columns
+        chunk_size: Cells per chunk (defaults to an even split over four
+            chunks per worker)
+        progress: Called as progress(done, total) in unique cells after each chunk
+
+    Returns:
+        SweepResult whose results have the grid columns, weight_<asset>
+        columns, the optimizer's expected_return, expected_volatility,
+        sharpe_ratio, status and solve_time, backtest_<field> for every
+        BacktestResult field and the total turnover
+
+    Raises:
+        ValueError: if output_path holds a different sweep
+    """
+    if output_path and pa is None:
+        raise ImportError("Writing sweep results needs pyarrow")
+    expected_returns = np.asarray(expected_returns, dtype=float)
+    cov_matrix = np.asarray(cov_matrix, dtype=float)
+    backtest_returns = np.asarray(backtest_returns, dtype=float)
+    assets = list(assets) if assets is not None else [f'asset_{i}' for i in range(len(expected_returns))]
+    settings = {
+        'base_profile': base_profile or {},
+        'constraints': constraints or DEFAULT_CONSTRAINTS,
+        'method': method, 'solver': solver, 'assets': assets,
+        'rebalance_every': rebalance_every, 'transaction_cost': transaction_cost,
+        'risk_free_rate': risk_free_rate, 'periods_per_year': periods_per_year
+    }
+
+    cells = expand_grid(grid)
+    keys = [_cell_key(cell) for cell in cells]
+    unique = dict(zip(keys, cells))
+
+    done: Dict[str, Dict] = {}
+    parts = 0
+    if output_path:
+        fingerprint = _fingerprint(expected_returns, cov_matrix, backtest_returns, settings)
+        done, parts = _load_parts(output_path, fingerprint)
+    pending = [(key, cell) for key, cell in unique.items() if key not in done]
+
+    workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+    size = chunk_size or max(1, -(-len(pending) // max(4 * workers, 1)))
+    chunks = [pending[i:i + size] for i in range(0, len(pending), size)]
+    data = (expected_returns, cov_matrix, backtest_returns, settings)
+
+    def finished(rows: List[Dict]) -> None:
+        nonlocal parts
+        done.update((row['cell_key'], row) for row in rows)
+        if output_path:
+            _write_part(output_path, parts, rows)
+            parts += 1
+        if progress is not None:
+            progress(len(done), len(unique))
+
+    if workers == 0 or len(chunks) <= 1:
+        for chunk in chunks:
+            finished(_run_cells(chunk, *data))
+    elif chunks:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=data
+        ) as pool:
+            futures = [pool.submit(_run_worker_cells, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                finished(future.result())
+
+    results = pd.DataFrame([done[key] for key in keys])
+    for name in grid:
+        # Show each cell's own values (a duplicate may differ in type only)
+        results[name] = [cell[name] for cell in cells]
+    return SweepResult(results=results, unique_cells=len(unique), solved_cells=len(pending))
+
+
+def _cell_key(cell: Dict) -> str:
+    """Canonical key of a cell, treating 2 and 2.0 as the same value"""
+    canonical = {
+        name: float(value) if isinstance(value, (int, float, np.number)) and not isinstance(value, bool) else value
+        for name, value in cell.items()
+    }
+    return json.dumps(canonical, sort_keys=True, default=str)
+
+
+def _run_cells(
+    chunk: List,
+    expected_returns: np.ndarray,
+    cov_matrix: np.ndarray,
+    backtest_returns: np.ndarray,
+    settings: Dict
+) -> List[Dict]:
+    """Optimize consecutive cells with warm starts, then backtest them together"""
+    rows, weights = [], []
+    previous = None
+    for key, cell in chunk:
+        profile = {**settings['base_profile']}
+        constraints = {**settings['constraints']}
+        options = {'method': settings['method'], 'solver': settings['solver']}
+        for name, value in cell.items():
+            target = constraints if name in CONSTRAINT_KEYS else options if name in OPTION_KEYS else profile
+            target[name] = value
+
+        # Every row has the same keys: Parquet parts take their schema from the rows
+        row = {
+            'cell_key': key, **cell, 'expected_return': np.nan, 'expected_volatility': np.nan,
+            'sharpe_ratio': np.nan, 'status': 'failed', 'message': None, 'solve_time': np.nan
+        }
+        try:
+            result = BehavioralPortfolioOptimizer(profile).optimize_portfolio(
+                expected_returns, cov_matrix, constraints=constraints,
+                initial_weights=previous, **options
+            )
+        except ValueError as e:
+            row['message'] = str(e)
+            weights.append(np.full(len(expected_returns), np.nan))
+            rows.append(row)
+            continue
+        if result['telemetry']['status'] == 'failed':
+            # The optimizer returned weights but no solution: report and trade none
+            row.update(message=result['telemetry']['message'], solve_time=result['telemetry']['total_time'])
+            weights.append(np.full(len(expected_returns), np.nan))
+            rows.append(row)
+            continue
+        previous = np.asarray(result['weights'], dtype=float)
+        weights.append(previous)
+        # Not every method reports these (risk_parity has no expected return),
+        # so fill them from the weights the way optimize_portfolio does
+        expected_return = result.get('expected_return', previous @ expected_returns)
+        volatility = result.get('expected_volatility', np.sqrt(previous @ cov_matrix @ previous))
+        row.update(
+            expected_return=float(expected_return),
+            expected_volatility=float(volatility),
+            sharpe_ratio=float(result.get('sharpe_ratio', expected_return / volatility if volatility > 0 else 0)),
+            status=result['telemetry']['status'],
+            message=result['telemetry']['message'],
+            solve_time=result['telemetry']['total_time']
+        )
+        rows.append(row)
+
+    # All cells of the chunk in one S x T x N backtest; failed cells (NaN weights)
+    # stay in cash and their backtest columns are NaN
+    weights = np.vstack(weights)
+    schedules = np.stack([
+        weight_schedule(np.nan_to_num(w), backtest_returns, settings['rebalance_every']) for w in weights
+    ])
+    book = backtest_portfolios(
+        backtest_returns, schedules, transaction_cost=settings['transaction_cost'],
+        risk_free_rate=settings['risk_free_rate'], periods_per_year=settings['periods_per_year']
+    )
+    for s, row in enumerate(rows):
+        failed = row['status'] == 'failed'
+        row.update({f'weight_{asset}': float(w) for asset, w in zip(settings['assets'], weights[s])})
+        row.update({
+            f'backtest_{field}': np.nan if failed else float(book.metrics[field][s])
+            for field in BACKTEST_FIELDS
+        })
+        row['turnover'] = np.nan if failed else float(book.turnover[s].sum())
+    return rows
+
+
+# Worker-side inputs (set by _init_worker)
+_data = None
+
+
+def _init_worker(*data) -> None:
+    global _data
+    _data = data
+
+
+def _run_worker_cells(chunk):
+    return _run_cells(chunk, *_data)
+
+
+def _fingerprint(expected_returns, cov_matrix, backtest_returns, settings: Dict) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode())
+    for array in (expected_returns, cov_matrix, backtest_returns):
+        digest.update(str(array.shape).encode())
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def _load_parts(path: str, fingerprint: str):
+    """Rows of the parts already in path, by cell key, and the next part index"""
+    manifest = os.path.join(path, 'sweep.json')
+    if not os.path.exists(manifest):
+        os.makedirs(path, exist_ok=True)
+        with open(manifest, 'w') as f:
+            json.dump({'fingerprint': fingerprint}, f)
+        return {}, 0
+    with open(manifest) as f:
+        if json.load(f)['fingerprint'] != fingerprint:
+            raise ValueError(f"{path} holds a different parameter sweep")
+    files = sorted(glob.glob(os.path.join(path, 'part-*.parquet')))
+    done = {}
+    for file in files:
+        for row in pa.parquet.read_table(file).to_pylist():
+            done[row['cell_key']] = row
+    return done, int(os.path.basename(files[-1])[5:10]) + 1 if files else 0
+
+
+def _write_part(path: str, index: int, rows: List[Dict]) -> None:
+    """Write one chunk to a temporary file and rename it, so a part is either complete or absent"""
+    final = os.path.join(path, f'part-{index:05d}.parquet')
+    tmp = f'{final}.tmp'
+    pa.parquet.write_table(pa.Table.from_pylist(rows), tmp)
+    os.replace(tmp, final)
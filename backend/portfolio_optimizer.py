@@ -3,11 +3,45 @@ Behavioral Portfolio Optimization Engine
 Implements bias-adjusted Modern Portfolio Theory and other optimization methods
 """
 from typing import Dict, List, Tuple, Optional
+import time
 import numpy as np
 import pandas as pd
 from scipy.optimize import minimize
 from scipy.stats import norm
 
+from risk_model import FactorCovariance
+from qp_solver import (
+    POSITION_THRESHOLD,
+    estimate_lipschitz,
+    solve_active_set_qp,
+    solve_box_budget_qp,
+    solve_prospect_mvo,
+    solve_prospect_mvo_batch
+)
+from black_litterman import (
+    equilibrium_returns,
+    market_cap_weights,
+    posterior_returns,
+    view_uncertainty,
+    views_from_sentiment
+)
+from risk_parity import solve_equal_risk_contribution
+from hrp import hierarchical_risk_parity
+from cardinality import solve_cardinality_mvo
+from scenario_engine import simulate_asset_returns, simulate_portfolio_scenarios
+from cvar import solve_min_cvar
+from rebalancing import solve_rebalance
+from telemetry import SolverTelemetry
+from prospect_theory import prospect_adjusted_returns
+
+
+# Constraints used when optimize_portfolio is given none
+DEFAULT_CONSTRAINTS = {
+    'min_weight': 0.01,
+    'max_weight': 0.30,
+    'min_positions': 5
+}
+
 
 class BehavioralPortfolioOptimizer:
     """
@@ -33,46 +67,88 @@ class BehavioralPortfolioOptimizer:
         expected_returns: np.ndarray,
         cov_matrix: np.ndarray,
         constraints: Optional[Dict] = None,
-        method: str = 'behavioral_mvo'
+        method: str = 'behavioral_mvo',
+        solver: str = 'slsqp',
+        initial_weights: Optional[np.ndarray] = None,
+        views: Optional[Dict] = None,
+        scenarios: Optional[np.ndarray] = None,
+        current_weights: Optional[np.ndarray] = None,
+        transaction_costs: Optional[Dict] = None
     ) -> Dict:
         """
         Optimize portfolio with behavioral adjustments
         
         Args:
             expected_returns: Expected returns for each asset
-            cov_matrix: Covariance matrix
+            cov_matrix: Covariance matrix (dense array or FactorCovariance)
             constraints: Dict of constraints (min_weight, max_weight, etc.)
-            method: Optimization method ('behavioral_mvo', 'black_litterman', 'risk_parity')
+            method: Optimization method ('behavioral_mvo', 'black_litterman',
+                'risk_parity', 'hrp', 'cvar')
+            solver: 'slsqp' (default) or 'qp' for the analytic-gradient engine
+                in qp_solver (behavioral_mvo and black_litterman)
+            initial_weights: Prior weights to warm-start the solver from
+                (ignored by hrp, which has no iterative solve)
+            views: Black-Litterman views and market weights (black_litterman;
+                see _black_litterman_optimization)
+            scenarios: S x N asset return scenarios, e.g. historical returns
+                (cvar; simulated from expected_returns/cov_matrix if omitted)
+            current_weights: Current holdings; when given, behavioral_mvo
+                rebalances from them (see _rebalance_optimization)
+            transaction_costs: linear_cost, quadratic_cost and no_trade_band
+                for rebalancing
         
         Returns:
-            Dict with optimal weights, expected return, risk, etc.
+            Dict with optimal weights, expected return, risk, etc., and a
+            'telemetry' dict (phase timings, iterations, status; see
+            telemetry.SolverTelemetry)
         """
 
         if constraints is None:
-            constraints = {
-                'min_weight': 0.01,
-                'max_weight': 0.30,
-                'min_positions': 5
-            }
-
-        if method == 'behavioral_mvo':
-            return self._behavioral_mean_variance_optimization(
-                expected_returns, cov_matrix, constraints
+            constraints = dict(DEFAULT_CONSTRAINTS)
+
+        telemetry = SolverTelemetry(
+            method=method, solver='rebalance' if current_weights is not None else solver
+        )
+        start = time.perf_counter()
+
+        if current_weights is not None:
+            if method != 'behavioral_mvo':
+                raise ValueError(f"Rebalancing is not supported for method: {method}")
+            result = self._rebalance_optimization(
+                expected_returns, cov_matrix, constraints, current_weights,
+                transaction_costs or {}, telemetry
+            )
+        elif method == 'behavioral_mvo':
+            result = self._behavioral_mean_variance_optimization(
+                expected_returns, cov_matrix, constraints, telemetry, solver=solver,
+                initial_weights=initial_weights
             )
         elif method == 'black_litterman':
-            return self._black_litterman_optimization(
-                expected_returns, cov_matrix, constraints
+            result = self._black_litterman_optimization(
+                expected_returns, cov_matrix, constraints, telemetry, initial_weights,
+                views=views, solver=solver
             )
         elif method == 'risk_parity':
-            return self._risk_parity_optimization(cov_matrix, constraints)
+            result = self._risk_parity_optimization(cov_matrix, constraints, telemetry, initial_weights)
+        elif method == 'hrp':
+            result = self._hrp_optimization(expected_returns, cov_matrix, constraints, telemetry)
+        elif method == 'cvar':
+            result = self._cvar_optimization(expected_returns, cov_matrix, constraints, telemetry, scenarios)
         else:
             raise ValueError(f"Unknown optimization method: {method}")
 
+        telemetry.total_time = time.perf_counter() - start
+        result['telemetry'] = telemetry.to_dict()
+        return result
+
     def _behavioral_mean_variance_optimization(
         self,
         expected_returns: np.ndarray,
         cov_matrix: np.ndarray,
-        constraints: Dict
+        constraints: Dict,
+        telemetry: SolverTelemetry,
+        solver: str = 'slsqp',
+        initial_weights: Optional[np.ndarray] = None
     ) -> Dict:
         """
         Behavioral-adjusted Markowitz optimization
@@ -86,20 +162,47 @@ class BehavioralPortfolioOptimizer:
         n_assets = len(expected_returns)
 
         # Step 1: Adjust expected returns for behavioral biases
-        adjusted_returns = self._apply_behavioral_adjustments_to_returns(
-            expected_returns, expected_returns.mean()
-        )
+        with telemetry.phase('adjustment'):
+            adjusted_returns = self._apply_behavioral_adjustments_to_returns(
+                expected_returns, expected_returns.mean()
+            )
 
         # Step 2: Adjust covariance for perceived risk
-        adjusted_cov = self._adjust_risk_perception(cov_matrix)
+        with telemetry.phase('covariance'):
+            adjusted_cov = self._adjust_risk_perception(cov_matrix)
+
+        if constraints.get('max_positions') is not None:
+            return self._cardinality_mvo(
+                adjusted_returns, adjusted_cov, expected_returns, cov_matrix,
+                constraints, telemetry, initial_weights
+            )
+
+        if solver == 'qp':
+            # Exact-gradient QP path; the prospect kink and min_positions
+            # are handled inside solve_prospect_mvo
+            with telemetry.phase('solve'):
+                qp_result = solve_prospect_mvo(
+                    adjusted_returns,
+                    adjusted_cov,
+                    self.loss_aversion,
+                    lower=constraints['min_weight'],
+                    upper=constraints['max_weight'],
+                    min_positions=constraints.get('min_positions', 0),
+                    x0=initial_weights
+                )
+            telemetry.solved(qp_result.iterations, qp_result.converged)
+            telemetry.check_weights(qp_result.x, constraints['min_weight'], constraints['max_weight'])
+            return self._behavioral_mvo_result(qp_result.x, expected_returns, cov_matrix, telemetry)
+        elif solver != 'slsqp':
+            raise ValueError(f"Unknown solver: {solver}")
 
         # Step 3: Define objective function
         def objective(weights):
             # Portfolio return
-            portfolio_return = np.dot(weights, adjusted_returns)
+            portfolio_return = weights @ adjusted_returns
 
             # Portfolio variance
-            portfolio_variance = np.dot(weights, np.dot(adjusted_cov, weights))
+            portfolio_variance = weights @ (adjusted_cov @ weights)
 
             # Prospect theory utility
             # For positive returns, concave (diminishing returns)
@@ -121,32 +224,91 @@ class BehavioralPortfolioOptimizer:
         # Sum to 1 constraint
         constraints_scipy = {'type': 'eq', 'fun': lambda x: np.sum(x) - 1}
 
-        # Minimum number of positions constraint
-        min_positions = constraints['min_positions']
-        min_positions_constraint = {
-            'type': 'ineq',
-            'fun': lambda x: np.sum(x > 0.01) - min_positions + 1
-        }
-
         # Step 5: Optimize
-        initial_weights = np.ones(n_assets) / n_assets
-        result = minimize(
-            objective,
-            initial_weights,
-            method='SLSQP',
-            bounds=bounds,
-            constraints=[constraints_scipy, min_positions_constraint],
-            options={'maxiter': 1000}
-        )
+        if initial_weights is None:
+            initial_weights = np.ones(n_assets) / n_assets
+        with telemetry.phase('solve'):
+            result = minimize(
+                objective,
+                initial_weights,
+                method='SLSQP',
+                bounds=bounds,
+                constraints=constraints_scipy,
+                options={'maxiter': 1000}
+            )
+        # Status is recorded against the raw iterate, before renormalizing
+        telemetry.solved_scipy(result)
+        telemetry.check_weights(result.x, constraints['min_weight'], constraints['max_weight'])
 
         weights = np.maximum(result.x, 0)
         weights = weights / weights.sum()  # Renormalize
 
+        # A position count is not differentiable, so SLSQP cannot enforce it;
+        # fall back to the exact cardinality search when it is violated
+        if np.sum(weights > POSITION_THRESHOLD - 1e-9) < min(constraints.get('min_positions', 0), n_assets):
+            return self._cardinality_mvo(
+                adjusted_returns, adjusted_cov, expected_returns, cov_matrix,
+                constraints, telemetry, weights
+            )
+
+        return self._behavioral_mvo_result(weights, expected_returns, cov_matrix, telemetry)
+
+    def _cardinality_mvo(
+        self,
+        adjusted_returns: np.ndarray,
+        adjusted_cov: np.ndarray,
+        expected_returns: np.ndarray,
+        cov_matrix: np.ndarray,
+        constraints: Dict,
+        telemetry: SolverTelemetry,
+        initial_weights: Optional[np.ndarray] = None
+    ) -> Dict:
+        """
+        behavioral_mvo holding between min_positions and max_positions assets
+        (branch-and-bound in cardinality, limited by constraints['time_budget'];
+        telemetry counts search nodes as iterations)
+        """
+        with telemetry.phase('solve'):
+            result = solve_cardinality_mvo(
+                adjusted_returns,
+                adjusted_cov,
+                self.loss_aversion,
+                min_weight=constraints['min_weight'],
+                max_weight=constraints['max_weight'],
+                min_positions=min(constraints.get('min_positions', 0), len(expected_returns)),
+                max_positions=constraints.get('max_positions'),
+                time_budget=constraints.get('time_budget', 2.0),
+                x0=initial_weights
+            )
+        telemetry.solved(
+            result.nodes, result.optimal,
+            message='' if result.optimal else 'Search stopped at the time or node budget'
+        )
+        output = self._behavioral_mvo_result(result.x, expected_returns, cov_matrix, telemetry)
+        output['cardinality'] = {
+            'positions': result.positions,
+            'nodes': result.nodes,
+            'optimal': result.optimal,
+            'gap': result.objective - result.bound
+        }
+        return output
+
+    def _behavioral_mvo_result(
+        self,
+        weights: np.ndarray,
+        expected_returns: np.ndarray,
+        cov_matrix: np.ndarray,
+        telemetry: SolverTelemetry
+    ) -> Dict:
+        """
+        Build the behavioral_mvo result dict from solved weights
+        """
         # Calculate portfolio metrics
-        expected_return = np.dot(weights, expected_returns)
-        portfolio_variance = np.dot(weights, np.dot(cov_matrix, weights))
-        portfolio_volatility = np.sqrt(portfolio_variance)
-        sharpe_ratio = expected_return / portfolio_volatility if portfolio_volatility > 0 else 0
+        with telemetry.phase('metrics'):
+            expected_return = weights @ expected_returns
+            portfolio_variance = weights @ (cov_matrix @ weights)
+            portfolio_volatility = np.sqrt(portfolio_variance)
+            sharpe_ratio = expected_return / portfolio_volatility if portfolio_volatility > 0 else 0
 
         return {
             'weights': weights,
@@ -163,60 +325,140 @@ class BehavioralPortfolioOptimizer:
 
     def _black_litterman_optimization(
         self,
-        market_implied_returns: np.ndarray,
+        expected_returns: np.ndarray,
         cov_matrix: np.ndarray,
-        constraints: Dict
+        constraints: Dict,
+        telemetry: SolverTelemetry,
+        initial_weights: Optional[np.ndarray] = None,
+        views: Optional[Dict] = None,
+        solver: str = 'slsqp'
     ) -> Dict:
         """
         Black-Litterman model with behavioral modifications
         Incorporates investor views with confidence levels
+
+        views (all keys optional):
+            pick_matrix, view_returns: P (K x N) and Q (K,)
+            omega: View covariance (K x K or K diagonal); otherwise built
+                from confidences (default 0.5) and per-view variances
+            market_weights: Equilibrium (market-cap) weights; equal if absent
+            sentiment_scores, sentiment_confidence: Per-asset sentiment in
+                [-1, 1] turned into absolute views
+            tau: Prior uncertainty scalar (default 0.05)
+
+        Without P/Q or sentiment views, expected_returns is taken as an
+        absolute view on every asset with confidence 0.5 / (1 + overconfidence),
+        which for a diagonal covariance reproduces the earlier scalar blend.
+        Overconfident investors' stated confidences are discounted the same way.
         """
-        n_assets = len(market_implied_returns)
+        n_assets = len(expected_returns)
+        views = views or {}
+        tau = views.get('tau', 0.05)
 
         # Risk aversion coefficient (behavioral adjustment)
         # Higher risk aversion for loss-averse investors
         risk_aversion = 2.5 / (1 + self.loss_aversion * 0.5)
 
-        # Equilibrium returns (market weights * covariance * risk aversion)
-        market_weights = np.ones(n_assets) / n_assets
-        equilibrium_returns = risk_aversion * np.dot(cov_matrix, market_weights)
+        # Equilibrium returns (market-cap weights * covariance * risk aversion)
+        market_weights = market_cap_weights(views.get('market_weights'), n_assets)
+        prior = equilibrium_returns(cov_matrix, market_weights, risk_aversion)
 
         # Confidence level in views (lower if overconfident)
-        confidence = 0.5 / (1 + self.overconfidence)
-        tau = confidence  # Uncertainty scalar
-
-        # Combine equilibrium with views
-        blended_returns = equilibrium_returns + tau * (market_implied_returns - equilibrium_returns)
-
-        # Optimize with blended returns
-        def objective(weights):
-            portfolio_return = np.dot(weights, blended_returns)
-            portfolio_variance = np.dot(weights, np.dot(cov_matrix, weights))
-            return -portfolio_return + 0.5 * risk_aversion * portfolio_variance
-
-        bounds = [
-            (constraints['min_weight'], constraints['max_weight'])
-            for _ in range(n_assets)
-        ]
+        discount = 1 / (1 + self.overconfidence)
+
+        pick_rows, view_returns, confidences, variances = [], [], [], []
+        if views.get('pick_matrix') is not None:
+            pick = np.atleast_2d(np.asarray(views['pick_matrix'], dtype=float))
+            pick_rows.append(pick)
+            view_returns.append(np.asarray(views['view_returns'], dtype=float))
+            stated = views.get('confidences')
+            confidences.append(
+                np.asarray([0.5] * len(pick) if stated is None else stated, dtype=float) * discount
+            )
+            variances.extend(views.get('variances') or [None] * len(pick))
+        if views.get('sentiment_scores') is not None:
+            pick, q, conf = views_from_sentiment(
+                cov_matrix, prior, views['sentiment_scores'], views['sentiment_confidence']
+            )
+            pick_rows.append(pick)
+            view_returns.append(q)
+            confidences.append(conf * discount)
+            variances.extend([None] * len(pick))
+        if not pick_rows:
+            pick_rows.append(np.eye(n_assets))
+            view_returns.append(np.asarray(expected_returns, dtype=float))
+            confidences.append(np.full(n_assets, 0.5 * discount))
+            variances.extend([None] * n_assets)
+
+        pick_matrix = np.vstack(pick_rows)
+        view_returns = np.concatenate(view_returns)
+        confidences = np.concatenate(confidences)
+        if views.get('omega') is not None:
+            omega = np.asarray(views['omega'], dtype=float)
+        else:
+            omega = view_uncertainty(cov_matrix, pick_matrix, confidences, tau)
+            explicit = np.array([v is not None for v in variances], dtype=bool)
+            omega[explicit] = [v for v in variances if v is not None]
 
-        constraints_scipy = {'type': 'eq', 'fun': lambda x: np.sum(x) - 1}
+        with telemetry.phase('adjustment'):
+            blended_returns = posterior_returns(
+                cov_matrix, prior, pick_matrix, view_returns, omega, tau
+            )
 
-        initial_weights = np.ones(n_assets) / n_assets
-        result = minimize(
-            objective,
-            initial_weights,
-            method='SLSQP',
-            bounds=bounds,
-            constraints=constraints_scipy,
-            options={'maxiter': 1000}
-        )
+        # Optimize with posterior returns: max w'mu - 0.5 delta w'Σw
+        lower, upper = constraints['min_weight'], constraints['max_weight']
+        if solver == 'qp':
+            # Same minimizer as 0.5 w'Σw - w'(mu / delta)
+            linear = blended_returns / risk_aversion
+            with telemetry.phase('solve'):
+                warm = None
+                if initial_weights is not None:
+                    warm = solve_active_set_qp(cov_matrix, linear, lower, upper, initial_weights)
+                if warm is not None:
+                    weights = warm[0]
+                    telemetry.solved(1)
+                else:
+                    qp_result = solve_box_budget_qp(
+                        lambda v: cov_matrix @ v, linear, lower, upper,
+                        estimate_lipschitz(lambda v: cov_matrix @ v, n_assets),
+                        x0=initial_weights
+                    )
+                    weights = qp_result.x
+                    telemetry.solved(qp_result.iterations, qp_result.converged)
+        elif solver == 'slsqp':
+            def objective(weights):
+                portfolio_return = weights @ blended_returns
+                portfolio_variance = weights @ (cov_matrix @ weights)
+                return -portfolio_return + 0.5 * risk_aversion * portfolio_variance
+
+            bounds = [(lower, upper) for _ in range(n_assets)]
+
+            constraints_scipy = {'type': 'eq', 'fun': lambda x: np.sum(x) - 1}
+
+            if initial_weights is None:
+                initial_weights = np.ones(n_assets) / n_assets
+            with telemetry.phase('solve'):
+                result = minimize(
+                    objective,
+                    initial_weights,
+                    method='SLSQP',
+                    bounds=bounds,
+                    constraints=constraints_scipy,
+                    options={'maxiter': 1000}
+                )
+            telemetry.solved_scipy(result)
+            weights = result.x
+        else:
+            raise ValueError(f"Unknown solver: {solver}")
 
-        weights = np.maximum(result.x, 0)
+        telemetry.check_weights(weights, lower, upper)
+        weights = np.maximum(weights, 0)
         weights = weights / weights.sum()
 
-        expected_return = np.dot(weights, market_implied_returns)
-        portfolio_variance = np.dot(weights, np.dot(cov_matrix, weights))
-        portfolio_volatility = np.sqrt(portfolio_variance)
+        with telemetry.phase('metrics'):
+            expected_return = weights @ expected_returns
+            portfolio_variance = weights @ (cov_matrix @ weights)
+            portfolio_volatility = np.sqrt(portfolio_variance)
 
         return {
             'weights': weights,
@@ -224,67 +466,201 @@ class BehavioralPortfolioOptimizer:
             'expected_volatility': portfolio_volatility,
             'sharpe_ratio': expected_return / portfolio_volatility if portfolio_volatility > 0 else 0,
             'method': 'black_litterman',
-            'confidence_in_views': confidence
+            'confidence_in_views': float(np.mean(confidences)),
+            'posterior_returns': blended_returns,
+            'num_views': len(view_returns)
         }
 
     def _risk_parity_optimization(
         self,
         cov_matrix: np.ndarray,
-        constraints: Dict
+        constraints: Dict,
+        telemetry: SolverTelemetry,
+        initial_weights: Optional[np.ndarray] = None
     ) -> Dict:
         """
         Risk Parity: Each asset contributes equally to portfolio risk
-        Modified for behavioral preferences
+        Solved by the equal-risk-contribution engine in risk_parity; when
+        min_weight/max_weight bind, risk is spread as evenly as the bounds allow
         """
-        n_assets = len(cov_matrix)
-
-        def objective(weights):
-            weights = np.maximum(weights, 0)
-            if weights.sum() == 0:
-                return 1e10
+        with telemetry.phase('solve'):
+            result = solve_equal_risk_contribution(
+                cov_matrix,
+                lower=constraints['min_weight'],
+                upper=constraints['max_weight'],
+                x0=initial_weights
+            )
+        telemetry.solved(result.iterations, result.converged)
+        weights = result.weights
+        telemetry.check_weights(weights, constraints['min_weight'], constraints['max_weight'])
 
-            weights = weights / weights.sum()
+        # Calculate portfolio metrics
+        with telemetry.phase('metrics'):
+            portfolio_variance = weights @ (cov_matrix @ weights)
+            portfolio_volatility = np.sqrt(portfolio_variance)
 
-            # Risk contribution of each asset
-            sigma = np.sqrt(np.diag(cov_matrix))
-            marginal_contrib = np.dot(cov_matrix, weights)
-            risk_contrib = weights * marginal_contrib
+        return {
+            'weights': weights,
+            'expected_volatility': portfolio_volatility,
+            'method': 'risk_parity',
+            'risk_contributions': result.risk_contributions,
+            'risk_contribution_equal': bool(
+                np.allclose(result.risk_contributions, 1.0 / len(weights), atol=1e-6)
+            ),
+            'converged': result.converged
+        }
 
-            # Target: each asset contributes equally
-            target_contrib = np.sum(risk_contrib) / n_assets
-            risk_diff = risk_contrib - target_contrib
+    def _hrp_optimization(
+        self,
+        expected_returns: np.ndarray,
+        cov_matrix: np.ndarray,
+        constraints: Dict,
+        telemetry: SolverTelemetry
+    ) -> Dict:
+        """
+        Hierarchical Risk Parity
+        Clusters on the true correlations; splits weight between clusters
+        using variances from the perceived-risk covariance
+        """
+        with telemetry.phase('covariance'):
+            risk_cov = self._adjust_risk_perception(cov_matrix)
+        with telemetry.phase('solve'):
+            result = hierarchical_risk_parity(
+                cov_matrix,
+                risk_cov=risk_cov,
+                lower=constraints['min_weight'],
+                upper=constraints['max_weight']
+            )
+        weights = result.weights
+        telemetry.check_weights(weights, constraints['min_weight'], constraints['max_weight'])
 
-            # Minimize squared differences
-            return np.sum(risk_diff ** 2)
+        with telemetry.phase('metrics'):
+            expected_return = weights @ expected_returns
+            portfolio_volatility = np.sqrt(weights @ (cov_matrix @ weights))
+            sharpe_ratio = expected_return / portfolio_volatility if portfolio_volatility > 0 else 0
 
-        bounds = [
-            (constraints['min_weight'], constraints['max_weight'])
-            for _ in range(n_assets)
-        ]
+        return {
+            'weights': weights,
+            'expected_return': expected_return,
+            'expected_volatility': portfolio_volatility,
+            'sharpe_ratio': sharpe_ratio,
+            'behavioral_adjustments': {
+                'loss_aversion_coefficient': self.loss_aversion,
+                'risk_perception_adjusted': True
+            },
+            'method': 'hrp'
+        }
 
-        constraints_scipy = {'type': 'eq', 'fun': lambda x: np.sum(x) - 1}
+    def _rebalance_optimization(
+        self,
+        expected_returns: np.ndarray,
+        cov_matrix: np.ndarray,
+        constraints: Dict,
+        current_weights: np.ndarray,
+        transaction_costs: Dict,
+        telemetry: SolverTelemetry
+    ) -> Dict:
+        """
+        behavioral_mvo from the current holdings, net of trading costs
+        Turnover is charged linear_cost per unit of weight traded plus
+        0.5 * quadratic_cost * trade^2, and trades within no_trade_band are
+        skipped (see rebalancing.solve_rebalance). Position-count limits
+        are not applied when rebalancing.
+        """
+        with telemetry.phase('adjustment'):
+            adjusted_returns = self._apply_behavioral_adjustments_to_returns(
+                expected_returns, expected_returns.mean()
+            )
+        with telemetry.phase('covariance'):
+            adjusted_cov = self._adjust_risk_perception(cov_matrix)
+        current_weights = np.asarray(current_weights, dtype=float)
+
+        with telemetry.phase('solve'):
+            result = solve_rebalance(
+                adjusted_returns,
+                adjusted_cov,
+                self.loss_aversion,
+                current_weights,
+                lower=constraints['min_weight'],
+                upper=constraints['max_weight'],
+                linear_cost=transaction_costs.get('linear_cost', 0.001),
+                quadratic_cost=transaction_costs.get('quadratic_cost', 0.0),
+                no_trade_band=transaction_costs.get('no_trade_band', 0.0)
+            )
+        telemetry.solved(result.iterations, result.converged)
+        telemetry.check_weights(result.x, constraints['min_weight'], constraints['max_weight'])
+
+        output = self._behavioral_mvo_result(result.x, expected_returns, cov_matrix, telemetry)
+        output['rebalance'] = {
+            'current_weights': current_weights,
+            'turnover': result.turnover,
+            'transaction_cost': result.cost,
+            'traded_assets': int(np.sum(np.abs(result.x - current_weights) > 1e-6)),
+            'converged': result.converged
+        }
+        return output
 
-        initial_weights = np.ones(n_assets) / n_assets
-        result = minimize(
-            objective,
-            initial_weights,
-            method='SLSQP',
-            bounds=bounds,
-            constraints=constraints_scipy
-        )
+    def _cvar_optimization(
+        self,
+        expected_returns: np.ndarray,
+        cov_matrix: np.ndarray,
+        constraints: Dict,
+        telemetry: SolverTelemetry,
+        scenarios: Optional[np.ndarray] = None
+    ) -> Dict:
+        """
+        Minimum Conditional Value-at-Risk over return scenarios
+        Minimizes CVaR at constraints['cvar_alpha'] (default 0.95) minus the
+        behaviorally adjusted expected return scaled by 1 / loss aversion,
+        so the more loss-averse the investor the more the tail dominates.
+        Without scenarios, constraints['cvar_scenarios'] (default 5000) are
+        simulated from expected_returns/cov_matrix with a fixed seed.
+        """
+        alpha = constraints.get('cvar_alpha', 0.95)
+        if scenarios is None:
+            with telemetry.phase('scenarios'):
+                scenarios = simulate_asset_returns(
+                    expected_returns, cov_matrix,
+                    n_scenarios=int(constraints.get('cvar_scenarios', 5000)), seed=0
+                )
+        with telemetry.phase('adjustment'):
+            adjusted_returns = self._apply_behavioral_adjustments_to_returns(
+                expected_returns, expected_returns.mean()
+            )
 
-        weights = np.maximum(result.x, 0)
-        weights = weights / weights.sum()
+        with telemetry.phase('solve'):
+            result = solve_min_cvar(
+                scenarios,
+                alpha=alpha,
+                lower=constraints['min_weight'],
+                upper=constraints['max_weight'],
+                expected_returns=adjusted_returns,
+                return_weight=1.0 / max(self.loss_aversion, 1e-6)
+            )
+        # One iteration per restricted LP solved
+        telemetry.solved(result.rounds, result.converged)
+        weights = result.weights
+        telemetry.check_weights(weights, constraints['min_weight'], constraints['max_weight'])
 
-        # Calculate portfolio metrics
-        portfolio_variance = np.dot(weights, np.dot(cov_matrix, weights))
-        portfolio_volatility = np.sqrt(portfolio_variance)
+        with telemetry.phase('metrics'):
+            expected_return = weights @ expected_returns
+            portfolio_volatility = np.sqrt(weights @ (cov_matrix @ weights))
+            sharpe_ratio = expected_return / portfolio_volatility if portfolio_volatility > 0 else 0
 
         return {
             'weights': weights,
+            'expected_return': expected_return,
             'expected_volatility': portfolio_volatility,
-            'method': 'risk_parity',
-            'risk_contribution_equal': True
+            'sharpe_ratio': sharpe_ratio,
+            'behavioral_adjustments': {
+                'loss_aversion_coefficient': self.loss_aversion,
+                'return_weight': 1.0 / max(self.loss_aversion, 1e-6)
+            },
+            'method': 'cvar',
+            'cvar': result.cvar,
+            'var': result.var,
+            'cvar_alpha': alpha,
+            'converged': result.converged
         }
 
     def _apply_behavioral_adjustments_to_returns(
@@ -295,39 +671,38 @@ class BehavioralPortfolioOptimizer:
         """
         Apply prospect theory value function to returns
         Adjusts for loss aversion and diminishing sensitivity
+        (see prospect_theory.prospect_adjusted_returns)
         """
-        adjusted = np.zeros_like(expected_returns)
+        return prospect_adjusted_returns(expected_returns, self.loss_aversion, reference_point)
 
-        for i, ret in enumerate(expected_returns):
-            if ret >= reference_point:
-                # Gain domain: concave (diminishing returns)
-                # Exponent < 1 means diminishing sensitivity
-                adjusted[i] = (ret - reference_point) ** 0.88
-            else:
-                # Loss domain: convex (increasing sensitivity)
-                # Loss aversion coefficient applied
-                adjusted[i] = -self.loss_aversion * (-(ret - reference_point)) ** 0.88
-
-        return adjusted + reference_point
-
-    def _adjust_risk_perception(self, cov_matrix: np.ndarray) -> np.ndarray:
+    def _adjust_risk_perception(self, cov_matrix):
         """
         Adjust covariance matrix for perceived risk
         Loss-averse investors perceive downside risk more strongly
-        """
-        adjusted_cov = cov_matrix.copy()
 
+        Accepts a dense array or a FactorCovariance (returned in factor form)
+        """
         # Extract diagonal (variances)
-        variances = np.diag(adjusted_cov)
+        variances = cov_matrix.diagonal()
 
         # Amplify variances based on loss aversion
-        adjustment_factor = 1 + (self.loss_aversion - 1) * 0.2
+        adjustment_factor = self._risk_perception_factor()
+
+        if isinstance(cov_matrix, FactorCovariance):
+            return cov_matrix.add_diagonal(variances * (adjustment_factor - 1))
 
+        adjusted_cov = cov_matrix.copy()
         adjusted_variances = variances * adjustment_factor
         np.fill_diagonal(adjusted_cov, adjusted_variances)
 
         return adjusted_cov
 
+    def _risk_perception_factor(self) -> float:
+        """
+        Multiplier applied to asset variances by _adjust_risk_perception
+        """
+        return 1 + (self.loss_aversion - 1) * 0.2
+
     def _apply_behavioral_constraints(
         self,
         weights: np.ndarray,
@@ -358,36 +733,182 @@ class BehavioralPortfolioOptimizer:
         return weights
 
 
+def optimize_portfolio_batch(
+    profiles: List[Dict],
+    expected_returns: np.ndarray,
+    cov_matrix: np.ndarray,
+    constraints: Optional[Dict] = None,
+    method: str = 'behavioral_mvo'
+) -> Dict:
+    """
+    Optimize many investor profiles against one asset universe in a single call
+
+    Profiles differ only in their behavioral parameters, so the covariance
+    work is shared: the spectral estimate used for step sizes is computed
+    once, each profile's perceived-risk covariance is represented as the
+    shared matrix plus a diagonal shift, and all behavioral_mvo problems
+    are solved together by solve_prospect_mvo_batch, warm-started from
+    the solution for the median-loss-aversion profile.
+
+    Args:
+        profiles: List of user profile dicts (as for BehavioralPortfolioOptimizer)
+        expected_returns: Expected returns for each asset
+        cov_matrix: Covariance matrix shared by every profile
+        constraints: Dict of constraints (min_weight, max_weight, min_positions)
+        method: Optimization method (see optimize_portfolio)
+
+    Returns:
+        Dict with a profiles x assets weights matrix, per-profile metrics and
+        one 'telemetry' dict for the whole batch
+    """
+    if constraints is None:
+        constraints = dict(DEFAULT_CONSTRAINTS)
+
+    optimizers = [BehavioralPortfolioOptimizer(profile) for profile in profiles]
+    n_profiles = len(optimizers)
+    n_assets = len(expected_returns)
+    converged = np.ones(n_profiles, dtype=bool)
+    telemetry = SolverTelemetry(method=method, solver='batch')
+    start = time.perf_counter()
+
+    if n_profiles == 0:
+        weights = np.zeros((0, n_assets))
+    elif method == 'behavioral_mvo' and constraints.get('max_positions') is None:
+        loss_aversion = np.array([opt.loss_aversion for opt in optimizers])
+        with telemetry.phase('adjustment'):
+            # One prospect transform for the whole cohort
+            adjusted_returns = prospect_adjusted_returns(
+                expected_returns, loss_aversion, expected_returns.mean()
+            )
+        with telemetry.phase('covariance'):
+            variances = cov_matrix.diagonal()
+            variance_shift = np.array([
+                opt._risk_perception_factor() - 1 for opt in optimizers
+            ])[:, None] * variances
+            lipschitz = estimate_lipschitz(lambda v: cov_matrix @ v, n_assets)
+
+        anchor = int(np.argsort(loss_aversion)[n_profiles // 2])
+        with telemetry.phase('solve'):
+            warm_start = solve_prospect_mvo_batch(
+                adjusted_returns[anchor:anchor + 1],
+                cov_matrix,
+                loss_aversion[anchor:anchor + 1],
+                lower=constraints['min_weight'],
+                upper=constraints['max_weight'],
+                min_positions=constraints.get('min_positions', 0),
+                variance_shift=variance_shift[anchor:anchor + 1],
+                lipschitz=lipschitz
+            )
+            result = solve_prospect_mvo_batch(
+                adjusted_returns,
+                cov_matrix,
+                loss_aversion,
+                lower=constraints['min_weight'],
+                upper=constraints['max_weight'],
+                min_positions=constraints.get('min_positions', 0),
+                variance_shift=variance_shift,
+                x0=warm_start.x,
+                lipschitz=lipschitz
+            )
+        telemetry.solved(
+            warm_start.iterations.sum() + result.iterations.sum(), bool(np.all(result.converged))
+        )
+        weights = result.x
+        converged = result.converged
+    else:
+        # Risk parity ignores the behavioral profile: solve once
+        solve_profiles = optimizers[:1] if method == 'risk_parity' else optimizers
+        singles = [
+            opt.optimize_portfolio(expected_returns, cov_matrix, constraints, method=method)
+            for opt in solve_profiles
+        ]
+        for single in singles:
+            _merge_telemetry(telemetry, single['telemetry'])
+        converged = np.array([single['telemetry']['converged'] for single in singles])
+        if method == 'risk_parity':
+            weights = np.tile(singles[0]['weights'], (n_profiles, 1))
+            converged = np.repeat(converged, n_profiles)
+        else:
+            weights = np.stack([single['weights'] for single in singles])
+
+    if n_profiles:
+        telemetry.check_weights(weights, constraints['min_weight'], constraints['max_weight'])
+    with telemetry.phase('metrics'):
+        portfolio_returns = weights @ expected_returns
+        portfolio_volatility = np.sqrt(np.sum((weights @ cov_matrix) * weights, axis=1))
+        sharpe_ratio = np.divide(
+            portfolio_returns, portfolio_volatility,
+            out=np.zeros(n_profiles), where=portfolio_volatility > 0
+        )
+    telemetry.total_time = time.perf_counter() - start
+
+    return {
+        'weights': weights,
+        'expected_return': portfolio_returns,
+        'expected_volatility': portfolio_volatility,
+        'sharpe_ratio': sharpe_ratio,
+        'converged': converged,
+        'method': method,
+        'telemetry': telemetry.to_dict()
+    }
+
+
+def _merge_telemetry(telemetry: SolverTelemetry, single: Dict) -> None:
+    """Fold one optimize_portfolio telemetry dict into a batch record"""
+    for name, seconds in single['phases'].items():
+        telemetry.phases[name] = telemetry.phases.get(name, 0.0) + seconds
+    telemetry.solved(
+        single['iterations'], single['converged'], single['function_evaluations'], single['message']
+    )
+    if single['status'] == 'failed':
+        telemetry.failed(single['message'])
+
+
 def calculate_portfolio_metrics(
     weights: np.ndarray,
     expected_returns: np.ndarray,
-    cov_matrix: np.ndarray
+    cov_matrix: np.ndarray,
+    historical_returns: Optional[np.ndarray] = None,
+    n_paths: int = 10000,
+    horizon: int = 252,
+    seed: Optional[int] = 0
 ) -> Dict:
     """
     Calculate comprehensive portfolio performance metrics
+
+    Drawdown, Sortino and VaR/CVaR come from scenario_engine paths over
+    `horizon` periods (bootstrapped from historical_returns when given,
+    otherwise simulated from expected_returns/cov_matrix); a fixed seed
+    keeps them reproducible.
     """
-    expected_return = np.dot(weights, expected_returns)
-    variance = np.dot(weights, np.dot(cov_matrix, weights))
+    expected_return = weights @ expected_returns
+    variance = weights @ (cov_matrix @ weights)
     volatility = np.sqrt(variance)
 
-    # Calculate maximum drawdown (simplified)
-    # In production, use historical data
-    max_drawdown = volatility * 2  # Approximation
-
     # Sharpe ratio (assuming 2% risk-free rate)
     risk_free_rate = 0.02
     sharpe_ratio = (expected_return - risk_free_rate) / volatility if volatility > 0 else 0
 
-    # Sortino ratio (downside deviation only)
-    downside_variance = variance * 0.7  # Approximation
-    downside_volatility = np.sqrt(downside_variance)
-    sortino_ratio = (expected_return - risk_free_rate) / downside_volatility if downside_volatility > 0 else 0
+    scenarios = simulate_portfolio_scenarios(
+        weights,
+        expected_returns,
+        cov_matrix,
+        historical_returns=historical_returns,
+        n_paths=n_paths,
+        horizon=horizon,
+        risk_free_rate=risk_free_rate,
+        seed=seed
+    )
 
     return {
         'expected_return': expected_return,
         'volatility': volatility,
         'sharpe_ratio': sharpe_ratio,
-        'sortino_ratio': sortino_ratio,
-        'max_drawdown': max_drawdown,
+        'sortino_ratio': scenarios['sortino_ratio'],
+        'max_drawdown': scenarios['expected_max_drawdown'],
+        'max_drawdown_quantiles': scenarios['max_drawdown_quantiles'],
+        'var_95': scenarios['var'],
+        'cvar_95': scenarios['cvar'],
+        'probability_of_loss': scenarios['probability_of_loss'],
         'variance': variance
     }
@@ -0,0 +1,82 @@
+"""
+Prospect-theory transforms
+Vectorized value function and probability weighting, evaluated for a whole
+cohort of investors (loss-aversion coefficients x assets) in one call.
+"""
+from typing import Optional, Union
+import numpy as np
+
+
+# Tversky-Kahneman (1992) estimates
+GAIN_CURVATURE = 0.88
+LOSS_CURVATURE = 0.88
+GAIN_WEIGHTING = 0.61
+LOSS_WEIGHTING = 0.69
+
+
+def probability_weighting(probabilities: np.ndarray, gamma: float = GAIN_WEIGHTING) -> np.ndarray:
+    """
+    Inverse-S decision weights w(p) = p^g / (p^g + (1 - p)^g)^(1/g):
+    small probabilities are overweighted, large ones underweighted
+    """
+    p = np.clip(np.asarray(probabilities, dtype=float), 0.0, 1.0)
+    numerator = p ** gamma
+    return numerator / (numerator + (1.0 - p) ** gamma) ** (1.0 / gamma)
+
+
+def prospect_adjusted_returns(
+    expected_returns: np.ndarray,
+    loss_aversion: Union[float, np.ndarray],
+    reference_point: Union[None, float, np.ndarray] = None,
+    probabilities: Optional[np.ndarray] = None,
+    alpha: float = GAIN_CURVATURE,
+    beta: float = LOSS_CURVATURE,
+    gamma: float = GAIN_WEIGHTING,
+    delta: float = LOSS_WEIGHTING
+) -> np.ndarray:
+    """
+    Prospect value of each return relative to a reference point, shifted
+    back by the reference point:
+
+        v(x) = x^alpha             for x = r - ref >= 0
+        v(x) = -lambda (-x)^beta   otherwise
+
+    With probabilities, each value is scaled by its decision weight
+    (gamma for gains, delta for losses) as in the original prospect theory
+    sum of pi(p) v(x).
+
+    The powers depend only on the returns, so for returns shared by the
+    cohort they are computed once per asset and the per-investor work is a
+    broadcast multiply.
+
+    Args:
+        expected_returns: (N,) returns shared by every investor, or (U, N)
+        loss_aversion: Scalar, or (U,) coefficients, one per investor
+        reference_point: Scalar or (U,); defaults to the mean of each
+            returns row
+        probabilities: Outcome probabilities broadcastable to the returns
+
+    Returns:
+        (U, N) adjusted returns when loss_aversion, the returns or the
+        reference point are per investor, else (N,)
+    """
+    returns = np.asarray(expected_returns, dtype=float)
+    loss_aversion = np.asarray(loss_aversion, dtype=float)
+    if loss_aversion.ndim:
+        loss_aversion = loss_aversion[:, None]
+    if reference_point is None:
+        reference = returns.mean(axis=-1, keepdims=True)
+    else:
+        reference = np.asarray(reference_point, dtype=float)
+        if reference.ndim:
+            reference = reference[:, None]
+
+    excess = returns - reference
+    magnitude = np.abs(excess)
+    gains = magnitude ** alpha
+    losses = gains if beta == alpha else magnitude ** beta
+    if probabilities is not None:
+        gains = gains * probability_weighting(probabilities, gamma)
+        losses = losses * probability_weighting(probabilities, delta)
+
+    return np.where(excess >= 0, gains, -loss_aversion * losses) + reference
@@ -0,0 +1,576 @@
+"""
+Convex QP engine for the behavioral mean-variance problem
+Accelerated projected gradient with exact gradients in place of finite-difference SLSQP
+"""
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+
+
+# Weight above which an asset counts as a held position
+POSITION_THRESHOLD = 0.01
+
+
+@dataclass
+class QPResult:
+    x: np.ndarray
+    iterations: int
+    converged: bool
+    branch: str = 'smooth'
+
+
+@dataclass
+class BatchQPResult:
+    x: np.ndarray
+    iterations: np.ndarray
+    converged: np.ndarray
+    branch: Optional[List[str]] = None
+
+
+def project_capped_simplex(
+    v: np.ndarray,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    total: float = 1.0
+) -> np.ndarray:
+    """
+    Euclidean projection onto {x : sum(x) = total, lower <= x <= upper}
+
+    The projection is clip(v - tau, lower, upper) for the scalar tau that
+    meets the budget. sum(clip(v - tau)) is piecewise linear in tau with
+    breakpoints at v - upper and v - lower, so tau is found exactly by
+    sorting the breakpoints (O(N log N)). A 2-D v is projected row by row.
+    """
+    lower = np.broadcast_to(lower, v.shape)
+    upper = np.broadcast_to(upper, v.shape)
+    breakpoints = np.concatenate([v - upper, v - lower], axis=-1)
+    # +1 when an asset leaves its upper bound, -1 when it reaches its lower bound
+    slope_change = np.concatenate([np.ones(v.shape), -np.ones(v.shape)], axis=-1)
+    order = np.argsort(breakpoints, axis=-1, kind='stable')
+    breakpoints = np.take_along_axis(breakpoints, order, axis=-1)
+    active = np.cumsum(np.take_along_axis(slope_change, order, axis=-1), axis=-1)
+
+    # Budget at each breakpoint, starting from every asset at its upper bound
+    drops = active[..., :-1] * np.diff(breakpoints, axis=-1)
+    sums = np.sum(upper, axis=-1, keepdims=True) - np.concatenate(
+        [np.zeros(v.shape[:-1] + (1,)), np.cumsum(drops, axis=-1)], axis=-1
+    )
+
+    # First breakpoint at or below the budget; tau lies in the segment before it
+    k = np.sum(sums > total, axis=-1, keepdims=True)
+    j = np.clip(k - 1, 0, breakpoints.shape[-1] - 1)
+    bp_j = np.take_along_axis(breakpoints, j, axis=-1)
+    sums_j = np.take_along_axis(sums, j, axis=-1)
+    active_j = np.take_along_axis(active, j, axis=-1)
+    tau = np.where(
+        k == 0,
+        breakpoints[..., :1],
+        bp_j + (sums_j - total) / np.where(active_j > 0, active_j, 1.0)
+    )
+
+    return np.clip(v - tau, lower, upper)
+
+
+def estimate_lipschitz(hess_matvec: Callable, n: int, n_iter: int = 50) -> float:
+    """
+    Largest eigenvalue of the Hessian by power iteration
+    Only an initial guess: the solver backtracks if it is too small.
+    """
+    x = np.ones(n) / np.sqrt(n)
+    eig = 0.0
+    for _ in range(n_iter):
+        y = hess_matvec(x)
+        norm = np.linalg.norm(y)
+        if norm == 0:
+            return 1.0
+        x = y / norm
+        eig = norm
+    return eig
+
+
+def solve_box_budget_qp(
+    hess_matvec: Callable,
+    linear: np.ndarray,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    lipschitz: float,
+    x0: Optional[np.ndarray] = None,
+    tol: float = 1e-10,
+    max_iter: int = 5000
+) -> QPResult:
+    """
+    Minimize 0.5 x'Hx - linear'x  s.t.  sum(x) = 1, lower <= x <= upper
+
+    FISTA with adaptive restart and backtracking on the step size. The
+    gradient Hx - linear is exact and costs one Hessian product per
+    iteration (Hy for the extrapolated point is formed from Hx by linearity).
+
+    Args:
+        hess_matvec: Callable returning H @ x
+        linear: Linear coefficient vector
+        lower, upper: Box bounds
+        lipschitz: Initial estimate of the largest eigenvalue of H
+        x0: Warm start (projected onto the feasible set)
+        tol: Stop when the projected-gradient step is below tol (inf-norm)
+        max_iter: Iteration cap
+
+    Returns:
+        QPResult with the solution and iteration count
+    """
+    n = len(linear)
+    if x0 is None:
+        x0 = np.ones(n) / n
+    x = project_capped_simplex(np.asarray(x0, dtype=float), lower, upper)
+    hx = hess_matvec(x)
+    y, hy = x, hx
+    step_l = max(lipschitz, 1e-12)
+    t = 1.0
+
+    for iteration in range(1, max_iter + 1):
+        grad = hy - linear
+        while True:
+            x_new = project_capped_simplex(y - grad / step_l, lower, upper)
+            hx_new = hess_matvec(x_new)
+            d = x_new - y
+            # Sufficient-decrease test for a quadratic: d'Hd <= L ||d||^2
+            if np.dot(d, hx_new - hy) <= step_l * np.dot(d, d) * (1 + 1e-12):
+                break
+            step_l *= 2.0
+
+        if np.max(np.abs(d)) <= tol:
+            return QPResult(x=x_new, iterations=iteration, converged=True)
+
+        # Restart momentum when it points uphill
+        if np.dot(y - x_new, x_new - x) > 0:
+            t = 1.0
+        t_new = 0.5 * (1 + np.sqrt(1 + 4 * t * t))
+        beta = (t - 1) / t_new
+        y = x_new + beta * (x_new - x)
+        hy = hx_new + beta * (hx_new - hx)
+        x, hx, t = x_new, hx_new, t_new
+
+    return QPResult(x=x, iterations=max_iter, converged=False)
+
+
+def solve_box_budget_qp_batch(
+    hess_matmul: Callable,
+    linear: np.ndarray,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    lipschitz: np.ndarray,
+    x0: Optional[np.ndarray] = None,
+    tol: float = 1e-10,
+    max_iter: int = 5000
+) -> BatchQPResult:
+    """
+    Row-batched solve_box_budget_qp: row p minimizes 0.5 x'H_p x - linear_p'x
+
+    All rows advance together so each iteration costs one matrix-matrix
+    product instead of P matrix-vector products. Step sizes, momentum and
+    convergence are tracked per row; converged rows drop out of the loop.
+
+    Args:
+        hess_matmul: Callable (X, rows) returning the stacked H_p @ x_p for
+            the given row indices (X is len(rows) x N)
+        linear: P x N linear coefficients
+        lower, upper: Bounds broadcastable to P x N
+        lipschitz: Per-row (or shared) initial eigenvalue estimates
+        x0: Warm start broadcastable to P x N
+    """
+    linear = np.atleast_2d(linear)
+    n_rows, n = linear.shape
+    lower = np.broadcast_to(lower, (n_rows, n))
+    upper = np.broadcast_to(upper, (n_rows, n))
+    if x0 is None:
+        x0 = np.ones(n) / n
+    x = project_capped_simplex(
+        np.array(np.broadcast_to(x0, (n_rows, n)), dtype=float), lower, upper
+    )
+    all_rows = np.arange(n_rows)
+    hx = hess_matmul(x, all_rows)
+    y, hy = x.copy(), hx.copy()
+    step_l = np.maximum(np.broadcast_to(lipschitz, (n_rows,)).astype(float), 1e-12)
+    t = np.ones(n_rows)
+    iterations = np.zeros(n_rows, dtype=int)
+    converged = np.zeros(n_rows, dtype=bool)
+
+    active = all_rows
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        rows = active
+        y_r, hy_r = y[rows], hy[rows]
+        lower_r, upper_r = lower[rows], upper[rows]
+        grad = hy_r - linear[rows]
+        step_r = step_l[rows]
+
+        x_new = np.empty_like(y_r)
+        hx_new = np.empty_like(y_r)
+        pending = np.arange(len(rows))
+        while pending.size:
+            candidate = project_capped_simplex(
+                y_r[pending] - grad[pending] / step_r[pending, None],
+                lower_r[pending], upper_r[pending]
+            )
+            h_candidate = hess_matmul(candidate, rows[pending])
+            d = candidate - y_r[pending]
+            # Sufficient-decrease test for a quadratic: d'Hd <= L ||d||^2
+            ok = (np.sum(d * (h_candidate - hy_r[pending]), axis=1)
+                  <= step_r[pending] * np.sum(d * d, axis=1) * (1 + 1e-12))
+            x_new[pending[ok]] = candidate[ok]
+            hx_new[pending[ok]] = h_candidate[ok]
+            step_r[pending[~ok]] *= 2.0
+            pending = pending[~ok]
+        step_l[rows] = step_r
+        iterations[rows] += 1
+
+        done = np.max(np.abs(x_new - y_r), axis=1) <= tol
+        converged[rows[done]] = True
+
+        # Restart momentum when it points uphill
+        x_r, hx_r = x[rows], hx[rows]
+        t_r = np.where(np.sum((y_r - x_new) * (x_new - x_r), axis=1) > 0, 1.0, t[rows])
+        t_new = 0.5 * (1 + np.sqrt(1 + 4 * t_r * t_r))
+        beta = ((t_r - 1) / t_new)[:, None]
+        y[rows] = x_new + beta * (x_new - x_r)
+        hy[rows] = hx_new + beta * (hx_new - hx_r)
+        x[rows], hx[rows], t[rows] = x_new, hx_new, t_new
+
+        active = rows[~done]
+
+    return BatchQPResult(x=x, iterations=iterations, converged=converged)
+
+
+def solve_active_set_qp(
+    hess,
+    linear: np.ndarray,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    x_prev: np.ndarray,
+    tol: float = 1e-9,
+    max_steps: int = 10
+) -> Optional[Tuple[np.ndarray, float]]:
+    """
+    Primal-dual active-set solve of  min 0.5 x'Hx - linear'x  over the
+    budget/box set, started from the active set of x_prev
+
+    Assets on a bound are held there and the rest solve the
+    equality-constrained KKT system
+        [H_FF 1; 1' 0] [x_F; nu] = [linear_F - H_FA x_A; 1 - sum(x_A)]
+    with one dense solve of the size of the free set. Free assets that
+    leave their box are pinned to the bound, held assets whose multiplier
+    has the wrong sign are released, and the step repeats. When nothing
+    moves, the KKT conditions hold and x is the exact optimum. A good
+    warm start usually needs one or two steps; after max_steps (or a
+    singular system) None is returned and the caller should fall back to
+    an iterative solve.
+
+    Returns:
+        (x, nu) with nu the budget multiplier, or None
+    """
+    n = len(linear)
+    lower = np.broadcast_to(np.asarray(lower, dtype=float), (n,))
+    upper = np.broadcast_to(np.asarray(upper, dtype=float), (n,))
+    bound_tol = 1e-9 * max(1.0, np.max(np.abs(upper)))
+    dual_tol = tol * (1.0 + np.max(np.abs(linear)))
+    at_lower = x_prev <= lower + bound_tol
+    at_upper = (x_prev >= upper - bound_tol) & ~at_lower
+
+    for _ in range(max_steps):
+        free = np.flatnonzero(~(at_lower | at_upper))
+        if free.size == 0:
+            return None
+        x = np.where(at_lower, lower, np.where(at_upper, upper, 0.0))
+        if isinstance(hess, np.ndarray):
+            columns = hess[:, free]
+        else:
+            selector = np.zeros((n, free.size))
+            selector[free, np.arange(free.size)] = 1.0
+            columns = hess @ selector
+        fixed_term = hess @ x
+
+        kkt = np.zeros((free.size + 1, free.size + 1))
+        kkt[:-1, :-1] = columns[free]
+        kkt[:-1, -1] = 1.0
+        kkt[-1, :-1] = 1.0
+        rhs = np.append(linear[free] - fixed_term[free], 1.0 - np.sum(x))
+        try:
+            solution = np.linalg.solve(kkt, rhs)
+        except np.linalg.LinAlgError:
+            return None
+        x[free] = solution[:-1]
+        nu = solution[-1]
+
+        # Stationarity: Hx - linear + nu = lambda_lower - lambda_upper
+        reduced = fixed_term + columns @ x[free] - linear + nu
+        below = np.zeros(n, dtype=bool)
+        above = np.zeros(n, dtype=bool)
+        below[free] = x[free] < lower[free] - bound_tol
+        above[free] = x[free] > upper[free] + bound_tol
+        release = (at_lower & (reduced < -dual_tol)) | (at_upper & (reduced > dual_tol))
+        if not (below.any() or above.any() or release.any()):
+            return np.clip(x, lower, upper), float(nu)
+
+        at_lower = (at_lower & ~release) | below
+        at_upper = (at_upper & ~release) | above
+
+    return None
+
+
+def solve_prospect_mvo(
+    adjusted_returns: np.ndarray,
+    adjusted_cov: np.ndarray,
+    loss_aversion: float,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    min_positions: int = 0,
+    x0: Optional[np.ndarray] = None,
+    tol: float = 1e-10,
+    max_iter: int = 5000
+) -> QPResult:
+    """
+    Solve  min  -u(w'r) + 0.5 w'Σw  over the budget/box set, where u is the
+    piecewise-linear prospect utility (slope 1 for gains, loss_aversion for losses)
+
+    Single-profile front end to solve_prospect_mvo_batch. With a warm
+    start x0 (and loss_aversion >= 1), one active-set step on the branch
+    x0 lies in is tried first; a valid branch optimum is then the global
+    optimum, so the iterative solve is skipped.
+    """
+    if x0 is not None and loss_aversion >= 1.0:
+        warm = _warm_prospect_step(
+            adjusted_returns, adjusted_cov, loss_aversion, lower, upper,
+            min_positions, np.asarray(x0, dtype=float)
+        )
+        if warm is not None:
+            return warm
+
+    batch = solve_prospect_mvo_batch(
+        np.asarray(adjusted_returns, dtype=float)[None, :],
+        adjusted_cov,
+        np.array([loss_aversion], dtype=float),
+        lower,
+        upper,
+        min_positions=min_positions,
+        x0=None if x0 is None else np.asarray(x0, dtype=float)[None, :],
+        tol=tol,
+        max_iter=max_iter
+    )
+    return QPResult(
+        x=batch.x[0],
+        iterations=int(batch.iterations[0]),
+        converged=bool(batch.converged[0]),
+        branch=batch.branch[0]
+    )
+
+
+def _warm_prospect_step(adjusted_returns, adjusted_cov, loss_aversion, lower, upper,
+                        min_positions, x0) -> Optional[QPResult]:
+    """Active-set step on the prospect branch of x0 (see solve_prospect_mvo)"""
+    gain_side = x0 @ adjusted_returns >= 0
+    coef = 1.0 if gain_side else loss_aversion
+    step = solve_active_set_qp(adjusted_cov, coef * adjusted_returns, lower, upper, x0)
+    if step is None:
+        return None
+    x = step[0]
+    portfolio_return = x @ adjusted_returns
+    if (portfolio_return >= 0) != gain_side and portfolio_return != 0:
+        return None
+    if np.sum(x >= POSITION_THRESHOLD) < min(int(min_positions), len(x)):
+        return None
+    return QPResult(x=x, iterations=0, converged=True, branch='gain' if gain_side else 'loss')
+
+
+def solve_prospect_mvo_batch(
+    adjusted_returns: np.ndarray,
+    cov_matrix: np.ndarray,
+    loss_aversion: np.ndarray,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    min_positions: int = 0,
+    variance_shift: Optional[np.ndarray] = None,
+    x0: Optional[np.ndarray] = None,
+    lipschitz: Optional[float] = None,
+    tol: float = 1e-10,
+    max_iter: int = 5000
+) -> BatchQPResult:
+    """
+    Solve the prospect-utility QP for P profiles sharing one covariance
+
+    Row p uses returns adjusted_returns[p], loss aversion loss_aversion[p]
+    and Hessian Σ + diag(variance_shift[p]), so profile-specific risk
+    perception never materializes P covariance matrices.
+
+    The kink at w'r = 0 is handled explicitly: each branch is a smooth QP
+    with linear term c*r. If a branch optimum lands on its own side of the
+    kink it is a candidate; otherwise the optimum of that branch lies on
+    w'r = 0, found by bisection on the multiplier c (w'r is monotone in c).
+    The best candidate under the true objective is returned.
+
+    Cardinality is also handled explicitly: if fewer than min_positions
+    assets exceed POSITION_THRESHOLD, the most attractive excluded assets
+    (by gradient) get their lower bound raised to the threshold and the
+    problem is re-solved.
+
+    Args:
+        adjusted_returns: P x N behaviorally adjusted returns
+        cov_matrix: Shared N x N covariance
+        loss_aversion: Per-profile loss aversion (P,)
+        lower, upper: Bounds broadcastable to P x N
+        min_positions: Minimum number of held positions
+        variance_shift: Per-profile diagonal added to the covariance (P x N)
+        x0: Warm start broadcastable to P x N
+        lipschitz: Largest eigenvalue of cov_matrix if already known
+    """
+    returns = np.atleast_2d(adjusted_returns)
+    n_rows, n = returns.shape
+    loss_aversion = np.broadcast_to(np.asarray(loss_aversion, dtype=float), (n_rows,))
+    lower = np.array(np.broadcast_to(lower, (n_rows, n)), dtype=float)
+    upper = np.array(np.broadcast_to(upper, (n_rows, n)), dtype=float)
+    if variance_shift is None:
+        variance_shift = np.zeros((n_rows, n))
+    variance_shift = np.broadcast_to(variance_shift, (n_rows, n))
+
+    def hess_matmul(x, rows):
+        return x @ cov_matrix + x * variance_shift[rows]
+
+    if lipschitz is None:
+        lipschitz = estimate_lipschitz(lambda v: cov_matrix @ v, n)
+    row_lipschitz = lipschitz + np.max(variance_shift, axis=1)
+
+    result = _solve_kinked_batch(
+        hess_matmul, returns, loss_aversion, lower, upper,
+        row_lipschitz, x0, tol, max_iter
+    )
+
+    min_positions = min(int(min_positions), n)
+    held = result.x >= POSITION_THRESHOLD
+    missing = min_positions - np.sum(held, axis=1)
+    refine = np.flatnonzero(missing > 0)
+    if refine.size:
+        grad = hess_matmul(result.x[refine], refine) - returns[refine]
+        for i, row in enumerate(refine):
+            candidates = np.flatnonzero(~held[row])
+            chosen = candidates[np.argsort(grad[i, candidates])[:missing[row]]]
+            lower[row, chosen] = np.minimum(
+                np.maximum(lower[row, chosen], POSITION_THRESHOLD), upper[row, chosen]
+            )
+        refined = _solve_kinked_batch(
+            lambda x, rows: hess_matmul(x, refine[rows]),
+            returns[refine], loss_aversion[refine], lower[refine], upper[refine],
+            row_lipschitz[refine], result.x[refine], tol, max_iter
+        )
+        result.x[refine] = refined.x
+        result.iterations[refine] += refined.iterations
+        result.converged[refine] = refined.converged
+        for i, row in enumerate(refine):
+            result.branch[row] = refined.branch[i]
+
+    return result
+
+
+def _solve_kinked_batch(
+    hess_matmul: Callable,
+    returns: np.ndarray,
+    loss_aversion: np.ndarray,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    lipschitz: np.ndarray,
+    x0: Optional[np.ndarray],
+    tol: float,
+    max_iter: int
+) -> BatchQPResult:
+    """Two-branch solve of the prospect-utility QP (see solve_prospect_mvo_batch)"""
+    n_rows = returns.shape[0]
+
+    def solve(rows, coef, start):
+        return solve_box_budget_qp_batch(
+            lambda x, sub: hess_matmul(x, rows[sub]),
+            coef[:, None] * returns[rows], lower[rows], upper[rows],
+            lipschitz[rows], x0=start, tol=tol, max_iter=max_iter
+        )
+
+    def objective(x, rows):
+        p = np.sum(x * returns[rows], axis=1)
+        utility = np.where(p >= 0, p, loss_aversion[rows] * p)
+        return -utility + 0.5 * np.sum(x * hess_matmul(x, rows), axis=1)
+
+    all_rows = np.arange(n_rows)
+    gain = solve(all_rows, np.ones(n_rows), x0)
+    x = gain.x.copy()
+    iterations = gain.iterations.copy()
+    converged = gain.converged.copy()
+    branch = ['gain'] * n_rows
+
+    # With loss_aversion >= 1 the utility is concave, so a branch optimum
+    # on its own side of the kink is the global optimum
+    gain_valid = np.sum(gain.x * returns, axis=1) >= 0
+    rest = np.flatnonzero(~(gain_valid & (loss_aversion >= 1.0)))
+    if rest.size == 0:
+        return BatchQPResult(x=x, iterations=iterations, converged=converged, branch=branch)
+
+    loss = solve(rest, loss_aversion[rest], gain.x[rest])
+    iterations[rest] += loss.iterations
+    loss_valid = np.sum(loss.x * returns[rest], axis=1) <= 0
+
+    # Rows where both branches are valid (only possible for loss_aversion < 1)
+    # keep the better one
+    gain_better = objective(gain.x[rest], rest) <= objective(loss.x, rest)
+    take_loss = loss_valid & ~(gain_valid[rest] & gain_better)
+    for i in np.flatnonzero(take_loss):
+        row = rest[i]
+        x[row], converged[row], branch[row] = loss.x[i], loss.converged[i], 'loss'
+
+    # Both branch optima on the wrong side of the kink. Since w(c)'r is
+    # nondecreasing in c this means 1 < loss_aversion, and the optimum lies
+    # on w'r = 0 with multiplier c in (1, loss_aversion). (At the kink both
+    # branches agree, so a valid branch optimum is always at least as good.)
+    on_kink = ~loss_valid & ~gain_valid[rest]
+    if np.any(on_kink):
+        kink_rows = rest[on_kink]
+        kink = _bisect_kink_batch(solve, returns, kink_rows, loss_aversion[kink_rows], gain.x[kink_rows])
+        x[kink_rows] = kink.x
+        iterations[kink_rows] += kink.iterations
+        converged[kink_rows] = kink.converged
+        for row in kink_rows:
+            branch[row] = 'kink'
+
+    return BatchQPResult(x=x, iterations=iterations, converged=converged, branch=branch)
+
+
+def _bisect_kink_batch(
+    solve: Callable,
+    returns: np.ndarray,
+    rows: np.ndarray,
+    c_hi: np.ndarray,
+    x_start: np.ndarray,
+    max_bisect: int = 60
+) -> BatchQPResult:
+    """
+    Find per-row multipliers c in [1, c_hi] with w(c)'r = 0, where w(c)
+    minimizes 0.5 w'Σw - c w'r, by bisection with warm starts
+    """
+    c_lo = np.ones(len(rows))
+    c_hi = c_hi.astype(float).copy()
+    x = x_start.copy()
+    iterations = np.zeros(len(rows), dtype=int)
+    converged = np.zeros(len(rows), dtype=bool)
+
+    open_rows = np.arange(len(rows))
+    for _ in range(max_bisect):
+        if open_rows.size == 0:
+            break
+        c_mid = 0.5 * (c_lo[open_rows] + c_hi[open_rows])
+        res = solve(rows[open_rows], c_mid, x[open_rows])
+        x[open_rows] = res.x
+        iterations[open_rows] += res.iterations
+        converged[open_rows] = res.converged
+
+        p = np.sum(res.x * returns[rows[open_rows]], axis=1)
+        below = p < 0
+        c_lo[open_rows[below]] = c_mid[below]
+        c_hi[open_rows[~below]] = c_mid[~below]
+        done = (np.abs(p) <= 1e-12) | (c_hi[open_rows] - c_lo[open_rows] <= 1e-12 * c_mid)
+        open_rows = open_rows[~done]
+
+    return BatchQPResult(x=x, iterations=iterations, converged=converged)
@@ -0,0 +1,300 @@
+"""
+Transaction-cost-aware rebalancing
+Behavioral MVO from the current holdings with linear and quadratic trading
+costs and a no-trade band, solved by proximal FISTA.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Union
+import numpy as np
+
+from qp_solver import QPResult, estimate_lipschitz
+
+
+# Weight changes at or below this are not reported as trades
+TRADE_TOL = 1e-6
+
+
+@dataclass
+class RebalanceResult:
+    x: np.ndarray
+    turnover: float  # sum |x - current|
+    cost: float  # linear + quadratic trading cost of the move
+    free_assets: int  # assets allowed to trade in the final solve
+    iterations: int
+    converged: bool
+    branch: str
+
+
+def current_weights_from_positions(positions: Sequence, assets: List[str]) -> np.ndarray:
+    """
+    Current weights of the universe from Position rows (objects or dicts
+    with symbol, current_value, weight)
+
+    Weights come from current_value where every position has one, else
+    from the stored weight, normalized over holdings inside the universe.
+    Assets not held get 0; an empty book gives all zeros (all cash).
+    """
+    def field(position, name):
+        return position.get(name) if isinstance(position, dict) else getattr(position, name, None)
+
+    index = {symbol.upper(): i for i, symbol in enumerate(assets)}
+    held = [p for p in positions if str(field(p, 'symbol')).upper() in index]
+    use_value = bool(held) and all(field(p, 'current_value') is not None for p in held)
+
+    weights = np.zeros(len(assets))
+    for position in held:
+        amount = field(position, 'current_value' if use_value else 'weight') or 0.0
+        weights[index[str(field(position, 'symbol')).upper()]] += max(float(amount), 0.0)
+    total = weights.sum()
+    return weights / total if total > 0 else weights
+
+
+def trade_list(
+    assets: List[str],
+    current: np.ndarray,
+    target: np.ndarray,
+    portfolio_value: Optional[float] = None,
+    prices: Optional[Dict[str, float]] = None
+) -> List[Dict]:
+    """
+    Trades that move current to target weights, largest first; with a
+    portfolio value (and per-symbol prices) each trade also carries its
+    value (and share quantity)
+    """
+    delta = np.asarray(target, dtype=float) - np.asarray(current, dtype=float)
+    trades = []
+    for i in np.argsort(-np.abs(delta)):
+        if abs(delta[i]) <= TRADE_TOL:
+            break
+        trade = {
+            'symbol': assets[i],
+            'side': 'buy' if delta[i] > 0 else 'sell',
+            'current_weight': float(current[i]),
+            'target_weight': float(target[i]),
+            'weight_change': float(delta[i])
+        }
+        if portfolio_value is not None:
+            trade['value'] = float(delta[i] * portfolio_value)
+            price = (prices or {}).get(assets[i])
+            if price:
+                trade['quantity'] = float(delta[i] * portfolio_value / price)
+        trades.append(trade)
+    return trades
+
+
+def solve_rebalance(
+    adjusted_returns: np.ndarray,
+    adjusted_cov,
+    loss_aversion: float,
+    current: np.ndarray,
+    lower: Union[float, np.ndarray],
+    upper: Union[float, np.ndarray],
+    linear_cost: Union[float, np.ndarray] = 0.001,
+    quadratic_cost: Union[float, np.ndarray] = 0.0,
+    no_trade_band: float = 0.0,
+    tol: float = 1e-10,
+    max_iter: int = 5000
+) -> RebalanceResult:
+    """
+    Minimize  -u(w'r) + 0.5 w'Σw + sum_i a_i |w_i - w0_i| + 0.5 b_i (w_i - w0_i)^2
+    over sum(w) = 1, lower <= w <= upper, starting from current weights w0
+
+    u is the prospect utility of solve_prospect_mvo and the kink at w'r = 0
+    is handled the same way (gain branch, loss branch, bisection on the
+    multiplier). Each branch is solved by FISTA on the smooth part with a
+    proximal step for the L1 cost: per asset a soft-threshold around w0
+    clipped to the box, with the budget met by a scalar shift found by
+    bisection.
+
+    The no-trade band suppresses small trades: assets whose trade is at
+    most no_trade_band are held at w0 and the problem is re-solved over
+    the remaining assets only (their covariance block, with the held
+    assets folded into the linear term), repeated until no new asset
+    falls inside the band. Current weights outside [lower, upper] are
+    always traded back inside.
+
+    Args:
+        current: Current weights w0 (may sum to less than 1, e.g. cash)
+        linear_cost: Proportional cost a per unit of weight traded
+            (e.g. 0.001 = 10 bp)
+        quadratic_cost: Impact coefficient b
+        no_trade_band: Largest weight change that is not worth trading
+
+    Raises:
+        ValueError: if the weight bounds cannot sum to one
+    """
+    returns = np.asarray(adjusted_returns, dtype=float)
+    n = len(returns)
+    current = np.asarray(current, dtype=float)
+    lower = np.broadcast_to(np.asarray(lower, dtype=float), n)
+    upper = np.broadcast_to(np.asarray(upper, dtype=float), n)
+    if lower.sum() > 1.0 + 1e-12 or upper.sum() < 1.0 - 1e-12:
+        raise ValueError("Weight bounds are infeasible")
+    linear_cost = np.broadcast_to(np.asarray(linear_cost, dtype=float), n)
+    quadratic_cost = np.broadcast_to(np.asarray(quadratic_cost, dtype=float), n)
+    dense_cov = adjusted_cov if isinstance(adjusted_cov, np.ndarray) else adjusted_cov.to_dense()
+    lipschitz = estimate_lipschitz(lambda v: dense_cov @ v, n)
+
+    x = _solve_subset(
+        np.arange(n), np.zeros(0, dtype=int), returns, dense_cov, loss_aversion, current,
+        lower, upper, linear_cost, quadratic_cost, lipschitz, current, tol, max_iter
+    )
+    free = np.arange(n)
+    in_bounds = (current >= lower - 1e-12) & (current <= upper + 1e-12)
+    while no_trade_band > 0:
+        frozen = np.abs(x.x - current) <= no_trade_band
+        frozen &= in_bounds
+        if not np.any(frozen[free]) or np.all(frozen):
+            break
+        free = np.flatnonzero(~frozen)
+        fixed = np.flatnonzero(frozen)
+        if current[fixed].sum() > 1.0 or (
+            current[fixed].sum() + upper[free].sum() < 1.0 - 1e-12
+        ) or current[fixed].sum() + lower[free].sum() > 1.0 + 1e-12:
+            break
+        x = _solve_subset(
+            free, fixed, returns, dense_cov, loss_aversion, current,
+            lower, upper, linear_cost, quadratic_cost, lipschitz, x.x, tol, max_iter
+        )
+
+    weights = x.x
+    delta = weights - current
+    return RebalanceResult(
+        x=weights,
+        turnover=float(np.abs(delta).sum()),
+        cost=float(linear_cost @ np.abs(delta) + 0.5 * quadratic_cost @ delta ** 2),
+        free_assets=len(free),
+        iterations=x.iterations,
+        converged=x.converged,
+        branch=x.branch
+    )
+
+
+def _solve_subset(free, fixed, returns, cov, loss_aversion, current, lower, upper,
+                  linear_cost, quadratic_cost, lipschitz, x0, tol, max_iter) -> QPResult:
+    """Prospect-kink solve over the free assets, fixed assets held at current"""
+    held = current[fixed]
+    cov_ff = cov[np.ix_(free, free)]
+    # Interaction of the held block with the free weights, and its return
+    coupling = cov[np.ix_(free, fixed)] @ held
+    fixed_return = returns[fixed] @ held
+    r = returns[free]
+    w0 = current[free]
+    a, b = linear_cost[free], quadratic_cost[free]
+    lo, hi = lower[free], upper[free]
+    total = 1.0 - held.sum()
+    step_l = lipschitz + np.max(b, initial=0.0)
+
+    def solve(coef, start):
+        return _prox_fista(cov_ff, coupling, coef * r, w0, a, b, lo, hi, total, step_l, start, tol, max_iter)
+
+    def objective(y):
+        p = y @ r + fixed_return
+        utility = p if p >= 0 else loss_aversion * p
+        d = y - w0
+        return -utility + 0.5 * y @ (cov_ff @ y) + coupling @ y + a @ np.abs(d) + 0.5 * b @ d ** 2
+
+    start = x0[free]
+    gain = solve(1.0, start)
+    iterations = gain[1]
+    best, converged, branch = gain[0], gain[2], 'gain'
+    gain_valid = best @ r + fixed_return >= 0
+    if not (gain_valid and loss_aversion >= 1.0):
+        loss = solve(loss_aversion, best)
+        iterations += loss[1]
+        loss_valid = loss[0] @ r + fixed_return <= 0
+        if loss_valid and not (gain_valid and objective(best) <= objective(loss[0])):
+            best, converged, branch = loss[0], loss[2], 'loss'
+        elif not loss_valid and not gain_valid:
+            # Optimum on the kink: bisect the multiplier (w(c)'r is nondecreasing in c)
+            c_lo, c_hi = 1.0, float(loss_aversion)
+            for _ in range(60):
+                c_mid = 0.5 * (c_lo + c_hi)
+                best, used, converged = solve(c_mid, best)
+                iterations += used
+                p = best @ r + fixed_return
+                if p < 0:
+                    c_lo = c_mid
+                else:
+                    c_hi = c_mid
+                if abs(p) <= 1e-12 or c_hi - c_lo <= 1e-12 * c_mid:
+                    break
+            branch = 'kink'
+
+    x = current.copy()
+    x[free] = best
+    return QPResult(x=x, iterations=iterations, converged=converged, branch=branch)
+
+
+def _prox_fista(cov, coupling, linear, center, l1, l2, lower, upper, total, lipschitz, x0, tol, max_iter):
+    """
+    Minimize 0.5 x'Σx + coupling'x - linear'x + 0.5 sum l2 (x - center)^2
+    + sum l1 |x - center| over sum(x) = total, lower <= x <= upper
+
+    FISTA with adaptive restart and backtracking as in solve_box_budget_qp;
+    the projection is replaced by the proximal map of the L1 term.
+    """
+    def smooth_grad(y):
+        return cov @ y + coupling - linear + l2 * (y - center)
+
+    def hess(d):
+        return cov @ d + l2 * d
+
+    x = _prox_l1_budget(np.asarray(x0, dtype=float), center, 0.0 * l1, lower, upper, total)
+    y = x
+    step_l = max(lipschitz, 1e-12)
+    t = 1.0
+    for iteration in range(1, max_iter + 1):
+        grad = smooth_grad(y)
+        while True:
+            x_new = _prox_l1_budget(y - grad / step_l, center, l1 / step_l, lower, upper, total)
+            d = x_new - y
+            if np.dot(d, hess(d)) <= step_l * np.dot(d, d) * (1 + 1e-12):
+                break
+            step_l *= 2.0
+
+        if np.max(np.abs(d), initial=0.0) <= tol:
+            return x_new, iteration, True
+
+        if np.dot(y - x_new, x_new - x) > 0:
+            t = 1.0
+        t_new = 0.5 * (1 + np.sqrt(1 + 4 * t * t))
+        y = x_new + (t - 1) / t_new * (x_new - x)
+        x, t = x_new, t_new
+
+    return x, max_iter, False
+
+
+def _prox_l1_budget(v, center, threshold, lower, upper, total, n_bisect=100):
+    """
+    argmin 0.5 ||x - v||^2 + sum threshold |x - center|
+    s.t. sum(x) = total, lower <= x <= upper
+
+    x(tau) = clip(center + soft(v - tau - center, threshold), lower, upper)
+    is nonincreasing and piecewise linear in the budget multiplier tau:
+    bisect tau, then interpolate inside the final bracket.
+    """
+    if len(v) == 0:
+        return v
+
+    def at(tau):
+        shifted = v - tau - center
+        return np.clip(
+            center + np.sign(shifted) * np.maximum(np.abs(shifted) - threshold, 0.0), lower, upper
+        )
+
+    tau_lo = np.min(v - upper - threshold - np.abs(center)) - 1.0
+    tau_hi = np.max(v - lower + threshold + np.abs(center)) + 1.0
+    for _ in range(n_bisect):
+        tau = 0.5 * (tau_lo + tau_hi)
+        if at(tau).sum() > total:
+            tau_lo = tau
+        else:
+            tau_hi = tau
+        if tau_hi - tau_lo <= 1e-15 * max(1.0, abs(tau)):
+            break
+    x_lo, x_hi = at(tau_lo), at(tau_hi)
+    s_lo, s_hi = x_lo.sum(), x_hi.sum()
+    if s_lo - s_hi <= 0:
+        return x_hi
+    return x_lo + (x_hi - x_lo) * (s_lo - total) / (s_lo - s_hi)
@@ -0,0 +1,120 @@
+"""
+Incremental re-optimization state per portfolio
+Keeps the last solution so the next solve can warm-start from it, or be
+skipped when the market inputs have barely moved.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional, Tuple
+import numpy as np
+
+from optimization_cache import optimization_fingerprint
+
+
+@dataclass
+class ReoptimizationState:
+    weights: np.ndarray
+    expected_returns: np.ndarray
+    risk: np.ndarray  # Σ w of the previous solution; the covariance itself is not kept
+    setup_key: str  # fingerprint of profile, constraints, method and solver
+    result: Dict
+
+
+def input_drift(state: ReoptimizationState, expected_returns: np.ndarray, cov_matrix) -> float:
+    """
+    Relative change of the inputs as seen by the previous solution:
+    max of |Δμ|∞ / |μ|∞ and |ΔΣ w|∞ / |Σ w|∞ with w the previous weights
+
+    Measuring ΔΣ along w is matrix-free (works for FactorCovariance),
+    tracks what actually moves the optimality conditions at w and only
+    needs the stored N-vector Σ w, not the old matrix.
+    """
+    weights = state.weights
+    mu_scale = max(np.max(np.abs(state.expected_returns)), 1e-12)
+    mu_drift = np.max(np.abs(expected_returns - state.expected_returns)) / mu_scale
+
+    risk_scale = max(np.max(np.abs(state.risk)), 1e-12)
+    cov_drift = np.max(np.abs(cov_matrix @ weights - state.risk)) / risk_scale
+    return float(max(mu_drift, cov_drift))
+
+
+class ReoptimizationStore:
+    """
+    Last solution per (portfolio, universe, method), least-recently-used
+    portfolios evicted beyond max_portfolios
+
+    plan() says whether a new request can reuse the stored result
+    outright, should warm-start from the stored weights, or must start
+    cold. A profile or constraint change still warm-starts (the old
+    weights are usually close) but never reuses.
+    """
+
+    def __init__(self, max_portfolios: int = 4096, tolerance: float = 1e-4):
+        self.max_portfolios = max_portfolios
+        self.tolerance = tolerance
+        self._states: 'OrderedDict[Hashable, ReoptimizationState]' = OrderedDict()
+
+    def plan(
+        self,
+        key: Hashable,
+        user_profile: Dict,
+        expected_returns: np.ndarray,
+        cov_matrix,
+        constraints: Dict,
+        method: str,
+        solver: str,
+        **options
+    ) -> Tuple[str, Optional[ReoptimizationState]]:
+        """
+        Returns ('reuse' | 'warm' | 'cold', state); state is None when cold.
+        Extra keyword options (e.g. Black-Litterman views) are part of the setup.
+        """
+        state = self._states.get(key)
+        if state is None or len(state.weights) != len(expected_returns):
+            return 'cold', None
+        self._states.move_to_end(key)
+
+        setup_key = optimization_fingerprint(
+            user_profile, np.zeros(0), np.zeros(0), constraints, method, solver=solver, **options
+        )
+        if (
+            setup_key == state.setup_key
+            and input_drift(state, expected_returns, cov_matrix) <= self.tolerance
+        ):
+            return 'reuse', state
+        return 'warm', state
+
+    def record(
+        self,
+        key: Hashable,
+        user_profile: Dict,
+        expected_returns: np.ndarray,
+        cov_matrix,
+        constraints: Dict,
+        method: str,
+        solver: str,
+        result: Dict,
+        **options
+    ) -> None:
+        """Store a fresh solution as the baseline for the next request"""
+        if self.max_portfolios <= 0:
+            return
+        weights = np.asarray(result['weights'], dtype=float)
+        self._states[key] = ReoptimizationState(
+            weights=weights,
+            expected_returns=np.array(expected_returns, dtype=float),
+            risk=np.asarray(cov_matrix @ weights, dtype=float),
+            setup_key=optimization_fingerprint(
+                user_profile, np.zeros(0), np.zeros(0), constraints, method, solver=solver, **options
+            ),
+            result=result
+        )
+        self._states.move_to_end(key)
+        while len(self._states) > self.max_portfolios:
+            self._states.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        self._states.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._states)
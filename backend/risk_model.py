@@ -0,0 +1,311 @@
+"""
+Covariance and expected-return estimation from cached market data
+Sample, Ledoit-Wolf shrinkage and EWMA estimators with rank-1 incremental updates.
+"""
+from collections import deque
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+ESTIMATORS = ('sample', 'ledoit_wolf', 'ewma')
+
+
+@dataclass
+class RiskEstimate:
+    symbols: List[str]
+    expected_returns: np.ndarray  # annualized
+    cov_matrix: np.ndarray  # annualized
+    estimator: str
+    n_observations: int
+    as_of: Optional[str] = None
+
+
+class IncrementalCovariance:
+    """
+    Running mean/covariance of asset returns updated one bar at a time
+
+    Sample and Ledoit-Wolf estimates keep a rolling window: each new bar is
+    a rank-1 Welford update, and the bar leaving the window a rank-1
+    downdate, so a bar costs O(N^2) instead of O(T N^2) for a full refit.
+    EWMA uses the exponentially weighted recursion (no window needed).
+    """
+
+    def __init__(
+        self,
+        n_assets: int,
+        window: Optional[int] = 252,
+        estimator: str = 'ledoit_wolf',
+        ewma_decay: float = 0.94
+    ):
+        if estimator not in ESTIMATORS:
+            raise ValueError(f"Unknown estimator: {estimator}")
+        self.n_assets = n_assets
+        self.window = window
+        self.estimator = estimator
+        self.ewma_decay = ewma_decay
+        self.n_observations = 0
+        self.mean = np.zeros(n_assets)
+        self._m2 = np.zeros((n_assets, n_assets))  # sum of outer products of deviations
+        self._rows = deque()
+
+    def fit(self, returns: np.ndarray) -> 'IncrementalCovariance':
+        """Initialize from a T x N block of returns (last `window` rows kept)"""
+        returns = np.asarray(returns, dtype=float)
+        if self.estimator == 'ewma':
+            for row in returns:
+                self.update(row)
+            return self
+
+        if self.window is not None:
+            returns = returns[-self.window:]
+        self._rows = deque(returns)
+        self.n_observations = len(returns)
+        if self.n_observations:
+            self.mean = returns.mean(axis=0)
+            deviations = returns - self.mean
+            self._m2 = deviations.T @ deviations
+        return self
+
+    def update(self, row: np.ndarray) -> None:
+        """Add one bar of returns (and drop the oldest bar once the window is full)"""
+        row = np.asarray(row, dtype=float)
+
+        if self.estimator == 'ewma':
+            if self.n_observations == 0:
+                self.mean = row.copy()
+            else:
+                delta = row - self.mean
+                self.mean = self.mean + (1 - self.ewma_decay) * delta
+                self._m2 = self.ewma_decay * (self._m2 + (1 - self.ewma_decay) * np.outer(delta, delta))
+            self.n_observations += 1
+            return
+
+        # Welford rank-1 update
+        self.n_observations += 1
+        delta = row - self.mean
+        self.mean = self.mean + delta / self.n_observations
+        self._m2 += np.outer(delta, row - self.mean)
+        self._rows.append(row)
+
+        # Rank-1 downdate for the bar leaving the window
+        if self.window is not None and self.n_observations > self.window:
+            old = self._rows.popleft()
+            self.n_observations -= 1
+            delta = old - self.mean
+            self.mean = self.mean - delta / self.n_observations
+            self._m2 -= np.outer(delta, old - self.mean)
+
+    def covariance(self) -> np.ndarray:
+        """Per-period covariance for the configured estimator"""
+        if self.estimator == 'ewma':
+            return self._m2.copy()
+        if self.n_observations < 2:
+            raise ValueError("At least two observations are required")
+        if self.estimator == 'sample':
+            return self._m2 / (self.n_observations - 1)
+        return self._ledoit_wolf()
+
+    def _ledoit_wolf(self) -> np.ndarray:
+        """
+        Ledoit-Wolf (2004) shrinkage towards a scaled identity
+
+        The intensity needs sum_t ||x_t||^4 over the centered window, which
+        is O(T N); the O(N^2) moments come from the running estimate.
+        """
+        n_obs, n = self.n_observations, self.n_assets
+        emp_cov = self._m2 / n_obs
+        mu = np.trace(emp_cov) / n
+        delta = (np.sum(emp_cov ** 2) - 2 * mu * np.trace(emp_cov) + n * mu ** 2) / n
+        if delta <= 0:
+            return emp_cov
+
+        centered = np.asarray(self._rows) - self.mean
+        fourth = np.sum(np.sum(centered ** 2, axis=1) ** 2)
+        beta = (fourth / n_obs - np.sum(emp_cov ** 2)) / (n * n_obs)
+        shrinkage = min(max(beta, 0.0), delta) / delta
+
+        shrunk = (1 - shrinkage) * emp_cov
+        shrunk.flat[::n + 1] += shrinkage * mu
+        return shrunk
+
+
+class FactorCovariance:
+    """
+    Covariance stored as a factor model: Σ = B F B' + diag(d)
+
+    Memory is O(N K) instead of O(N^2) and Σ @ w costs O(N K), so the
+    optimizer can screen universes of thousands of symbols. Supports the
+    operations the optimizer needs (Σ @ x, x @ Σ, diagonal, diagonal
+    shifts) without ever materializing the N x N matrix.
+    """
+
+    # Make NumPy defer to __rmatmul__ for ndarray @ FactorCovariance
+    __array_ufunc__ = None
+
+    def __init__(self, loadings: np.ndarray, factor_cov: np.ndarray, specific_var: np.ndarray):
+        self.loadings = np.asarray(loadings, dtype=float)        # B: N x K
+        self.factor_cov = np.asarray(factor_cov, dtype=float)    # F: K x K
+        self.specific_var = np.asarray(specific_var, dtype=float)  # d: N
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        n = len(self.specific_var)
+        return n, n
+
+    @property
+    def nbytes(self) -> int:
+        return self.loadings.nbytes + self.factor_cov.nbytes + self.specific_var.nbytes
+
+    def __len__(self) -> int:
+        return len(self.specific_var)
+
+    def __matmul__(self, x: np.ndarray) -> np.ndarray:
+        """Σ @ x for a vector or an N x P block"""
+        x = np.asarray(x, dtype=float)
+        systematic = self.loadings @ (self.factor_cov @ (self.loadings.T @ x))
+        if x.ndim == 1:
+            return systematic + self.specific_var * x
+        return systematic + self.specific_var[:, None] * x
+
+    def __rmatmul__(self, x: np.ndarray) -> np.ndarray:
+        """x @ Σ for a vector or a P x N block (Σ is symmetric)"""
+        x = np.asarray(x, dtype=float)
+        return ((x @ self.loadings) @ self.factor_cov) @ self.loadings.T + x * self.specific_var
+
+    def diagonal(self) -> np.ndarray:
+        return np.sum((self.loadings @ self.factor_cov) * self.loadings, axis=1) + self.specific_var
+
+    def add_diagonal(self, extra: np.ndarray) -> 'FactorCovariance':
+        """Σ + diag(extra), still in factor form"""
+        return FactorCovariance(self.loadings, self.factor_cov, self.specific_var + extra)
+
+    def copy(self) -> 'FactorCovariance':
+        return FactorCovariance(
+            self.loadings.copy(), self.factor_cov.copy(), self.specific_var.copy()
+        )
+
+    def to_dense(self) -> np.ndarray:
+        dense = self.loadings @ self.factor_cov @ self.loadings.T
+        dense.flat[::len(self) + 1] += self.specific_var
+        return dense
+
+
+def fit_factor_model(returns: np.ndarray, n_factors: int = 20) -> FactorCovariance:
+    """
+    Statistical (PCA) factor model from a T x N returns block
+
+    Uses a thin SVD of the centered returns, so the N x N sample covariance
+    is never formed. Specific variance is the residual sample variance,
+    floored at a small fraction of the total to keep Σ positive definite.
+    """
+    returns = np.asarray(returns, dtype=float)
+    n_obs = len(returns)
+    centered = returns - returns.mean(axis=0)
+    _, singular_values, vt = np.linalg.svd(centered, full_matrices=False)
+
+    k = min(n_factors, len(singular_values))
+    loadings = vt[:k].T
+    factor_var = singular_values[:k] ** 2 / (n_obs - 1)
+
+    total_var = np.sum(centered ** 2, axis=0) / (n_obs - 1)
+    systematic_var = (loadings ** 2) @ factor_var
+    specific_var = np.maximum(total_var - systematic_var, 1e-4 * total_var + 1e-12)
+
+    return FactorCovariance(loadings, np.diag(factor_var), specific_var)
+
+
+def returns_from_market_data(records_by_symbol: Dict[str, List[Dict]]) -> pd.DataFrame:
+    """
+    Align close prices from DataCollector.get_market_data records and convert
+    them to simple returns (rows: bar time, columns: symbols)
+    """
+    closes = {}
+    for symbol, records in records_by_symbol.items():
+        series = pd.Series(
+            [record.get('close') for record in records],
+            index=pd.to_datetime([record['time'] for record in records], utc=True),
+            dtype=float
+        )
+        closes[symbol] = series[~series.index.duplicated(keep='last')]
+
+    prices = pd.concat(closes, axis=1, join='inner').sort_index().dropna()
+    return prices.pct_change().iloc[1:]
+
+
+class RiskModel:
+    """
+    Expected returns and covariance for a universe, built from DataCollector
+    history and cached per (universe, window, estimator)
+
+    A repeated call whose universe has no new bars returns the cached
+    estimate untouched; new bars are folded in with rank-1 updates.
+    Calls for the same key are serialized (estimate runs in worker
+    threads), so concurrent requests never fold the same bars in twice.
+    """
+
+    def __init__(self, data_collector, periods_per_year: int = 252):
+        self.data_collector = data_collector
+        self.periods_per_year = periods_per_year
+        self._states: Dict[Tuple, Dict] = {}
+        self._locks: Dict[Tuple, Lock] = {}
+        self._locks_lock = Lock()
+
+    def estimate(
+        self,
+        symbols: List[str],
+        window: int = 252,
+        estimator: str = 'ledoit_wolf',
+        period: str = '2y',
+        interval: str = '1d'
+    ) -> RiskEstimate:
+        """
+        Annualized expected returns and covariance for the given symbols
+        """
+        symbols = [symbol.upper() for symbol in symbols]
+        key = (tuple(symbols), window, estimator, period, interval)
+
+        records = {
+            symbol: self.data_collector.get_market_data(symbol, period, interval)
+            for symbol in symbols
+        }
+        if any(not rows for rows in records.values()):
+            raise ValueError("Market data unavailable for one or more symbols")
+        latest = tuple(rows[-1]['time'] for rows in records.values())
+
+        with self._locks_lock:
+            lock = self._locks.setdefault(key, Lock())
+        with lock:
+            state = self._states.get(key)
+            if state is not None and state['latest'] == latest:
+                return state['estimate']
+
+            returns = returns_from_market_data(records)
+            if len(returns) < 2:
+                raise ValueError("Not enough overlapping history to estimate risk")
+
+            if state is None:
+                model = IncrementalCovariance(len(symbols), window=window, estimator=estimator)
+                model.fit(returns.to_numpy())
+            else:
+                model = state['model']
+                for row in returns[returns.index > state['last_bar']].to_numpy():
+                    model.update(row)
+
+            estimate = RiskEstimate(
+                symbols=symbols,
+                expected_returns=model.mean * self.periods_per_year,
+                cov_matrix=model.covariance() * self.periods_per_year,
+                estimator=estimator,
+                n_observations=model.n_observations,
+                as_of=returns.index[-1].isoformat()
+            )
+            self._states[key] = {
+                'model': model,
+                'latest': latest,
+                'last_bar': returns.index[-1],
+                'estimate': estimate
+            }
+        return estimate
@@ -0,0 +1,170 @@
+"""
+Equal-risk-contribution (risk parity) engine
+Newton-CG on Spinu's convex formulation, with a projected-gradient stage for weight bounds.
+"""
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+
+from qp_solver import project_capped_simplex
+
+
+@dataclass
+class RiskParityResult:
+    weights: np.ndarray
+    risk_contributions: np.ndarray  # fractions of portfolio variance, sum to 1
+    iterations: int
+    converged: bool
+
+
+def solve_equal_risk_contribution(
+    cov_matrix,
+    lower: float = 0.0,
+    upper: float = 1.0,
+    x0: Optional[np.ndarray] = None,
+    budgets: Optional[np.ndarray] = None,
+    tol: float = 1e-10,
+    max_iter: int = 200
+) -> RiskParityResult:
+    """
+    Weights whose risk contributions w_i (Σw)_i match the budgets (equal by default)
+
+    Stage 1 minimizes Spinu's convex objective 0.5 x'Σx - Σ b_i log x_i,
+    whose minimizer normalized to sum 1 is the risk-budgeting portfolio.
+    Damped Newton steps are solved by preconditioned conjugate gradient
+    using only Σ @ v products, so dense and FactorCovariance inputs both
+    work and each iteration is a handful of matrix-vector products.
+
+    Stage 2 (only if the unconstrained solution breaks a bound) solves the
+    constrained risk-budgeting program
+        min 0.5 w'Σw - c Σ b_i log w_i  s.t. sum(w) = 1, lower <= w <= upper
+    by spectral projected gradient. With c = w*'Σw* of the unconstrained
+    solution this has the same optimum when no bound binds.
+
+    Args:
+        cov_matrix: Dense covariance or FactorCovariance
+        lower, upper: Weight bounds
+        x0: Prior weights to warm-start from
+        budgets: Risk budgets (normalized to sum 1); equal if None
+        tol: Stopping tolerance on the risk-budget residual
+        max_iter: Newton iteration cap (the bounded stage allows 50x more)
+    """
+    n = len(cov_matrix)
+    b = np.ones(n) / n if budgets is None else np.asarray(budgets, dtype=float) / np.sum(budgets)
+    diag = cov_matrix.diagonal()
+
+    # Start on the ray through the prior weights (or inverse volatility)
+    # at the scale minimizing the objective along it
+    u = np.asarray(x0, dtype=float) if x0 is not None else 1.0 / np.sqrt(diag)
+    u = np.maximum(u, 1e-12)
+    x = u / np.sqrt(u @ (cov_matrix @ u))
+
+    sigma_x = cov_matrix @ x
+    iterations = 0
+    converged = False
+    for iterations in range(1, max_iter + 1):
+        residual = x * sigma_x - b
+        if np.max(np.abs(residual)) <= tol:
+            converged = True
+            break
+
+        grad = sigma_x - b / x
+        hess_diag = b / x ** 2
+        step = _conjugate_gradient(
+            lambda v: cov_matrix @ v + hess_diag * v,
+            -grad,
+            diag + hess_diag,
+            rel_tol=min(0.5, np.sqrt(np.linalg.norm(grad)))
+        )
+
+        # Fraction-to-boundary rule keeps x > 0, then Armijo backtracking
+        shrink = step < 0
+        t = min(1.0, 0.99 * np.min(-x[shrink] / step[shrink])) if np.any(shrink) else 1.0
+        f_x = 0.5 * x @ sigma_x - b @ np.log(x)
+        slope = grad @ step
+        while True:
+            x_new = x + t * step
+            sigma_new = cov_matrix @ x_new
+            if 0.5 * x_new @ sigma_new - b @ np.log(x_new) <= f_x + 1e-4 * t * slope or t < 1e-12:
+                break
+            t *= 0.5
+        x, sigma_x = x_new, sigma_new
+
+    weights = x / x.sum()
+
+    if np.any(weights < lower - 1e-12) or np.any(weights > upper + 1e-12):
+        scale = weights @ (cov_matrix @ weights)
+        weights, extra_iterations, converged = _bounded_risk_budget(
+            cov_matrix, b, scale, lower, upper, weights, tol, 50 * max_iter
+        )
+        iterations += extra_iterations
+
+    marginal = cov_matrix @ weights
+    contributions = weights * marginal
+    return RiskParityResult(
+        weights=weights,
+        risk_contributions=contributions / contributions.sum(),
+        iterations=iterations,
+        converged=converged
+    )
+
+
+def _conjugate_gradient(matvec, rhs, precond_diag, rel_tol, max_iter=100):
+    """Preconditioned CG for H p = rhs with a diagonal preconditioner"""
+    p = np.zeros_like(rhs)
+    r = rhs.copy()
+    z = r / precond_diag
+    d = z.copy()
+    rz = r @ z
+    target = rel_tol * np.linalg.norm(rhs)
+    for _ in range(max_iter):
+        if np.linalg.norm(r) <= target:
+            break
+        hd = matvec(d)
+        alpha = rz / (d @ hd)
+        p += alpha * d
+        r -= alpha * hd
+        z = r / precond_diag
+        rz_new = r @ z
+        d = z + (rz_new / rz) * d
+        rz = rz_new
+    return p
+
+
+def _bounded_risk_budget(cov_matrix, budgets, scale, lower, upper, w0, tol, max_iter):
+    """
+    Spectral projected gradient on 0.5 w'Σw - scale * Σ b_i log w_i over
+    the budget/box set (see solve_equal_risk_contribution)
+    """
+    lower = max(float(lower), 1e-12)
+
+    def objective(w, sigma_w):
+        return 0.5 * w @ sigma_w - scale * budgets @ np.log(w)
+
+    w = project_capped_simplex(w0, lower, upper)
+    sigma_w = cov_matrix @ w
+    grad = sigma_w - scale * budgets / w
+    alpha = 1.0 / np.max(np.abs(grad)) if np.any(grad) else 1.0
+
+    for iteration in range(1, max_iter + 1):
+        direction = project_capped_simplex(w - alpha * grad, lower, upper) - w
+        if np.max(np.abs(direction)) <= tol:
+            return w, iteration, True
+
+        f_w = objective(w, sigma_w)
+        slope = grad @ direction
+        t = 1.0
+        while True:
+            w_new = w + t * direction
+            sigma_new = cov_matrix @ w_new
+            if objective(w_new, sigma_new) <= f_w + 1e-4 * t * slope or t < 1e-12:
+                break
+            t *= 0.5
+
+        grad_new = sigma_new - scale * budgets / w_new
+        s, y = w_new - w, grad_new - grad
+        sy = s @ y
+        alpha = np.clip((s @ s) / sy, 1e-10, 1e10) if sy > 0 else 1e10
+        w, sigma_w, grad = w_new, sigma_new, grad_new
+
+    return w, max_iter, False
@@ -0,0 +1,142 @@
+"""
+Monte Carlo scenario engine for portfolio risk metrics
+Simulated or bootstrapped return paths, generated and reduced in chunks.
+"""
+from typing import Dict, Optional, Union
+import numpy as np
+
+from risk_model import FactorCovariance
+
+
+DRAWDOWN_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def simulate_portfolio_scenarios(
+    weights: np.ndarray,
+    expected_returns: Optional[np.ndarray] = None,
+    cov_matrix=None,
+    historical_returns: Optional[np.ndarray] = None,
+    n_paths: int = 10000,
+    horizon: int = 252,
+    periods_per_year: int = 252,
+    risk_free_rate: float = 0.02,
+    confidence: float = 0.95,
+    chunk_size: int = 4096,
+    seed: Union[int, np.random.Generator, None] = None
+) -> Dict:
+    """
+    Simulate n_paths portfolio paths of `horizon` periods and summarize them
+
+    Parametric mode (expected_returns/cov_matrix, annualized) draws
+    per-period asset returns from N(mu / ppy, Σ / ppy). With weights
+    rebalanced every period the portfolio return is then exactly
+    N(w'mu / ppy, w'Σw / ppy), so paths are drawn at portfolio level
+    (paths x horizon numbers, never paths x horizon x assets).
+    Bootstrap mode (historical_returns, T x N per-period asset returns)
+    resamples whole historical periods with replacement.
+
+    Paths are generated chunk_size at a time and each chunk is reduced
+    to per-path terminal return and maximum drawdown plus running sums
+    for Sortino, so peak memory is O(chunk_size * horizon) whatever
+    n_paths is. A seed (or Generator) makes results reproducible, and
+    the simulated paths do not depend on chunk_size (summary statistics
+    agree up to floating-point summation order).
+
+    Returns:
+        Dict with horizon return statistics, VaR/CVaR of the horizon
+        return at `confidence` (as positive losses), the maximum-drawdown
+        distribution and the annualized Sortino ratio
+    """
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    weights = np.asarray(weights, dtype=float)
+
+    if historical_returns is not None:
+        portfolio_history = np.asarray(historical_returns, dtype=float) @ weights
+
+        def draw(size):
+            return portfolio_history[rng.integers(0, len(portfolio_history), size=size)]
+    elif expected_returns is not None and cov_matrix is not None:
+        mean = (weights @ expected_returns) / periods_per_year
+        std = np.sqrt(max(weights @ (cov_matrix @ weights), 0.0) / periods_per_year)
+
+        def draw(size):
+            return mean + std * rng.standard_normal(size)
+    else:
+        raise ValueError("Provide expected_returns and cov_matrix, or historical_returns")
+
+    rf_period = risk_free_rate / periods_per_year
+    terminal = np.empty(n_paths)
+    max_drawdown = np.empty(n_paths)
+    total_excess = 0.0
+    downside_sq = 0.0
+
+    for start in range(0, n_paths, chunk_size):
+        stop = min(start + chunk_size, n_paths)
+        returns = draw((stop - start, horizon))
+
+        excess = returns - rf_period
+        total_excess += excess.sum()
+        downside_sq += np.sum(np.minimum(excess, 0.0) ** 2)
+
+        wealth = np.cumprod(1.0 + returns, axis=1)
+        peak = np.maximum.accumulate(np.maximum(wealth, 1.0), axis=1)
+        max_drawdown[start:stop] = np.max(1.0 - wealth / peak, axis=1)
+        terminal[start:stop] = wealth[:, -1] - 1.0
+
+    n_draws = n_paths * horizon
+    mean_excess = total_excess / n_draws * periods_per_year
+    downside_dev = np.sqrt(downside_sq / n_draws * periods_per_year)
+
+    losses = -terminal
+    var = float(np.quantile(losses, confidence))
+    tail = losses[losses >= var]
+    cvar = float(tail.mean()) if tail.size else var
+
+    return {
+        'n_paths': n_paths,
+        'horizon': horizon,
+        'mean_return': float(terminal.mean()),
+        'median_return': float(np.median(terminal)),
+        'return_std': float(terminal.std()),
+        'probability_of_loss': float(np.mean(terminal < 0)),
+        'confidence': confidence,
+        'var': var,
+        'cvar': cvar,
+        'expected_max_drawdown': float(max_drawdown.mean()),
+        'max_drawdown_quantiles': {
+            str(q): float(v) for q, v in zip(DRAWDOWN_QUANTILES, np.quantile(max_drawdown, DRAWDOWN_QUANTILES))
+        },
+        'sortino_ratio': float(mean_excess / downside_dev) if downside_dev > 0 else 0.0
+    }
+
+
+def simulate_asset_returns(
+    expected_returns: np.ndarray,
+    cov_matrix,
+    n_scenarios: int = 5000,
+    seed: Union[int, np.random.Generator, None] = None
+) -> np.ndarray:
+    """
+    n_scenarios x N joint asset return scenarios drawn from N(mu, Σ)
+
+    A FactorCovariance is sampled through its factors (B f + e with
+    f ~ N(0, F), e ~ N(0, diag(d))) without forming Σ; a dense Σ through
+    its symmetric square root, which tolerates semidefinite estimates.
+    """
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    expected_returns = np.asarray(expected_returns, dtype=float)
+
+    if isinstance(cov_matrix, FactorCovariance):
+        factor_root = _psd_sqrt(cov_matrix.factor_cov)
+        factors = rng.standard_normal((n_scenarios, factor_root.shape[0])) @ factor_root
+        specific = rng.standard_normal((n_scenarios, len(expected_returns)))
+        return expected_returns + factors @ cov_matrix.loadings.T + specific * np.sqrt(cov_matrix.specific_var)
+
+    root = _psd_sqrt(np.asarray(cov_matrix, dtype=float))
+    return expected_returns + rng.standard_normal((n_scenarios, len(expected_returns))) @ root
+
+
+def _psd_sqrt(matrix: np.ndarray) -> np.ndarray:
+    """Symmetric square root, negative eigenvalues clipped to zero"""
+    eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+    return (eigenvectors * np.sqrt(np.maximum(eigenvalues, 0.0))) @ eigenvectors.T
@@ -0,0 +1,109 @@
+"""
+Process-pool executor for CPU-bound work (optimization, backtests, bias analysis)
+Keeps blocking NumPy/SciPy solves off the FastAPI event loop.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+import asyncio
+import multiprocessing
+import os
+
+
+class ExecutorBusyError(Exception):
+    """Raised when the job queue is full"""
+
+
+class JobTimeoutError(Exception):
+    """Raised when a job exceeds its timeout"""
+
+
+class ComputeExecutor:
+    """
+    Bounded process pool driven from the event loop
+
+    At most max_workers jobs run at once and at most max_queue more wait
+    for a worker; beyond that, submissions fail fast with ExecutorBusyError
+    instead of piling up. Jobs that exceed job_timeout raise JobTimeoutError.
+    A job that is already running cannot be interrupted, so its worker
+    stays busy, and it keeps counting against the cap, until the job returns.
+
+    With max_workers=0 jobs run on the default thread pool instead, which
+    still keeps the event loop free (useful where processes are unavailable).
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue: int = 32,
+        job_timeout: Optional[float] = 60.0
+    ):
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        self.max_queue = max_queue
+        self.job_timeout = job_timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+
+    def start(self) -> None:
+        """Create the worker pool (idempotent)"""
+        if self._pool is None and self.max_workers > 0:
+            # spawn: forking a process that runs an event loop and threads is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work, drop queued jobs and wait for running ones"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def run(self, func: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """
+        Run func(*args) in a worker and await its result
+
+        func and its arguments must be picklable (module-level functions).
+        """
+        capacity = max(self.max_workers, 1) + self.max_queue
+        if self._in_flight >= capacity:
+            raise ExecutorBusyError(
+                f"Compute queue full ({self._in_flight} jobs in flight)"
+            )
+
+        self.start()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._pool, func, *args)
+        # The slot is held until the job itself finishes, not until we stop
+        # waiting for it: a timed-out job still occupies its worker
+        self._in_flight += 1
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(future), timeout if timeout is not None else self.job_timeout
+            )
+        except asyncio.TimeoutError:
+            raise JobTimeoutError(f"{getattr(func, '__name__', 'job')} timed out")
+
+    def _release(self, future: asyncio.Future) -> None:
+        self._in_flight -= 1
+        if not future.cancelled():
+            future.exception()  # retrieved, so an abandoned job's error is not logged as unhandled
+
+
+def executor_from_env() -> ComputeExecutor:
+    """
+    Build a ComputeExecutor from environment settings:
+    COMPUTE_WORKERS (default: CPU count, 0 = thread pool),
+    COMPUTE_MAX_QUEUE (default 32), COMPUTE_JOB_TIMEOUT seconds (default 60, 0 = none)
+    """
+    workers = os.getenv("COMPUTE_WORKERS")
+    timeout = float(os.getenv("COMPUTE_JOB_TIMEOUT", "60"))
+    return ComputeExecutor(
+        max_workers=int(workers) if workers else None,
+        max_queue=int(os.getenv("COMPUTE_MAX_QUEUE", "32")),
+        job_timeout=timeout if timeout > 0 else None
+    )
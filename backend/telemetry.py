@@ -0,0 +1,144 @@
+"""
+Solver telemetry
+Per-call phase timings, iteration counts and convergence status, plus
+process-wide histograms per optimization method.
+"""
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from threading import Lock
+from typing import Dict, Optional
+import bisect
+import time
+
+import numpy as np
+
+
+# Histogram bucket upper bounds (the last bucket is unbounded)
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+ITERATION_BUCKETS = (1, 10, 100, 1000, 10000)
+
+
+@dataclass
+class SolverTelemetry:
+    method: str
+    solver: str
+    phases: Dict[str, float] = field(default_factory=dict)  # seconds per phase
+    iterations: int = 0
+    function_evaluations: int = 0
+    converged: bool = True
+    status: str = 'optimal'  # 'optimal', 'not_converged' or 'failed'
+    message: str = ''
+    constraint_violation: float = 0.0
+    total_time: float = 0.0
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block; repeated phases accumulate"""
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def solved(
+        self,
+        iterations: int = 0,
+        converged: bool = True,
+        function_evaluations: Optional[int] = None,
+        message: str = ''
+    ) -> None:
+        """Add one solver call's counts; any unconverged call marks the whole run"""
+        self.iterations += int(iterations)
+        self.function_evaluations += int(iterations if function_evaluations is None else function_evaluations)
+        if not converged:
+            self.converged = False
+            if self.status == 'optimal':
+                self.status = 'not_converged'
+        if message:
+            self.message = message
+
+    def solved_scipy(self, result) -> None:
+        """
+        Add a scipy.optimize.minimize result; SLSQP status 9 (iteration
+        limit) is 'not_converged', any other unsuccessful exit is 'failed'
+        """
+        self.solved(result.nit, result.success, result.nfev, str(result.message))
+        if not result.success and result.status != 9:
+            self.failed(str(result.message))
+
+    def failed(self, message: str) -> None:
+        self.converged = False
+        self.status = 'failed'
+        self.message = message
+
+    def check_weights(self, weights: np.ndarray, lower, upper) -> None:
+        """Record the worst budget or bound violation of the raw solver output"""
+        weights = np.asarray(weights, dtype=float)
+        violation = max(
+            abs(weights.sum() - 1.0),
+            float(np.max(np.asarray(lower) - weights, initial=0.0)),
+            float(np.max(weights - np.asarray(upper), initial=0.0))
+        )
+        self.constraint_violation = max(self.constraint_violation, violation)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class TelemetryRegistry:
+    """
+    Process-wide aggregates per method: call and status counts, wall-time
+    and iteration histograms, and total/maximum time per phase
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._methods: Dict[str, Dict] = {}
+
+    def record(self, telemetry: Dict) -> None:
+        """Add one SolverTelemetry.to_dict() record"""
+        with self._lock:
+            stats = self._methods.setdefault(telemetry['method'], {
+                'calls': 0,
+                'status': {},
+                'total_time': 0.0,
+                'max_time': 0.0,
+                'time_histogram': [0] * (len(TIME_BUCKETS) + 1),
+                'iteration_histogram': [0] * (len(ITERATION_BUCKETS) + 1),
+                'phase_time': {},
+                'max_constraint_violation': 0.0
+            })
+            stats['calls'] += 1
+            stats['status'][telemetry['status']] = stats['status'].get(telemetry['status'], 0) + 1
+            stats['total_time'] += telemetry['total_time']
+            stats['max_time'] = max(stats['max_time'], telemetry['total_time'])
+            stats['time_histogram'][bisect.bisect_left(TIME_BUCKETS, telemetry['total_time'])] += 1
+            stats['iteration_histogram'][bisect.bisect_left(ITERATION_BUCKETS, telemetry['iterations'])] += 1
+            for name, seconds in telemetry['phases'].items():
+                stats['phase_time'][name] = stats['phase_time'].get(name, 0.0) + seconds
+            stats['max_constraint_violation'] = max(
+                stats['max_constraint_violation'], telemetry['constraint_violation']
+            )
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            methods = {
+                method: {
+                    **stats,
+                    'status': dict(stats['status']),
+                    'time_histogram': list(stats['time_histogram']),
+                    'iteration_histogram': list(stats['iteration_histogram']),
+                    'phase_time': dict(stats['phase_time']),
+                    'mean_time': stats['total_time'] / stats['calls']
+                }
+                for method, stats in self._methods.items()
+            }
+        return {
+            'time_buckets': list(TIME_BUCKETS),
+            'iteration_buckets': list(ITERATION_BUCKETS),
+            'methods': methods
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._methods.clear()
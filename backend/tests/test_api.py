@@ -1,6 +1,9 @@
 """
 Tests for API endpoints
 """
+import io
+
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
 from main import app
@@ -43,3 +46,101 @@ def test_backtest():
     data = response.json()
     assert "sharpe_ratio" in data
     assert "max_drawdown" in data
+
+
+def test_backtest_stream():
+    """Test streamed plain-text returns give the same metrics as the JSON endpoint"""
+    returns = [0.01, -0.02, 0.015, 0.02, -0.01] * 40
+    body = "\n".join(", ".join(str(r) for r in returns[i:i + 7]) for i in range(0, len(returns), 7))
+    response = client.post("/api/backtest/stream", content=body)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["n_periods"] == len(returns)
+    expected = client.post("/api/backtest/run", json=returns).json()
+    assert abs(data["sharpe_ratio"] - expected["sharpe_ratio"]) < 1e-9
+
+
+def test_backtest_binary_body():
+    """Test a .npy body gives the same metrics as JSON, and bad bodies are rejected"""
+    returns = [0.01, -0.02, 0.015, 0.02, -0.01] * 40
+    buffer = io.BytesIO()
+    np.save(buffer, np.array(returns))
+    response = client.post(
+        "/api/backtest/run", content=buffer.getvalue(), headers={"Content-Type": "application/x-npy"}
+    )
+    assert response.status_code == 200
+    expected = client.post("/api/backtest/run", json=returns).json()
+    assert response.json() == expected
+
+    response = client.post("/api/backtest/run", content=b"junk", headers={"Content-Type": "application/x-npy"})
+    assert response.status_code == 400
+    assert client.post("/api/backtest/run", json=["x"]).status_code == 422
+
+
+def test_backtest_bootstrap():
+    """Test bootstrap intervals and the paired comparison against a benchmark"""
+    returns = [0.01, -0.02, 0.015, 0.02, -0.01] * 20
+    payload = {
+        "returns": returns,
+        "benchmark_returns": [r * 0.5 for r in returns],
+        "n_resamples": 200,
+        "method": "block",
+        "seed": 0
+    }
+    response = client.post("/api/backtest/bootstrap", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    interval = data["metrics"]["sharpe_ratio"]
+    assert interval["lower"] <= interval["estimate"] <= interval["upper"]
+    assert "p_value" in data["comparison"]
+
+    for invalid in ({"returns": []}, {"returns": returns, "n_resamples": 0}, {"returns": returns, "confidence": 1.5}):
+        response = client.post("/api/backtest/bootstrap", json=invalid)
+        assert response.status_code == 400
+        assert "error" in response.json()
+
+
+def test_optimize_batch():
+    """Test batch optimization endpoint"""
+    payload = {
+        "assets": ["AAPL", "MSFT", "GOOGL"],
+        "profiles": [
+            {"loss_aversion_coefficient": 1.5},
+            {"loss_aversion_coefficient": 3.0, "overconfidence_score": 0.8}
+        ]
+    }
+    response = client.post("/api/optimization/optimize-batch", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["weights"]) == 2
+    assert all(abs(sum(row) - 1.0) < 1e-6 for row in data["weights"])
+
+
+def test_optimization_frontier():
+    """Test frontier endpoint returns ordered points and the profile location"""
+    payload = {"assets": ["AAPL", "MSFT", "GOOGL"], "n_points": 5, "constraints": {"min_weight": 0.0}}
+    response = client.post("/api/optimization/frontier", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["points"]) == 5
+    assert data["points"][0]["volatility"] <= data["points"][-1]["volatility"]
+    assert {"frontier_return", "return_gap", "nearest_index"} <= set(data["profile"])
+
+
+def test_optimization_cache_stats():
+    """Test optimization cache stats endpoint"""
+    response = client.get("/api/optimization/cache-stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert {"hits", "misses", "hit_rate", "entries"} <= set(data)
+
+
+def test_optimization_telemetry():
+    """Test batch solves are aggregated into the telemetry endpoint"""
+    payload = {"assets": ["AAPL", "MSFT", "GOOGL"], "profiles": [{"loss_aversion_coefficient": 2.0}]}
+    response = client.post("/api/optimization/optimize-batch", json=payload)
+    assert response.status_code == 200
+    assert response.json()["telemetry"]["status"] in {"optimal", "not_converged", "failed"}
+
+    data = client.get("/api/optimization/telemetry").json()
+    assert data["methods"]["behavioral_mvo"]["calls"] >= 1
@@ -0,0 +1,87 @@
+"""
+Tests for backtest metrics and the vectorized backtest engine
+"""
+import numpy as np
+from backtesting import (
+    StreamingMetrics, backtest_portfolios, compute_metrics_batch, returns_from_prices, run_backtest,
+    weight_schedule
+)
+
+
+def _loop_backtest(returns, schedule, cost):
+    """Period-by-period reference simulation"""
+    holdings, cash, navs, turnover = np.zeros(returns.shape[1]), 1.0, [], []
+    for t, r in enumerate(returns):
+        nav = holdings.sum() + cash
+        traded = 0.0
+        if not np.isnan(schedule[t]).any():
+            current = holdings / nav
+            traded = np.abs(schedule[t] - current).sum()
+            nav *= 1 - cost * traded
+            holdings = schedule[t] * nav
+            cash = nav - holdings.sum()
+        holdings = holdings * (1 + r)
+        navs.append(holdings.sum() + cash)
+        turnover.append(traded)
+    return np.array(navs), np.array(turnover)
+
+
+def test_engine_matches_period_loop():
+    """Test NAV and turnover against a per-period simulation for several strategies"""
+    rng = np.random.default_rng(0)
+    prices = 100 * np.cumprod(1 + rng.normal(0.0005, 0.01, (121, 4)), axis=0)
+    returns = returns_from_prices(prices)
+    schedules = np.stack([
+        weight_schedule(np.array([0.4, 0.3, 0.2, 0.1]), returns, rebalance_every=20),
+        weight_schedule(lambda history: np.ones(4) / 4 if len(history) < 60 else np.array([0, 0, 0.5, 0.3]),
+                        returns, rebalance_every=7),
+        weight_schedule(np.array([0.25, 0.25, 0.25, 0.25]), returns, rebalance_every=1)
+    ])
+
+    result = backtest_portfolios(returns, schedules, transaction_cost=0.002, names=['a', 'b', 'c'])
+    assert result.nav.shape == (3, 120)
+    for s in range(3):
+        nav, turnover = _loop_backtest(returns, schedules[s], 0.002)
+        np.testing.assert_allclose(result.nav[s], nav, rtol=1e-12)
+        np.testing.assert_allclose(result.turnover[s], turnover, atol=1e-12)
+
+    records = result.results()
+    assert [r.total_return for r in records] == list(result.metrics['total_return'])
+    assert records[1].max_drawdown <= 0 and records[1].calmar_ratio != 0
+
+
+def test_metrics_batch_matches_single_series():
+    """Test each row of the batch metrics equals run_backtest on that row"""
+    rng = np.random.default_rng(1)
+    returns = rng.normal(0.0004, 0.012, (5, 300))
+    metrics = compute_metrics_batch(returns, 0.02)
+    for s, row in enumerate(returns):
+        single = run_backtest(list(row), 0.02)
+        assert single.sharpe_ratio == metrics['sharpe_ratio'][s]
+        assert single.sortino_ratio == metrics['sortino_ratio'][s]
+        assert np.isclose(single.calmar_ratio, single.annual_return / -single.max_drawdown)
+
+
+def test_streaming_metrics_match_run_backtest():
+    """Test the chunked accumulator reproduces run_backtest and reports progress"""
+    returns = np.random.default_rng(2).normal(0.0003, 0.01, 10001)
+    snapshots = []
+    streamed = StreamingMetrics(0.02).consume(
+        (r for r in returns), chunk_size=777, on_snapshot=snapshots.append, snapshot_every=2500
+    )
+    expected = run_backtest(list(returns), 0.02)
+    for field, value in vars(expected).items():
+        assert np.isclose(getattr(streamed, field), value, rtol=1e-10), field
+
+    assert [s['n_periods'] for s in snapshots] == [3108, 6216, 9324]
+    assert np.isclose(snapshots[0]['max_drawdown'], run_backtest(list(returns[:3108])).max_drawdown)
+
+    chunked = StreamingMetrics(0.02).consume(np.array_split(returns, 9))
+    assert np.isclose(chunked.volatility, expected.volatility, rtol=1e-12)
+
+    # A first-period loss is not a drawdown: the running max starts at the first value
+    losing_start = [-0.1, 0.05, 0.01]
+    for chunks in ([losing_start], [[r] for r in losing_start]):
+        streamed = StreamingMetrics(0.02).consume(chunks)
+        for field, value in vars(run_backtest(losing_start, 0.02)).items():
+            assert np.isclose(getattr(streamed, field), value, rtol=1e-10), field
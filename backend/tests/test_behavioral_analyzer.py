@@ -1,8 +1,11 @@
 """
 Tests for behavioral analyzer
 """
+import numpy as np
+import pandas as pd
 import pytest
 from behavioral_analyzer import BehavioralAnalyzer
+from lot_matching import match_lots
 
 
 def test_disposition_effect():
@@ -33,3 +36,80 @@ def test_overconfidence():
     trades = [{"action": "BUY"} for _ in range(50)]
     score = analyzer._detect_overconfidence(trades, portfolio_value=100000)
     assert 0 <= score <= 1
+
+
+def _trade_history(n_trades, seed=0, symbols=('AAPL', 'MSFT', 'GOOGL', 'AMZN')):
+    """Random buys and sells over several symbols; some trades share a date"""
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp('2022-01-03') + pd.to_timedelta(np.sort(rng.integers(0, n_trades, n_trades)), unit='D')
+    return pd.DataFrame({
+        'symbol': rng.choice(symbols, n_trades),
+        'action': rng.choice(['BUY', 'SELL'], n_trades, p=[0.55, 0.45]),
+        'quantity': rng.integers(1, 100, n_trades).astype(float),
+        'price': 100 * np.exp(rng.normal(0, 0.2, n_trades)),
+        'trade_date': dates
+    })
+
+
+def test_detectors_read_closed_lots():
+    """Test the lot-based scores on a hand-built history with known closed lots"""
+    analyzer = BehavioralAnalyzer()
+    trades = pd.DataFrame({
+        'symbol': ['AAA', 'BBB', 'BBB', 'AAA'],
+        'action': ['BUY', 'BUY', 'SELL', 'SELL'],
+        'quantity': [10.0, 10.0, 10.0, 10.0],
+        'price': [100.0, 100.0, 80.0, 130.0],
+        'trade_date': pd.to_datetime(['2024-01-01', '2024-01-01', '2024-01-03', '2024-01-06'])
+    })
+    # AAA: +30% held 5 days; BBB: -20% held 2 days
+    lots = match_lots(trades)
+    # Quantity-weighted gains 3.0 vs losses 2.0: ratio 0.6
+    assert analyzer._detect_disposition_effect(trades, lots)[0] == pytest.approx(0.2)
+    # Losses held 2 days against gains held 5: 2 / (5 + 1)
+    assert analyzer._detect_loss_aversion(trades, lots)[0] == pytest.approx(1 / 3)
+    # Mean distance of exit from entry is 25%
+    assert analyzer._detect_anchoring_bias(trades, lots)[0] == pytest.approx(0.75)
+
+    trades = _trade_history(300, seed=1)
+    lots = match_lots(trades)
+    frame = lots.to_frame()
+    per_sell = frame.groupby('sell_index').apply(lambda g: g['pnl'].sum() / (g['open_price'] * g['quantity']).sum())
+    expected = min(1.0, (per_sell < -0.1).sum() / (trades['action'] == 'SELL').sum())
+    assert analyzer._detect_regret_aversion(trades, lots)[0] == pytest.approx(expected)
+
+
+def test_analyze_user_trades_matches_lots_once(monkeypatch):
+    """Test analyze_user_trades matches lots once per call and shares them with the detectors"""
+    import behavioral_analyzer
+
+    calls = []
+
+    def counting_match_lots(trades, method='fifo'):
+        calls.append(method)
+        return match_lots(trades, method)
+
+    monkeypatch.setattr(behavioral_analyzer, 'match_lots', counting_match_lots)
+    trades = _trade_history(300, seed=1)
+    analyzer = BehavioralAnalyzer()
+    scores, _ = analyzer.analyze_user_trades(trades.to_dict('records'))
+    assert calls == ['fifo']
+    assert scores.disposition_effect == pytest.approx(analyzer._detect_disposition_effect(trades, match_lots(trades))[0])
+
+    calls.clear()
+    lifo = BehavioralAnalyzer(lot_method='lifo')
+    assert lifo.analyze_user_trades(trades)[0].loss_aversion == pytest.approx(
+        lifo._detect_loss_aversion(trades, match_lots(trades, 'lifo'))[0]
+    )
+    assert calls == ['lifo']
+
+
+def test_detectors_without_matches():
+    """Test histories with no sells, or sells before any buy, score zero"""
+    analyzer = BehavioralAnalyzer()
+    trades = _trade_history(50)
+    only_buys = trades.assign(action='BUY')
+    assert analyzer._detect_disposition_effect(only_buys)[0] == 0.0
+    assert analyzer._detect_loss_aversion(only_buys)[0] == 0.0
+    only_sells = trades.assign(action='SELL')
+    assert analyzer._detect_disposition_effect(only_sells)[0] == 0.0
+    assert analyzer._detect_regret_aversion(only_sells)[0] == 0.0
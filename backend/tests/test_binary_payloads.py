@@ -0,0 +1,81 @@
+"""
+Tests for binary request body decoding
+"""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from binary_payloads import (
+    ARROW_STREAM, NPY, PARQUET, UnsupportedPayloadError, decode_returns, decode_table
+)
+
+# Arrow and Parquet bodies need the optional pyarrow dependency
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+
+def _npy(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
+
+
+def _arrow(table):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _parquet(table):
+    sink = pa.BufferOutputStream()
+    pq.write_table(table, sink)
+    return sink.getvalue().to_pybytes()
+
+
+def test_decode_returns_formats():
+    """Test .npy, Arrow and Parquet bodies decode to the same float series"""
+    returns = np.random.default_rng(0).normal(0, 0.01, 1000)
+    table = pa.table({'date': np.arange(1000), 'returns': returns})
+    assert np.array_equal(decode_returns(_npy(returns), NPY), returns)
+    assert np.array_equal(decode_returns(_npy(returns[:, None]), f'{NPY}; charset=binary'), returns)
+    assert np.array_equal(decode_returns(_npy(returns.astype(np.float32)), NPY), returns.astype(np.float32))
+    assert np.array_equal(decode_returns(_arrow(table), ARROW_STREAM), returns)
+    assert np.array_equal(decode_returns(_parquet(table), PARQUET), returns)
+
+    # .npy views the request body instead of copying it
+    body = _npy(returns)
+    assert np.shares_memory(decode_returns(body, NPY), np.frombuffer(body, dtype=np.uint8))
+
+
+def test_decode_table_formats():
+    """Test trade tables from Arrow, Parquet and structured .npy bodies"""
+    trades = pd.DataFrame({
+        'symbol': ['AAPL', 'MSFT', 'AAPL'],
+        'quantity': [10.0, 5.0, 10.0],
+        'price': [150.0, 300.0, 160.0]
+    })
+    table = pa.Table.from_pandas(trades, preserve_index=False)
+    pd.testing.assert_frame_equal(decode_table(_arrow(table), ARROW_STREAM), trades)
+    pd.testing.assert_frame_equal(decode_table(_parquet(table), PARQUET), trades)
+
+    records = np.array([(10.0, 150.0), (5.0, 300.0)], dtype=[('quantity', 'f8'), ('price', 'f8')])
+    decoded = decode_table(_npy(records), NPY)
+    assert list(decoded.columns) == ['quantity', 'price']
+    assert decoded['price'].tolist() == [150.0, 300.0]
+
+
+def test_decode_errors():
+    """Test malformed bodies raise ValueError and unknown types UnsupportedPayloadError"""
+    with pytest.raises(ValueError):
+        decode_returns(b'not numpy', NPY)
+    with pytest.raises(ValueError):
+        decode_returns(_npy(np.ones(100))[:-8], NPY)
+    with pytest.raises(ValueError):
+        decode_returns(_npy(np.ones((10, 3))), NPY)
+    with pytest.raises(ValueError):
+        decode_table(_npy(np.ones(3)), NPY)
+    with pytest.raises(UnsupportedPayloadError):
+        decode_returns(b'', 'text/csv')
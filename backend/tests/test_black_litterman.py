@@ -0,0 +1,61 @@
+"""
+Tests for Black-Litterman posterior and views
+"""
+import numpy as np
+from black_litterman import posterior_returns, views_from_specs
+from portfolio_optimizer import BehavioralPortfolioOptimizer
+from risk_model import FactorCovariance
+
+
+def test_posterior_matches_textbook_formula():
+    """Test the K x K Woodbury solve against the N x N textbook posterior"""
+    rng = np.random.default_rng(0)
+    factor_cov = FactorCovariance(
+        rng.normal(0, 0.15, size=(30, 3)), np.eye(3), rng.uniform(0.01, 0.05, 30)
+    )
+    cov = factor_cov.to_dense()
+    prior = rng.normal(0.05, 0.02, 30)
+    pick = rng.normal(size=(4, 30))
+    view_returns = rng.normal(0.05, 0.02, 4)
+    omega = rng.uniform(0.001, 0.01, 4)
+    tau = 0.05
+
+    tau_cov_inv = np.linalg.inv(tau * cov)
+    omega_inv = np.diag(1 / omega)
+    expected = np.linalg.solve(
+        tau_cov_inv + pick.T @ omega_inv @ pick,
+        tau_cov_inv @ prior + pick.T @ omega_inv @ view_returns
+    )
+    assert np.allclose(posterior_returns(cov, prior, pick, view_returns, omega, tau), expected)
+    assert np.allclose(posterior_returns(factor_cov, prior, pick, view_returns, omega, tau), expected)
+
+
+def test_black_litterman_views_move_weights():
+    """Test default blend, explicit relative views and sentiment views"""
+    optimizer = BehavioralPortfolioOptimizer({'overconfidence_score': 0.5})
+    expected_returns = np.array([0.10, 0.12, 0.08, 0.15])
+    cov = np.eye(4) * 0.05
+    constraints = {'min_weight': 0.0, 'max_weight': 1.0, 'min_positions': 1}
+
+    # No views: input returns blended with equilibrium at confidence 0.5 / 1.5
+    base = optimizer.optimize_portfolio(expected_returns, cov, constraints, method='black_litterman')
+    equilibrium = 2.5 / (1 + 2.25 * 0.5) * cov @ np.full(4, 0.25)
+    assert np.allclose(base['posterior_returns'], equilibrium + (expected_returns - equilibrium) / 3)
+
+    views = views_from_specs(
+        [{'weights': {'aapl': 1.0, 'MSFT': -1.0}, 'expected_return': 0.05, 'confidence': 0.9}],
+        ['AAPL', 'MSFT', 'GOOGL', 'AMZN']
+    )
+    viewed = optimizer.optimize_portfolio(
+        expected_returns, cov, constraints, method='black_litterman', views=views, solver='qp'
+    )
+    assert viewed['num_views'] == 1
+    assert viewed['posterior_returns'][0] - viewed['posterior_returns'][1] > 0
+    assert viewed['weights'][0] > viewed['weights'][1]
+
+    sentiment = optimizer.optimize_portfolio(
+        expected_returns, cov, constraints, method='black_litterman',
+        views={'sentiment_scores': [0.0, 0.0, 0.8, 0.0], 'sentiment_confidence': [0.8] * 4}
+    )
+    assert sentiment['num_views'] == 1
+    assert sentiment['posterior_returns'][2] > sentiment['posterior_returns'][3]
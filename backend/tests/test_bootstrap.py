@@ -0,0 +1,53 @@
+"""
+Tests for bootstrap confidence intervals of backtest metrics
+"""
+import numpy as np
+from backtesting import compute_metrics_batch, run_backtest
+from bootstrap import bootstrap_indices, bootstrap_metrics, paired_bootstrap_test
+
+
+def test_indices_follow_blocks():
+    """Test block indices run in consecutive (circular) steps within each block"""
+    rng = np.random.default_rng(0)
+    block = bootstrap_indices(50, 20, method='block', block_size=5, rng=rng)
+    assert block.shape == (20, 50)
+    within = np.diff(block.reshape(20, 10, 5), axis=2) % 50
+    assert np.all(within == 1)
+
+    stationary = bootstrap_indices(400, 200, method='stationary', block_size=8, rng=rng)
+    assert stationary.min() >= 0 and stationary.max() < 400
+    # Mean block length is close to block_size
+    breaks = np.mean((np.diff(stationary, axis=1) % 400) != 1)
+    assert abs(1 / breaks - 8) < 1.0
+
+
+def test_intervals_cover_point_estimates():
+    """Test every backtest field gets an interval around run_backtest, reproducible by seed"""
+    rng = np.random.default_rng(1)
+    returns = rng.normal(0.0005, 0.01, 500)
+    chunked = bootstrap_metrics(returns, n_resamples=600, chunk_size=250, seed=3)
+    assert chunked == bootstrap_metrics(returns, n_resamples=600, chunk_size=250, seed=3)
+    point = vars(run_backtest(list(returns)))
+    assert set(chunked) == set(point)
+    for field, interval in chunked.items():
+        assert abs(interval['estimate'] - point[field]) < 1e-12
+        assert interval['lower'] <= interval['upper']
+        assert interval['std'] >= 0
+    assert chunked['volatility']['lower'] < point['volatility'] < chunked['volatility']['upper']
+
+
+def test_paired_test_detects_dominant_strategy():
+    """Test a strategy with a clear edge is significantly better, and itself is not"""
+    rng = np.random.default_rng(2)
+    base = rng.normal(0.0002, 0.01, 1000)
+    better = base + 0.002
+    result = paired_bootstrap_test(better, base, n_resamples=1000, seed=0)
+    point = compute_metrics_batch(np.vstack([better, base]))['sharpe_ratio']
+    assert abs(result['difference'] - (point[0] - point[1])) < 1e-12
+    assert result['lower'] > 0
+    assert result['p_value'] < 0.01
+    assert result['probability_a_better'] == 1.0
+
+    same = paired_bootstrap_test(base, base, metric='max_drawdown', n_resamples=200, seed=0)
+    assert same['difference'] == 0.0
+    assert same['p_value'] == 1.0
@@ -0,0 +1,64 @@
+"""
+Tests for cardinality-constrained optimization
+"""
+import itertools
+import numpy as np
+from cardinality import solve_cardinality_mvo
+from portfolio_optimizer import BehavioralPortfolioOptimizer
+from qp_solver import solve_prospect_mvo
+
+
+def _objective(x, returns, cov, loss_aversion):
+    p = x @ returns
+    return -(p if p >= 0 else loss_aversion * p) + 0.5 * x @ cov @ x
+
+
+def test_branch_and_bound_matches_enumeration():
+    """Test the search finds the enumerated optimum over all supports"""
+    rng = np.random.default_rng(3)
+    n = 9
+    loadings = rng.normal(0, 0.15, size=(n, 3))
+    cov = loadings @ loadings.T + np.diag(rng.uniform(0.01, 0.06, n))
+    returns = rng.normal(0.08, 0.05, n)
+    min_weight, max_weight, k_min, k_max = 0.05, 0.4, 3, 4
+
+    best = np.inf
+    for k in range(k_min, k_max + 1):
+        for support in itertools.combinations(range(n), k):
+            lower, upper = np.zeros(n), np.zeros(n)
+            lower[list(support)] = min_weight
+            upper[list(support)] = max_weight
+            if lower.sum() <= 1 <= upper.sum():
+                x = solve_prospect_mvo(returns, cov, 2.25, lower, upper).x
+                best = min(best, _objective(x, returns, cov, 2.25))
+
+    result = solve_cardinality_mvo(returns, cov, 2.25, min_weight, max_weight, k_min, k_max)
+    held = result.x > 1e-8
+    assert result.optimal
+    assert np.isclose(result.objective, best, atol=1e-9)
+    assert k_min <= held.sum() <= k_max
+    assert np.all(result.x[held] >= min_weight - 1e-9)
+
+
+def test_optimizer_caps_holdings_on_large_universe():
+    """Test max_positions on a large universe returns a feasible portfolio in budget"""
+    rng = np.random.default_rng(0)
+    n = 300
+    loadings = rng.normal(0, 0.15, size=(n, 5))
+    cov = loadings @ loadings.T + np.diag(rng.uniform(0.01, 0.06, n))
+    expected_returns = rng.normal(0.08, 0.05, n)
+    constraints = {
+        'min_weight': 0.01, 'max_weight': 0.1,
+        'min_positions': 30, 'max_positions': 40, 'time_budget': 0.5
+    }
+
+    result = BehavioralPortfolioOptimizer({}).optimize_portfolio(
+        expected_returns, cov, constraints, solver='qp'
+    )
+    weights = result['weights']
+    held = weights > 1e-8
+    assert 30 <= held.sum() <= 40
+    assert np.all(weights[held] >= 0.01 - 1e-9) and np.all(weights <= 0.1 + 1e-9)
+    assert np.isclose(weights.sum(), 1.0)
+    assert result['cardinality']['positions'] == held.sum()
+    assert result['cardinality']['gap'] >= 0
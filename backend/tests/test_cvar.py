@@ -0,0 +1,46 @@
+"""
+Tests for CVaR optimization
+"""
+import numpy as np
+from scipy.optimize import linprog
+from cvar import scenario_cvar, solve_min_cvar
+
+
+def _full_lp(returns, alpha, lower, upper, mu, return_weight):
+    """Dense Rockafellar-Uryasev LP over every scenario and asset"""
+    s, n = returns.shape
+    cost = np.concatenate([-return_weight * mu, [1.0], np.full(s, 1 / ((1 - alpha) * s))])
+    a_ub = np.hstack([-returns, -np.ones((s, 1)), -np.eye(s)])
+    a_eq = np.concatenate([np.ones(n), np.zeros(1 + s)])[None, :]
+    bounds = [(lower, upper)] * n + [(None, None)] + [(0, None)] * s
+    solution = linprog(cost, A_ub=a_ub, b_ub=np.zeros(s), A_eq=a_eq, b_eq=[1], bounds=bounds, method='highs')
+    return solution.fun
+
+
+def test_generated_lp_matches_full_lp():
+    """Test row/column generation reaches the full LP optimum"""
+    rng = np.random.default_rng(4)
+    for n_scenarios, n_assets, alpha, lower, upper, return_weight in [
+        (600, 40, 0.95, 0.0, 0.2, 0.0),
+        (500, 60, 0.9, 0.002, 0.1, 0.5),
+        (333, 15, 0.97, 0.01, 0.3, 1.0)
+    ]:
+        loadings = rng.normal(0, 0.05, size=(n_assets, 3))
+        cov = loadings @ loadings.T + np.diag(rng.uniform(0.01, 0.05, n_assets))
+        mu = rng.normal(0.08, 0.03, n_assets)
+        returns = rng.multivariate_normal(mu, cov, size=n_scenarios)
+
+        result = solve_min_cvar(returns, alpha, lower, upper, mu, return_weight)
+        value = result.cvar - return_weight * mu @ result.weights
+        assert result.converged
+        assert np.isclose(value, _full_lp(returns, alpha, lower, upper, mu, return_weight), atol=1e-9)
+        assert np.isclose(result.weights.sum(), 1.0)
+        assert np.all(result.weights >= lower - 1e-9) and np.all(result.weights <= upper + 1e-9)
+
+
+def test_scenario_cvar_tail_mean():
+    """Test CVaR is the mean of the worst losses when the tail is whole"""
+    losses = np.arange(100, dtype=float)
+    var, cvar = scenario_cvar(losses, alpha=0.95)
+    assert var == 95.0
+    assert np.isclose(cvar, np.mean(losses[95:]))
@@ -0,0 +1,81 @@
+"""
+Tests for lot matching
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from lot_matching import match_lots
+
+
+def _history(n_trades, seed):
+    """Random trades over a few symbols, with same-day trades and sells beyond the position"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'symbol': rng.choice(['AAPL', 'MSFT', 'GOOGL'], n_trades),
+        'action': rng.choice(['BUY', 'SELL'], n_trades),
+        'quantity': rng.integers(1, 20, n_trades).astype(float),
+        'price': rng.uniform(50, 150, n_trades),
+        'trade_date': pd.Timestamp('2023-01-02') + pd.to_timedelta(np.sort(rng.integers(0, n_trades, n_trades)), unit='D')
+    })
+
+
+def _queue_fifo(trades):
+    """Per-trade FIFO queues"""
+    queues, lots = {}, []
+    for i, trade in enumerate(trades.itertuples()):
+        queue = queues.setdefault(trade.symbol, [])
+        if trade.action == 'BUY':
+            queue.append([i, trade.quantity])
+            continue
+        remaining = trade.quantity
+        while remaining > 0 and queue:
+            take = min(remaining, queue[0][1])
+            lots.append((queue[0][0], i, take))
+            queue[0][1] -= take
+            remaining -= take
+            if queue[0][1] == 0:
+                queue.pop(0)
+    return lots
+
+
+@pytest.mark.parametrize('n_trades, seed', [(25, 0), (500, 1), (3000, 2)])
+def test_fifo_matches_queues(n_trades, seed):
+    """Test the searchsorted FIFO matching reproduces per-trade queues"""
+    trades = _history(n_trades, seed)
+    lots = match_lots(trades, 'fifo')
+    expected = _queue_fifo(trades)
+    assert len(lots) == len(expected)
+    buy_rows = np.array([b for b, _, _ in expected])
+    np.testing.assert_array_equal(lots.sell_index, [s for _, s, _ in expected])
+    np.testing.assert_allclose(lots.quantity, [q for _, _, q in expected])
+    np.testing.assert_allclose(lots.open_price, trades['price'].to_numpy()[buy_rows])
+    np.testing.assert_array_equal(lots.open_date, trades['trade_date'].to_numpy()[buy_rows])
+    assert lots.n_sells == (trades['action'] == 'SELL').sum()
+
+
+def test_lifo_and_average_cost():
+    """Test LIFO closes the newest lot and average cost closes at the running average"""
+    trades = pd.DataFrame({
+        'symbol': ['AAPL'] * 4,
+        'action': ['BUY', 'BUY', 'SELL', 'SELL'],
+        'quantity': [10.0, 10.0, 15.0, 10.0],
+        'price': [100.0, 120.0, 130.0, 90.0],
+        'trade_date': pd.to_datetime(['2024-01-01', '2024-01-11', '2024-01-21', '2024-02-01'])
+    })
+    fifo = match_lots(trades, 'fifo')
+    assert fifo.open_price.tolist() == [100.0, 120.0, 120.0]
+    assert fifo.quantity.tolist() == [10.0, 5.0, 5.0]
+    assert fifo.holding_days.tolist() == [20, 10, 21]
+
+    lifo = match_lots(trades, 'lifo')
+    assert lifo.open_price.tolist() == [120.0, 100.0, 100.0]
+    assert lifo.quantity.tolist() == [10.0, 5.0, 5.0]
+    assert lifo.pnl.tolist() == [100.0, 150.0, -50.0]
+
+    average = match_lots(trades, 'average')
+    assert average.open_price.tolist() == [110.0, 110.0]
+    assert average.quantity.tolist() == [15.0, 5.0]  # the second sell is 5 beyond the position
+    assert average.holding_days.tolist() == [20, 31]
+
+    with pytest.raises(ValueError):
+        match_lots(trades, 'hifo')
@@ -0,0 +1,52 @@
+"""
+Tests for the optimization result cache
+"""
+import numpy as np
+from optimization_cache import OptimizationCache, optimization_fingerprint
+from risk_model import FactorCovariance
+
+
+def test_fingerprint_is_stable_and_input_sensitive():
+    """Test identical inputs hash equal and any input change alters the key"""
+    profile = {'loss_aversion_coefficient': 2.25, 'risk_tolerance': 0.5}
+    er = np.array([0.08, 0.1])
+    cov = np.eye(2) * 0.04
+    constraints = {'min_weight': 0.0, 'max_weight': 1.0}
+    key = optimization_fingerprint(profile, er, cov, constraints, 'behavioral_mvo')
+
+    assert key == optimization_fingerprint(dict(reversed(list(profile.items()))), er.copy(), cov.copy(),
+                                           dict(constraints), 'behavioral_mvo')
+    assert key != optimization_fingerprint({**profile, 'loss_aversion_coefficient': 3.0},
+                                           er, cov, constraints, 'behavioral_mvo')
+    assert key != optimization_fingerprint(profile, er, cov * 1.01, constraints, 'behavioral_mvo')
+    assert key != optimization_fingerprint(profile, er, cov, constraints, 'risk_parity')
+    assert key != optimization_fingerprint(profile, er, cov, constraints, 'behavioral_mvo', solver='qp')
+
+    factor = FactorCovariance(np.ones((2, 1)) * 0.1, np.eye(1), np.full(2, 0.03))
+    assert key != optimization_fingerprint(profile, er, factor, constraints, 'behavioral_mvo')
+
+
+def test_lru_ttl_and_tag_invalidation(monkeypatch):
+    """Test LRU eviction, TTL expiry and per-user invalidation"""
+    now = [1000.0]
+    monkeypatch.setattr('optimization_cache.time.time', lambda: now[0])
+    cache = OptimizationCache(max_entries=2, ttl_seconds=10)
+
+    cache.set('a', 1, tag='user-1')
+    cache.set('b', 2, tag='user-2')
+    assert cache.get('a') == 1  # 'b' is now least recently used
+    cache.set('c', 3, tag='user-1')
+    assert cache.get('b') is None
+    assert cache.stats()['evictions'] == 1
+
+    assert cache.invalidate_tag('user-1') == 2
+    assert cache.get('a') is None and cache.get('c') is None
+
+    cache.set('d', 4)
+    now[0] += 11
+    assert cache.get('d') is None
+
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 4
+    assert stats['entries'] == 0
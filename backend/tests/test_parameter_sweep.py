@@ -0,0 +1,134 @@
+"""
+Tests for parameter sweeps
+"""
+import os
+
+import numpy as np
+import pytest
+from backtesting import backtest_portfolios, weight_schedule
+from parameter_sweep import expand_grid, parameter_sweep
+from portfolio_optimizer import BehavioralPortfolioOptimizer
+
+CONSTRAINTS = {'min_weight': 0.0, 'max_weight': 0.3, 'min_positions': 0}
+GRID = {
+    'loss_aversion_coefficient': [1.5, 2.25, 3],
+    'overconfidence_score': [0.2, 0.8],
+    'max_weight': [0.25, 0.5]
+}
+
+
+def _inputs(periods=400, assets=6):
+    returns = np.random.default_rng(0).normal(0.0004, 0.01, (periods, assets))
+    history = returns[:200]
+    return history.mean(axis=0) * 252, np.cov(history.T) * 252, returns[200:]
+
+
+def test_cells_match_direct_calls_and_pool_matches_serial():
+    """Test each row equals optimize_portfolio + backtest_portfolios, deduplicated and pooled"""
+    er, cov, future = _inputs()
+    grid = {**GRID, 'loss_aversion_coefficient': [1.5, 2.25, 3, 3.0]}
+    serial = parameter_sweep(grid, er, cov, future, constraints=CONSTRAINTS, max_workers=0, chunk_size=3)
+    assert len(serial.results) == len(expand_grid(grid)) == 16
+    assert serial.unique_cells == serial.solved_cells == 12
+
+    row = serial.results.iloc[5]
+    profile = {'loss_aversion_coefficient': row['loss_aversion_coefficient'],
+               'overconfidence_score': row['overconfidence_score']}
+    direct = BehavioralPortfolioOptimizer(profile).optimize_portfolio(
+        er, cov, {**CONSTRAINTS, 'max_weight': row['max_weight']}
+    )
+    weights = row[[f'weight_asset_{i}' for i in range(6)]].to_numpy(dtype=float)
+    np.testing.assert_allclose(weights, direct['weights'], atol=1e-6)
+    book = backtest_portfolios(future, weight_schedule(weights, future, 21))
+    assert np.isclose(row['backtest_sharpe_ratio'], book.metrics['sharpe_ratio'][0])
+
+    # The duplicated loss-aversion value repeats the rows of 3
+    duplicate = serial.results[serial.results['loss_aversion_coefficient'] == 3]
+    assert len(duplicate) == 8
+    assert duplicate['cell_key'].nunique() == 4
+
+    progress = []
+    pooled = parameter_sweep(grid, er, cov, future, constraints=CONSTRAINTS, max_workers=2, chunk_size=3,
+                             progress=lambda done, total: progress.append((done, total)))
+    assert progress[-1] == (12, 12)
+    np.testing.assert_allclose(pooled.results['backtest_total_return'], serial.results['backtest_total_return'],
+                               rtol=1e-8)
+
+
+def test_infeasible_cells_fail_without_stopping_the_sweep():
+    """Test a cell whose bounds cannot hold the budget is marked failed"""
+    er, cov, future = _inputs()
+    sweep = parameter_sweep({'max_weight': [0.1, 0.4]}, er, cov, future, constraints=CONSTRAINTS, max_workers=0)
+    failed, solved = sweep.results.iloc[0], sweep.results.iloc[1]
+    assert failed['status'] == 'failed' and np.isnan(failed['backtest_sharpe_ratio'])
+    assert solved['status'] == 'optimal' and np.isfinite(solved['backtest_sharpe_ratio'])
+
+
+def test_failed_solver_status_stays_in_cash(monkeypatch):
+    """Test a cell whose optimizer returns weights with status failed is not traded"""
+    er, cov, future = _inputs()
+    optimize = BehavioralPortfolioOptimizer.optimize_portfolio
+
+    def fail_tight_caps(self, *args, constraints=None, **kwargs):
+        result = optimize(self, *args, constraints=constraints, **kwargs)
+        if constraints['max_weight'] < 0.3:
+            result['telemetry'] = {**result['telemetry'], 'status': 'failed', 'message': 'did not converge'}
+        return result
+
+    monkeypatch.setattr(BehavioralPortfolioOptimizer, 'optimize_portfolio', fail_tight_caps)
+    sweep = parameter_sweep({'max_weight': [0.25, 0.5]}, er, cov, future, constraints=CONSTRAINTS, max_workers=0)
+    failed, solved = sweep.results.iloc[0], sweep.results.iloc[1]
+    weight_columns = [f'weight_asset_{i}' for i in range(6)]
+    assert failed['status'] == 'failed' and failed['message'] == 'did not converge'
+    assert failed[weight_columns].isna().all() and np.isnan(failed['turnover'])
+    assert solved['status'] == 'optimal' and solved[weight_columns].notna().all()
+
+def test_method_grid_includes_risk_parity():
+    """Test methods that report no expected return get it from their weights"""
+    er, cov, future = _inputs()
+    sweep = parameter_sweep({'method': ['behavioral_mvo', 'risk_parity']}, er, cov, future,
+                            constraints=CONSTRAINTS, max_workers=0)
+    risk_parity = sweep.results.iloc[1]
+    weights = risk_parity[[f'weight_asset_{i}' for i in range(6)]].to_numpy(dtype=float)
+    assert np.isclose(risk_parity['expected_return'], weights @ er)
+    assert np.isclose(risk_parity['sharpe_ratio'],
+                      risk_parity['expected_return'] / risk_parity['expected_volatility'])
+    assert sweep.results['backtest_sharpe_ratio'].notna().all()
+
+
+def test_output_parts_resume(tmp_path):
+    """Test finished chunks are read back on rerun and other sweeps are rejected"""
+    pytest.importorskip('pyarrow')
+    er, cov, future = _inputs()
+    path = str(tmp_path / 'sweep')
+    full = parameter_sweep(GRID, er, cov, future, constraints=CONSTRAINTS, max_workers=0, chunk_size=4,
+                           output_path=path)
+    parts = sorted(name for name in os.listdir(path) if name.startswith('part-'))
+    assert len(parts) == 3
+    os.remove(os.path.join(path, parts[1]))
+
+    resumed = parameter_sweep(GRID, er, cov, future, constraints=CONSTRAINTS, max_workers=0, chunk_size=4,
+                              output_path=path)
+    assert resumed.solved_cells == 4
+    np.testing.assert_allclose(resumed.results['backtest_sharpe_ratio'], full.results['backtest_sharpe_ratio'])
+    assert len([name for name in os.listdir(path) if name.startswith('part-')]) == 3
+
+    with pytest.raises(ValueError):
+        parameter_sweep(GRID, er * 2, cov, future, constraints=CONSTRAINTS, max_workers=0, output_path=path)
+
+
+def test_resume_when_a_chunk_starts_with_a_failed_cell(tmp_path):
+    """Test a part whose first cell failed keeps the optimizer columns of the others"""
+    pytest.importorskip('pyarrow')
+    er, cov, future = _inputs(assets=5)
+    path = str(tmp_path / 'sweep')
+    grid = {'max_weight': [0.1, 0.3, 0.4]}
+    first = parameter_sweep(grid, er, cov, future, constraints=CONSTRAINTS, method='cvar', max_workers=0,
+                            chunk_size=3, output_path=path)
+    resumed = parameter_sweep(grid, er, cov, future, constraints=CONSTRAINTS, method='cvar', max_workers=0,
+                              chunk_size=3, output_path=path)
+    assert first.results['status'].iloc[0] == 'failed'
+    assert resumed.solved_cells == 0
+    for column in ('expected_return', 'sharpe_ratio', 'solve_time', 'backtest_sharpe_ratio'):
+        np.testing.assert_allclose(resumed.results[column], first.results[column])
+        assert resumed.results[column].iloc[1:].notna().all()
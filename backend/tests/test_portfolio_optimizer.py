@@ -41,3 +41,154 @@ def test_risk_parity():
     
     assert 'weights' in result
     assert len(result['weights']) == 3
+
+
+def test_behavioral_mvo_qp_solver_matches_slsqp():
+    """Test the analytic-gradient QP path against the SLSQP path"""
+    optimizer = BehavioralPortfolioOptimizer({'loss_aversion_coefficient': 2.25})
+
+    rng = np.random.default_rng(0)
+    loadings = rng.normal(0, 0.1, size=(20, 3))
+    cov_matrix = loadings @ loadings.T + np.eye(20) * 0.02
+    expected_returns = rng.normal(0.08, 0.04, 20)
+    constraints = {'min_weight': 0.0, 'max_weight': 0.3, 'min_positions': 1}
+
+    slsqp = optimizer.optimize_portfolio(expected_returns, cov_matrix, constraints)
+    qp = optimizer.optimize_portfolio(expected_returns, cov_matrix, constraints, solver='qp')
+    constraints['min_positions'] = 8
+    qp_diversified = optimizer.optimize_portfolio(
+        expected_returns, cov_matrix, constraints, solver='qp'
+    )
+
+    adjusted_returns = optimizer._apply_behavioral_adjustments_to_returns(
+        expected_returns, expected_returns.mean()
+    )
+    adjusted_cov = optimizer._adjust_risk_perception(cov_matrix)
+
+    def objective(w):
+        p = w @ adjusted_returns
+        return -(p if p >= 0 else 2.25 * p) + 0.5 * w @ adjusted_cov @ w
+
+    assert np.isclose(np.sum(qp['weights']), 1.0)
+    assert np.all(qp['weights'] <= 0.3 + 1e-9)
+    assert objective(qp['weights']) <= objective(slsqp['weights']) + 1e-6
+    assert np.sum(qp_diversified['weights'] >= 0.01) >= 8
+
+
+def test_prospect_qp_kink_branch():
+    """Test that the solver lands on the kink when neither branch is valid"""
+    from qp_solver import solve_prospect_mvo
+
+    # Gains alone favor the loser (low variance); loss aversion flips it
+    returns = np.array([-0.01, 0.004])
+    cov_matrix = np.diag([0.0001, 0.5])
+    result = solve_prospect_mvo(returns, cov_matrix, 50.0, lower=0.0, upper=1.0)
+
+    assert result.branch == 'kink'
+    assert abs(result.x @ returns) < 1e-8
+    assert np.isclose(result.x.sum(), 1.0)
+
+
+def test_optimize_portfolio_batch_matches_single_solves():
+    """Test batched profiles against independent per-profile solves"""
+    from portfolio_optimizer import optimize_portfolio_batch
+
+    rng = np.random.default_rng(1)
+    loadings = rng.normal(0, 0.1, size=(15, 3))
+    cov_matrix = loadings @ loadings.T + np.eye(15) * 0.02
+    expected_returns = rng.normal(0.08, 0.04, 15)
+    constraints = {'min_weight': 0.0, 'max_weight': 0.3, 'min_positions': 5}
+    profiles = [
+        {'loss_aversion_coefficient': la, 'overconfidence_score': 0.5}
+        for la in (1.0, 1.5, 2.25, 3.0, 4.5)
+    ]
+
+    batch = optimize_portfolio_batch(profiles, expected_returns, cov_matrix, constraints)
+
+    assert batch['weights'].shape == (5, 15)
+    assert np.all(batch['converged'])
+    for i, profile in enumerate(profiles):
+        single = BehavioralPortfolioOptimizer(profile).optimize_portfolio(
+            expected_returns, cov_matrix, constraints, solver='qp'
+        )
+        assert np.allclose(batch['weights'][i], single['weights'], atol=1e-6)
+
+
+def test_risk_parity_equal_contributions_and_bounds():
+    """Test ERC engine: equal contributions unbounded, bounds honored, warm start"""
+    rng = np.random.default_rng(2)
+    loadings = rng.normal(0, 0.1, size=(30, 4))
+    cov_matrix = loadings @ loadings.T + np.diag(rng.uniform(0.005, 0.2, 30))
+    expected_returns = np.zeros(30)
+    optimizer = BehavioralPortfolioOptimizer({})
+
+    free = optimizer.optimize_portfolio(
+        expected_returns, cov_matrix, {'min_weight': 0.0, 'max_weight': 1.0}, method='risk_parity'
+    )
+    assert free['converged']
+    assert np.allclose(free['risk_contributions'], 1 / 30, atol=1e-8)
+    assert np.isclose(free['weights'].sum(), 1.0)
+
+    bounded = optimizer.optimize_portfolio(
+        expected_returns, cov_matrix, {'min_weight': 0.025, 'max_weight': 0.04}, method='risk_parity'
+    )
+    assert bounded['converged']
+    assert np.isclose(bounded['weights'].sum(), 1.0)
+    assert np.all(bounded['weights'] >= 0.025 - 1e-9)
+    assert np.all(bounded['weights'] <= 0.04 + 1e-9)
+
+    from risk_parity import solve_equal_risk_contribution
+    warm = solve_equal_risk_contribution(cov_matrix, x0=free['weights'])
+    assert warm.iterations <= 2
+    assert np.allclose(warm.weights, free['weights'], atol=1e-8)
+
+
+def test_hrp():
+    """Test HRP: inverse-variance on a diagonal covariance, bounds, factor input"""
+    from risk_model import FactorCovariance
+
+    variances = np.array([0.01, 0.04, 0.02, 0.09, 0.03])
+    optimizer = BehavioralPortfolioOptimizer({'loss_aversion_coefficient': 3.0})
+    result = optimizer.optimize_portfolio(
+        np.full(5, 0.08), np.diag(variances), {'min_weight': 0.0, 'max_weight': 1.0}, method='hrp'
+    )
+    inverse_variance = (1 / variances) / np.sum(1 / variances)
+    assert result['method'] == 'hrp'
+    assert np.allclose(result['weights'], inverse_variance)
+
+    rng = np.random.default_rng(3)
+    factor_cov = FactorCovariance(
+        rng.normal(0, 0.15, size=(40, 3)), np.eye(3), rng.uniform(0.01, 0.06, 40)
+    )
+    constraints = {'min_weight': 0.01, 'max_weight': 0.05}
+    expected_returns = rng.normal(0.08, 0.04, 40)
+    dense = optimizer.optimize_portfolio(
+        expected_returns, factor_cov.to_dense(), constraints, method='hrp'
+    )
+    factor = optimizer.optimize_portfolio(expected_returns, factor_cov, constraints, method='hrp')
+    assert np.allclose(dense['weights'], factor['weights'])
+    assert np.isclose(dense['weights'].sum(), 1.0)
+    assert np.all(dense['weights'] >= 0.01 - 1e-9)
+    assert np.all(dense['weights'] <= 0.05 + 1e-9)
+
+
+def test_cvar_method():
+    """Test CVaR optimization: bounds, reproducible scenarios, tail focus with loss aversion"""
+    rng = np.random.default_rng(8)
+    loadings = rng.normal(0, 0.1, size=(12, 2))
+    cov = loadings @ loadings.T + np.diag(rng.uniform(0.01, 0.08, 12))
+    expected_returns = np.sqrt(np.diag(cov)) * 0.5 + 0.02
+    constraints = {'min_weight': 0.01, 'max_weight': 0.3, 'cvar_scenarios': 2000}
+
+    calm = BehavioralPortfolioOptimizer({'loss_aversion_coefficient': 1.0})
+    averse = BehavioralPortfolioOptimizer({'loss_aversion_coefficient': 10.0})
+    first = calm.optimize_portfolio(expected_returns, cov, constraints, method='cvar')
+    again = calm.optimize_portfolio(expected_returns, cov, constraints, method='cvar')
+    tail = averse.optimize_portfolio(expected_returns, cov, constraints, method='cvar')
+
+    assert first['method'] == 'cvar'
+    assert np.allclose(first['weights'], again['weights'])
+    assert np.isclose(first['weights'].sum(), 1.0)
+    assert np.all(first['weights'] >= 0.01 - 1e-9) and np.all(first['weights'] <= 0.3 + 1e-9)
+    assert tail['cvar'] <= first['cvar'] + 1e-12
+    assert tail['expected_return'] <= first['expected_return'] + 1e-12
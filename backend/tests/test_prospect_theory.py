@@ -0,0 +1,51 @@
+"""
+Tests for the vectorized prospect-theory kernel
+"""
+import numpy as np
+from prospect_theory import probability_weighting, prospect_adjusted_returns
+
+
+def _loop_adjustments(expected_returns, reference_point, loss_aversion):
+    adjusted = np.zeros_like(expected_returns)
+    for i, ret in enumerate(expected_returns):
+        if ret >= reference_point:
+            adjusted[i] = (ret - reference_point) ** 0.88
+        else:
+            adjusted[i] = -loss_aversion * (-(ret - reference_point)) ** 0.88
+    return adjusted + reference_point
+
+
+def test_cohort_matches_per_investor_loop():
+    """Test one cohort call equals the scalar value function row by row"""
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0.07, 0.05, 40)
+    loss_aversion = rng.uniform(1.0, 4.0, 25)
+    reference = returns.mean()
+
+    cohort = prospect_adjusted_returns(returns, loss_aversion, reference)
+    assert cohort.shape == (25, 40)
+    for row, lam in zip(cohort, loss_aversion):
+        np.testing.assert_allclose(row, _loop_adjustments(returns, reference, lam), rtol=1e-14, atol=1e-16)
+    np.testing.assert_array_equal(
+        prospect_adjusted_returns(returns, 2.25), prospect_adjusted_returns(returns, [2.25], reference)[0]
+    )
+
+    # Per-investor returns and reference points
+    per_investor = rng.normal(0.07, 0.05, (3, 40))
+    rows = prospect_adjusted_returns(per_investor, loss_aversion[:3])
+    for row, r, lam in zip(rows, per_investor, loss_aversion[:3]):
+        np.testing.assert_allclose(row, _loop_adjustments(r, r.mean(), lam), rtol=1e-14, atol=1e-16)
+
+
+def test_probability_weighting():
+    """Test inverse-S decision weights and their effect on values"""
+    p = np.array([0.0, 0.01, 0.5, 0.99, 1.0])
+    w = probability_weighting(p, 0.61)
+    assert w[0] == 0.0 and np.isclose(w[-1], 1.0)
+    assert w[1] > p[1] and w[3] < p[3]  # overweight rare, underweight likely outcomes
+    assert np.all(np.diff(w) > 0)
+
+    returns = np.array([0.1, -0.1])
+    certain = prospect_adjusted_returns(returns, 2.0, 0.0)
+    weighted = prospect_adjusted_returns(returns, 2.0, 0.0, probabilities=np.array([0.5, 0.5]))
+    np.testing.assert_allclose(weighted, certain * probability_weighting(0.5, np.array([0.61, 0.69])))
@@ -0,0 +1,68 @@
+"""
+Tests for transaction-cost-aware rebalancing
+"""
+import numpy as np
+from rebalancing import current_weights_from_positions, solve_rebalance, trade_list
+from portfolio_optimizer import BehavioralPortfolioOptimizer
+from qp_solver import solve_prospect_mvo
+
+
+def _problem(n=10, seed=2):
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(0, 0.1, size=(n, 2))
+    cov = loadings @ loadings.T + np.diag(rng.uniform(0.01, 0.05, n))
+    return rng.normal(0.05, 0.05, n), cov, rng.dirichlet(np.ones(n))
+
+
+def test_zero_cost_matches_prospect_solve():
+    """Test free trading reproduces the plain behavioral optimum"""
+    returns, cov, current = _problem()
+    result = solve_rebalance(returns, cov, 2.25, current, 0.0, 0.4, linear_cost=0.0)
+    plain = solve_prospect_mvo(returns, cov, 2.25, np.zeros(10), np.full(10, 0.4))
+    assert np.allclose(result.x, plain.x, atol=1e-8)
+
+
+def test_costs_reduce_turnover_and_band_skips_small_trades():
+    """Test higher costs trade less and no trade falls inside the band"""
+    returns, cov, current = _problem()
+    turnover = [
+        solve_rebalance(returns, cov, 2.25, current, 0.0, 0.4, linear_cost=cost).turnover
+        for cost in (0.0, 0.005, 0.02, 0.1)
+    ]
+    assert all(a >= b - 1e-9 for a, b in zip(turnover, turnover[1:]))
+    assert turnover[-1] < turnover[0]
+
+    banded = solve_rebalance(returns, cov, 2.25, current, 0.0, 0.4, no_trade_band=0.03)
+    trades = np.abs(banded.x - current)
+    assert np.isclose(banded.x.sum(), 1.0)
+    assert np.all((trades <= 1e-9) | (trades > 0.03))
+    assert banded.free_assets < 10
+
+
+def test_positions_to_trades():
+    """Test current weights from Position rows and the resulting trade list"""
+    positions = [
+        {'symbol': 'aapl', 'quantity': 10, 'current_value': 1500.0, 'weight': 0.5},
+        {'symbol': 'MSFT', 'quantity': 5, 'current_value': 1500.0, 'weight': 0.5},
+        {'symbol': 'TSLA', 'quantity': 1, 'current_value': 1000.0, 'weight': 0.2}
+    ]
+    current = current_weights_from_positions(positions, ['AAPL', 'MSFT', 'GOOGL'])
+    assert np.allclose(current, [0.5, 0.5, 0.0])
+
+    trades = trade_list(['AAPL', 'MSFT', 'GOOGL'], current, np.array([0.5, 0.2, 0.3]), 3000.0, {'MSFT': 300.0})
+    assert [t['symbol'] for t in trades] == ['MSFT', 'GOOGL']
+    assert trades[0]['side'] == 'sell' and np.isclose(trades[0]['quantity'], -3.0)
+    assert trades[1]['side'] == 'buy' and np.isclose(trades[1]['value'], 900.0)
+
+
+def test_optimizer_rebalance_mode():
+    """Test the optimizer reports turnover and cost when rebalancing"""
+    returns, cov, current = _problem()
+    optimizer = BehavioralPortfolioOptimizer({'loss_aversion_coefficient': 2.25})
+    result = optimizer.optimize_portfolio(
+        returns, cov, {'min_weight': 0.0, 'max_weight': 0.4},
+        current_weights=current, transaction_costs={'linear_cost': 0.01}
+    )
+    assert result['method'] == 'behavioral_mvo'
+    assert np.isclose(result['rebalance']['turnover'], np.abs(result['weights'] - current).sum())
+    assert result['rebalance']['transaction_cost'] > 0
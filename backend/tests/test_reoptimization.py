@@ -0,0 +1,51 @@
+"""
+Tests for warm-started incremental re-optimization
+"""
+import numpy as np
+from portfolio_optimizer import BehavioralPortfolioOptimizer
+from qp_solver import solve_prospect_mvo
+from reoptimization import ReoptimizationStore
+
+
+def _problem(n=40, seed=4):
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(0, 0.15, size=(n, 4))
+    cov = loadings @ loadings.T + np.diag(rng.uniform(0.01, 0.06, n))
+    return rng.normal(0.08, 0.05, n), cov
+
+
+def test_warm_start_matches_cold_solve():
+    """Test the active-set warm step reproduces the cold QP optimum"""
+    expected_returns, cov = _problem()
+    first = solve_prospect_mvo(expected_returns, cov, 2.25, 0.0, 0.3, min_positions=3)
+
+    rng = np.random.default_rng(5)
+    moved = expected_returns * (1 + 0.05 * rng.standard_normal(len(expected_returns)))
+    cold = solve_prospect_mvo(moved, cov, 2.25, 0.0, 0.3, min_positions=3)
+    warm = solve_prospect_mvo(moved, cov, 2.25, 0.0, 0.3, min_positions=3, x0=first.x)
+
+    assert warm.iterations == 0
+    assert np.allclose(warm.x, cold.x, atol=1e-6)
+
+
+def test_store_plans_reuse_warm_and_cold():
+    """Test reuse below tolerance, warm start above it or on profile change"""
+    expected_returns, cov = _problem()
+    profile = {'loss_aversion_coefficient': 2.25}
+    constraints = {'min_weight': 0.0, 'max_weight': 0.3, 'min_positions': 3}
+    result = BehavioralPortfolioOptimizer(profile).optimize_portfolio(
+        expected_returns, cov, constraints, solver='qp'
+    )
+    store = ReoptimizationStore(tolerance=1e-4)
+    args = (constraints, 'behavioral_mvo', 'qp')
+
+    assert store.plan('p1', profile, expected_returns, cov, *args)[0] == 'cold'
+    store.record('p1', profile, expected_returns, cov, *args, result)
+
+    mode, state = store.plan('p1', profile, expected_returns * (1 + 1e-6), cov, *args)
+    assert mode == 'reuse' and state.result is result
+    np.testing.assert_allclose(state.risk, cov @ result['weights'])
+    assert store.plan('p1', profile, expected_returns * 1.01, cov, *args)[0] == 'warm'
+    assert store.plan('p1', profile, expected_returns, cov * 1.01, *args)[0] == 'warm'
+    assert store.plan('p1', {'loss_aversion_coefficient': 3.0}, expected_returns, cov, *args)[0] == 'warm'
+    assert store.plan('p2', profile, expected_returns, cov, *args)[0] == 'cold'
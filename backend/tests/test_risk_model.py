@@ -0,0 +1,112 @@
+"""
+Tests for covariance estimation
+"""
+import numpy as np
+import pandas as pd
+from risk_model import IncrementalCovariance, RiskModel
+
+
+class FakeCollector:
+    """DataCollector stand-in serving a fixed price history"""
+
+    def __init__(self, prices: pd.DataFrame):
+        self.prices = prices
+
+    def get_market_data(self, symbol, period="1mo", interval="1d"):
+        return [
+            {"time": t.isoformat(), "close": float(p)}
+            for t, p in self.prices[symbol].items()
+        ]
+
+
+def make_prices(n_days: int, symbols, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0005, 0.01, size=(n_days, len(symbols)))
+    index = pd.date_range("2024-01-01", periods=n_days, freq="D", tz="UTC")
+    return pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), index=index, columns=symbols)
+
+
+def test_incremental_update_matches_refit():
+    """Test rank-1 window updates against a full recomputation"""
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0, 0.01, size=(300, 6))
+
+    for estimator in ("sample", "ledoit_wolf"):
+        rolling = IncrementalCovariance(6, window=120, estimator=estimator).fit(returns[:150])
+        for row in returns[150:]:
+            rolling.update(row)
+        refit = IncrementalCovariance(6, window=120, estimator=estimator).fit(returns[-120:])
+        assert np.allclose(rolling.covariance(), refit.covariance(), atol=1e-14)
+
+    sample = IncrementalCovariance(6, window=120, estimator="sample").fit(returns)
+    assert np.allclose(sample.covariance(), np.cov(returns[-120:].T))
+
+
+def test_risk_model_caches_and_updates_incrementally():
+    """Test that repeated calls reuse the estimate and new bars update it"""
+    symbols = ["AAA", "BBB", "CCC"]
+    prices = make_prices(200, symbols)
+    collector = FakeCollector(prices.iloc[:-1])
+    model = RiskModel(collector)
+
+    first = model.estimate(symbols, window=100, estimator="sample")
+    assert model.estimate(symbols, window=100, estimator="sample") is first
+
+    collector.prices = prices
+    updated = model.estimate(symbols, window=100, estimator="sample")
+    expected = prices.pct_change().iloc[1:].iloc[-100:]
+    assert updated is not first
+    assert np.allclose(updated.cov_matrix, np.cov(expected.to_numpy().T) * 252)
+    assert np.allclose(updated.expected_returns, expected.mean().to_numpy() * 252)
+
+
+def test_factor_covariance_matches_dense():
+    """Test factor-form covariance operations and optimization against dense"""
+    from portfolio_optimizer import BehavioralPortfolioOptimizer
+    from risk_model import FactorCovariance, fit_factor_model
+
+    rng = np.random.default_rng(2)
+    factor_cov = FactorCovariance(
+        rng.normal(0, 0.1, size=(25, 3)), np.diag([1.0, 0.5, 0.2]), rng.uniform(0.01, 0.03, 25)
+    )
+    dense = factor_cov.to_dense()
+    w = rng.dirichlet(np.ones(25))
+    block = rng.normal(size=(4, 25))
+
+    assert np.allclose(factor_cov @ w, dense @ w)
+    assert np.allclose(block @ factor_cov, block @ dense)
+    assert np.allclose(factor_cov.diagonal(), np.diag(dense))
+
+    optimizer = BehavioralPortfolioOptimizer({'loss_aversion_coefficient': 2.25})
+    expected_returns = rng.normal(0.08, 0.04, 25)
+    constraints = {'min_weight': 0.0, 'max_weight': 0.3, 'min_positions': 3}
+    for method in ('behavioral_mvo', 'black_litterman', 'risk_parity'):
+        from_dense = optimizer.optimize_portfolio(expected_returns, dense, constraints, method=method)
+        from_factor = optimizer.optimize_portfolio(expected_returns, factor_cov, constraints, method=method)
+        assert np.allclose(from_dense['weights'], from_factor['weights'], atol=1e-6)
+
+    fitted = fit_factor_model(rng.normal(0, 0.01, size=(200, 25)), n_factors=5)
+    assert fitted.loadings.shape == (25, 5)
+    assert np.all(fitted.diagonal() > 0)
+
+
+def test_concurrent_estimates_fold_new_bars_once():
+    """Test that concurrent calls for one universe do not double-count new bars"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    symbols = ["AAA", "BBB", "CCC"]
+    prices = make_prices(300, symbols, seed=1)
+    collector = FakeCollector(prices.iloc[:-50])
+    model = RiskModel(collector)
+    model.estimate(symbols, window=100, estimator="sample")
+
+    collector.prices = prices
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        estimates = list(pool.map(
+            lambda _: model.estimate(symbols, window=100, estimator="sample"), range(16)
+        ))
+
+    expected = prices.pct_change().iloc[1:].iloc[-100:]
+    for estimate in estimates:
+        assert np.allclose(estimate.expected_returns, expected.mean().to_numpy() * 252)
+        assert np.allclose(estimate.cov_matrix, np.cov(expected.to_numpy().T) * 252)
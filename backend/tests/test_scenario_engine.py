@@ -0,0 +1,53 @@
+"""
+Tests for the Monte Carlo scenario engine
+"""
+import numpy as np
+import pytest
+from scipy.stats import norm
+from scenario_engine import simulate_portfolio_scenarios
+from portfolio_optimizer import calculate_portfolio_metrics
+
+
+WEIGHTS = np.array([0.5, 0.5])
+RETURNS = np.array([0.08, 0.10])
+COV = np.array([[0.04, 0.01], [0.01, 0.09]])
+
+
+def test_seeded_results_reproducible_and_chunk_invariant():
+    """Test the same seed gives the same metrics whatever the chunk size"""
+    first = simulate_portfolio_scenarios(WEIGHTS, RETURNS, COV, n_paths=3000, horizon=60, seed=7, chunk_size=512)
+    second = simulate_portfolio_scenarios(WEIGHTS, RETURNS, COV, n_paths=3000, horizon=60, seed=7, chunk_size=3000)
+    quantiles = first.pop('max_drawdown_quantiles')
+    assert quantiles == second.pop('max_drawdown_quantiles')
+    assert first == pytest.approx(second, rel=1e-12)
+
+
+def test_single_period_var_matches_gaussian():
+    """Test one-period VaR/CVaR approach the closed-form normal values"""
+    result = simulate_portfolio_scenarios(
+        WEIGHTS, RETURNS, COV, n_paths=200000, horizon=1, periods_per_year=1, seed=1
+    )
+    mean = WEIGHTS @ RETURNS
+    std = np.sqrt(WEIGHTS @ COV @ WEIGHTS)
+    z = norm.ppf(0.95)
+    assert abs(result['var'] - (std * z - mean)) < 0.005
+    assert abs(result['cvar'] - (std * norm.pdf(z) / 0.05 - mean)) < 0.005
+    assert result['cvar'] >= result['var']
+
+
+def test_bootstrap_mode_uses_history():
+    """Test bootstrapped paths never lose when history has no losses"""
+    history = np.abs(np.random.default_rng(0).normal(0.001, 0.01, size=(250, 2)))
+    result = simulate_portfolio_scenarios(WEIGHTS, historical_returns=history, n_paths=500, horizon=20, seed=3)
+    assert result['expected_max_drawdown'] == 0.0
+    assert result['probability_of_loss'] == 0.0
+
+
+def test_portfolio_metrics_use_simulated_risk():
+    """Test calculate_portfolio_metrics reports simulated drawdown and tail risk"""
+    metrics = calculate_portfolio_metrics(WEIGHTS, RETURNS, COV, n_paths=2000)
+    quantiles = metrics['max_drawdown_quantiles']
+    assert 0 < metrics['max_drawdown'] < 1
+    assert quantiles['0.05'] <= quantiles['0.5'] <= quantiles['0.95']
+    assert metrics['cvar_95'] >= metrics['var_95']
+    assert metrics == calculate_portfolio_metrics(WEIGHTS, RETURNS, COV, n_paths=2000)
@@ -0,0 +1,72 @@
+"""
+Tests for the compute executor
+"""
+import asyncio
+import time
+
+import pytest
+from task_executor import ComputeExecutor, ExecutorBusyError, JobTimeoutError
+
+
+def test_run_returns_result():
+    """Test that jobs run off the loop and return their result"""
+    executor = ComputeExecutor(max_workers=0)
+    assert asyncio.run(executor.run(sum, [1, 2, 3])) == 6
+
+
+def test_queue_full_raises_busy():
+    """Test that submissions beyond workers + queue fail fast"""
+    executor = ComputeExecutor(max_workers=0, max_queue=1)
+
+    async def submit_three():
+        jobs = [asyncio.ensure_future(executor.run(time.sleep, 0.2)) for _ in range(3)]
+        return await asyncio.gather(*jobs, return_exceptions=True)
+
+    results = asyncio.run(submit_three())
+    assert sum(isinstance(r, ExecutorBusyError) for r in results) == 1
+    assert executor.in_flight == 0
+
+
+def test_job_timeout():
+    """Test per-job timeout"""
+    executor = ComputeExecutor(max_workers=0, job_timeout=0.05)
+    with pytest.raises(JobTimeoutError):
+        asyncio.run(executor.run(time.sleep, 0.5))
+
+
+def test_timed_out_job_keeps_its_slot():
+    """Test that a timed-out job counts against the cap until it finishes"""
+    executor = ComputeExecutor(max_workers=0, max_queue=0, job_timeout=0.05)
+
+    async def time_out_then_submit():
+        with pytest.raises(JobTimeoutError):
+            await executor.run(time.sleep, 0.3)
+        assert executor.in_flight == 1
+        with pytest.raises(ExecutorBusyError):
+            await executor.run(sum, [1])
+        await asyncio.sleep(0.4)
+        assert executor.in_flight == 0
+        return await executor.run(sum, [1, 2])
+
+    assert asyncio.run(time_out_then_submit()) == 3
+
+
+def test_process_pool_optimization():
+    """Test an optimization job on a real process pool"""
+    import numpy as np
+    from compute_tasks import optimize_task
+
+    executor = ComputeExecutor(max_workers=1)
+    try:
+        result = asyncio.run(executor.run(
+            optimize_task,
+            {'loss_aversion_coefficient': 2.25},
+            np.array([0.08, 0.10, 0.09]),
+            np.eye(3) * 0.04,
+            {'min_weight': 0.01, 'max_weight': 0.6, 'min_positions': 3},
+            'behavioral_mvo'
+        ))
+    finally:
+        executor.shutdown()
+
+    assert np.isclose(result['weights'].sum(), 1.0)
@@ -0,0 +1,64 @@
+"""
+Tests for solver telemetry
+"""
+import numpy as np
+from portfolio_optimizer import BehavioralPortfolioOptimizer, optimize_portfolio_batch
+from telemetry import TIME_BUCKETS, SolverTelemetry, TelemetryRegistry
+
+
+def _market(n=6):
+    rng = np.random.default_rng(3)
+    a = rng.normal(0, 0.1, (n, n))
+    return rng.uniform(0.02, 0.12, n), a @ a.T / n + np.eye(n) * 0.01
+
+
+def test_optimizer_results_carry_telemetry():
+    """Test every method reports phases, iterations and a feasible status"""
+    er, cov = _market()
+    optimizer = BehavioralPortfolioOptimizer({'loss_aversion_coefficient': 2.25})
+    constraints = {'min_weight': 0.0, 'max_weight': 0.5, 'min_positions': 0}
+    for method, solver in [('behavioral_mvo', 'slsqp'), ('behavioral_mvo', 'qp'),
+                           ('black_litterman', 'qp'), ('risk_parity', 'slsqp'), ('cvar', 'slsqp')]:
+        telemetry = optimizer.optimize_portfolio(er, cov, constraints, method=method, solver=solver)['telemetry']
+        assert telemetry['method'] == method and telemetry['status'] == 'optimal'
+        assert telemetry['iterations'] > 0
+        assert 'solve' in telemetry['phases'] and 'metrics' in telemetry['phases']
+        assert telemetry['total_time'] >= sum(telemetry['phases'].values()) - 1e-9
+        assert telemetry['constraint_violation'] < 1e-6
+
+    batch = optimize_portfolio_batch([{'loss_aversion_coefficient': 1.5}] * 3, er, cov, constraints)
+    assert batch['telemetry']['solver'] == 'batch' and batch['telemetry']['iterations'] > 0
+
+
+def test_scipy_status_mapping():
+    """Test the SLSQP iteration limit is not_converged and other exits failed"""
+    class Result:
+        def __init__(self, success, status):
+            self.nit, self.nfev, self.success, self.status, self.message = 5, 12, success, status, 'msg'
+
+    telemetry = SolverTelemetry('behavioral_mvo', 'slsqp')
+    telemetry.solved_scipy(Result(False, 9))
+    assert telemetry.status == 'not_converged' and telemetry.function_evaluations == 12
+    telemetry.solved_scipy(Result(False, 8))
+    assert telemetry.status == 'failed'
+    telemetry.solved(3, converged=False)
+    assert telemetry.status == 'failed' and telemetry.iterations == 13
+
+
+def test_registry_histograms():
+    """Test per-method counts, bucketed times and phase totals"""
+    registry = TelemetryRegistry()
+    for seconds, status in [(0.002, 'optimal'), (0.2, 'optimal'), (100.0, 'failed')]:
+        telemetry = SolverTelemetry('hrp', 'slsqp', phases={'solve': seconds}, status=status,
+                                    iterations=50, total_time=seconds)
+        registry.record(telemetry.to_dict())
+
+    stats = registry.snapshot()['methods']['hrp']
+    assert stats['calls'] == 3
+    assert stats['status'] == {'optimal': 2, 'failed': 1}
+    assert stats['time_histogram'][1] == 1 and stats['time_histogram'][5] == 1
+    assert stats['time_histogram'][len(TIME_BUCKETS)] == 1
+    assert stats['iteration_histogram'][2] == 3
+    assert stats['phase_time']['solve'] == 100.202
+    registry.clear()
+    assert registry.snapshot()['methods'] == {}
@@ -0,0 +1,60 @@
+"""
+Tests for walk-forward backtesting
+"""
+import json
+import numpy as np
+import pytest
+from portfolio_optimizer import BehavioralPortfolioOptimizer
+from risk_model import IncrementalCovariance
+from walk_forward import walk_forward
+
+PROFILE = {'loss_aversion_coefficient': 2.0}
+CONSTRAINTS = {'min_weight': 0.0, 'max_weight': 0.3, 'min_positions': 0}
+
+
+def _returns(periods=200, assets=6):
+    return np.random.default_rng(0).normal(0.0004, 0.01, (periods, assets))
+
+
+def test_windows_are_out_of_sample_and_pool_matches_serial():
+    """Test each window uses only prior data and the shared-memory pool reproduces it"""
+    returns = _returns()
+    serial = walk_forward(returns, PROFILE, lookback=60, step=20, constraints=CONSTRAINTS, max_workers=0)
+    assert list(serial.rebalance_index) == list(range(60, 200, 20))
+    assert len(serial.returns) == 140
+
+    model = IncrementalCovariance(6, window=60).fit(returns[80:140])
+    direct = BehavioralPortfolioOptimizer(PROFILE).optimize_portfolio(
+        model.mean * 252, model.covariance() * 252, CONSTRAINTS, solver='qp'
+    )
+    np.testing.assert_allclose(serial.weights[4], direct['weights'], atol=1e-6)
+    # Holding-period return of the first window, before the second rebalance
+    first = serial.weights[0] @ np.cumprod(1 + returns[60:80], axis=0)[-1] * (1 - 0.001)
+    assert np.isclose(np.prod(1 + serial.returns[:20]), first)
+
+    pooled = walk_forward(returns, PROFILE, lookback=60, step=20, constraints=CONSTRAINTS,
+                          max_workers=2, windows_per_task=2)
+    np.testing.assert_allclose(pooled.weights, serial.weights, atol=1e-8)
+
+
+def test_checkpoint_resume(tmp_path):
+    """Test an interrupted run resumes from its checkpoint and rejects other configurations"""
+    returns = _returns()
+    path = str(tmp_path / 'walk_forward.json')
+    full = walk_forward(returns, PROFILE, lookback=60, step=20, constraints=CONSTRAINTS,
+                        max_workers=0, checkpoint_path=path)
+
+    with open(path) as f:
+        state = json.load(f)
+    state['weights'] = {k: w for k, w in state['weights'].items() if int(k) < 3}
+    with open(path, 'w') as f:
+        json.dump(state, f)
+
+    resumed = walk_forward(returns, PROFILE, lookback=60, step=20, constraints=CONSTRAINTS,
+                           max_workers=0, checkpoint_path=path)
+    assert resumed.resumed_windows == 3
+    np.testing.assert_allclose(resumed.returns, full.returns, rtol=1e-10)
+
+    with pytest.raises(ValueError):
+        walk_forward(returns, PROFILE, lookback=60, step=10, constraints=CONSTRAINTS,
+                     max_workers=0, checkpoint_path=path)
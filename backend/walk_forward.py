@@ -0,0 +1,231 @@
+"""
+Walk-forward backtesting
+Rolling-window, out-of-sample evaluation of BehavioralPortfolioOptimizer:
+estimate on each window, hold for the next step, repeat. Windows are solved
+on a process pool that reads the returns matrix from shared memory.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import multiprocessing
+import os
+
+import numpy as np
+
+from backtesting import BacktestResult, backtest_portfolios, run_backtest
+from portfolio_optimizer import BehavioralPortfolioOptimizer
+from risk_model import IncrementalCovariance
+
+
+@dataclass
+class WalkForwardResult:
+    rebalance_index: np.ndarray  # (W,) period at which each window's weights start trading
+    weights: np.ndarray  # (W, N)
+    returns: np.ndarray  # out-of-sample portfolio returns after costs, periods lookback..T-1
+    turnover: np.ndarray  # (W,) weight traded at each rebalance
+    backtest: BacktestResult  # run_backtest of the out-of-sample returns
+    resumed_windows: int  # windows taken from the checkpoint
+
+
+def walk_forward(
+    returns: np.ndarray,
+    user_profile: Dict,
+    lookback: int = 252,
+    step: int = 21,
+    method: str = 'behavioral_mvo',
+    solver: str = 'qp',
+    constraints: Optional[Dict] = None,
+    estimator: str = 'ledoit_wolf',
+    periods_per_year: int = 252,
+    transaction_cost: float = 0.001,
+    risk_free_rate: float = 0.02,
+    max_workers: Optional[int] = None,
+    windows_per_task: Optional[int] = None,
+    checkpoint_path: Optional[str] = None
+) -> WalkForwardResult:
+    """
+    Out-of-sample walk-forward test of optimize_portfolio
+
+    Window k estimates expected returns and covariance from
+    returns[t - lookback:t] (t = lookback + k * step), optimizes, and the
+    weights trade at the start of period t and drift until the next
+    window's weights replace them (see backtesting.backtest_portfolios).
+
+    Consecutive windows are grouped into tasks; a task fits the estimator
+    once and rolls it forward with rank-1 updates, warm-starting each
+    optimization from the previous window's weights. Tasks run on a
+    spawn-context process pool whose workers map the returns matrix from
+    shared memory, so only window indices are pickled. With
+    max_workers=0 tasks run in this process.
+
+    With a checkpoint_path, completed windows are saved after every task
+    and a rerun of the same configuration skips them.
+
+    Args:
+        returns: T x N per-period asset returns
+        user_profile: Behavioral profile for BehavioralPortfolioOptimizer
+        lookback: Estimation window length in periods
+        step: Periods each window's weights are held
+        windows_per_task: Windows per pool task (defaults to an even
+            split over four tasks per worker)
+        checkpoint_path: JSON file of completed windows
+
+    Raises:
+        ValueError: if there is no out-of-sample period, or the checkpoint
+            belongs to a different configuration
+    """
+    returns = np.ascontiguousarray(returns, dtype=float)
+    n_periods, n_assets = returns.shape
+    starts = np.arange(lookback, n_periods, step)
+    if starts.size == 0:
+        raise ValueError("Not enough periods for one out-of-sample window")
+    config = {
+        'user_profile': user_profile, 'lookback': lookback, 'step': step, 'method': method,
+        'solver': solver, 'constraints': constraints, 'estimator': estimator,
+        'periods_per_year': periods_per_year
+    }
+    fingerprint = _fingerprint(returns, config)
+
+    done = _load_checkpoint(checkpoint_path, fingerprint) if checkpoint_path else {}
+    resumed = len(done)
+    pending = [k for k in range(len(starts)) if k not in done]
+
+    workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+    size = windows_per_task or max(1, -(-len(pending) // max(4 * workers, 1)))
+    tasks = _contiguous_tasks(pending, size)
+
+    def finished(solved: Dict[int, np.ndarray]) -> None:
+        done.update(solved)
+        if checkpoint_path:
+            _save_checkpoint(checkpoint_path, fingerprint, done)
+
+    if workers == 0 or len(tasks) <= 1:
+        for task in tasks:
+            finished(_solve_windows(returns, starts, task, config))
+    elif tasks:
+        shared = shared_memory.SharedMemory(create=True, size=returns.nbytes)
+        try:
+            np.ndarray(returns.shape, dtype=returns.dtype, buffer=shared.buf)[:] = returns
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_attach_shared,
+                initargs=(shared.name, returns.shape, returns.dtype.str)
+            ) as pool:
+                futures = [pool.submit(_solve_shared_windows, starts, task, config) for task in tasks]
+                for future in as_completed(futures):
+                    finished(future.result())
+        finally:
+            shared.close()
+            shared.unlink()
+
+    # Stitch the windows in order into one schedule and hold between rebalances
+    weights = np.vstack([done[k] for k in range(len(starts))])
+    schedule = np.full((n_periods - lookback, n_assets), np.nan)
+    schedule[starts - lookback] = weights
+    book = backtest_portfolios(
+        returns[lookback:], schedule, transaction_cost=transaction_cost,
+        risk_free_rate=risk_free_rate, periods_per_year=periods_per_year
+    )
+    out_of_sample = book.returns[0]
+    return WalkForwardResult(
+        rebalance_index=starts,
+        weights=weights,
+        returns=out_of_sample,
+        turnover=book.turnover[0, starts - lookback],
+        backtest=run_backtest(list(out_of_sample), risk_free_rate),
+        resumed_windows=resumed
+    )
+
+
+def _contiguous_tasks(pending: List[int], size: int) -> List[List[int]]:
+    """Split window indices into runs of consecutive windows of at most size"""
+    tasks: List[List[int]] = []
+    for k in pending:
+        if tasks and tasks[-1][-1] == k - 1 and len(tasks[-1]) < size:
+            tasks[-1].append(k)
+        else:
+            tasks.append([k])
+    return tasks
+
+
+def _solve_windows(
+    returns: np.ndarray,
+    starts: np.ndarray,
+    windows: List[int],
+    config: Dict
+) -> Dict[int, np.ndarray]:
+    """Optimize consecutive windows, rolling the estimator and warm-starting"""
+    lookback, estimator = config['lookback'], config['estimator']
+    optimizer = BehavioralPortfolioOptimizer(config['user_profile'])
+    model, position, weights = None, None, None
+    solved = {}
+    for k in windows:
+        start = starts[k]
+        if model is None or estimator == 'ewma':
+            # EWMA has no window to roll, so each window is fitted afresh
+            model = IncrementalCovariance(returns.shape[1], window=lookback, estimator=estimator)
+            model.fit(returns[start - lookback:start])
+        else:
+            for row in returns[position:start]:
+                model.update(row)
+        position = start
+
+        result = optimizer.optimize_portfolio(
+            model.mean * config['periods_per_year'],
+            model.covariance() * config['periods_per_year'],
+            constraints=config['constraints'],
+            method=config['method'],
+            solver=config['solver'],
+            initial_weights=weights
+        )
+        weights = np.asarray(result['weights'], dtype=float)
+        solved[k] = weights
+    return solved
+
+
+# Worker-side view of the shared returns matrix (set by _attach_shared)
+_shared: Optional[Tuple[shared_memory.SharedMemory, np.ndarray]] = None
+
+
+def _attach_shared(name: str, shape: Tuple[int, int], dtype: str) -> None:
+    global _shared
+    block = shared_memory.SharedMemory(name=name)
+    _shared = (block, np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf))
+
+
+def _solve_shared_windows(starts, windows, config):
+    return _solve_windows(_shared[1], starts, windows, config)
+
+
+def _fingerprint(returns: np.ndarray, config: Dict) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(json.dumps(config, sort_keys=True, default=str).encode())
+    digest.update(str(returns.shape).encode())
+    digest.update(returns.tobytes())
+    return digest.hexdigest()
+
+
+def _load_checkpoint(path: str, fingerprint: str) -> Dict[int, np.ndarray]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        state = json.load(f)
+    if state['fingerprint'] != fingerprint:
+        raise ValueError(f"Checkpoint {path} belongs to a different walk-forward configuration")
+    return {int(k): np.asarray(w, dtype=float) for k, w in state['weights'].items()}
+
+
+def _save_checkpoint(path: str, fingerprint: str, done: Dict[int, np.ndarray]) -> None:
+    """Write to a temporary file and rename, so an interrupted write keeps the old checkpoint"""
+    state = {
+        'fingerprint': fingerprint,
+        'weights': {str(k): w.tolist() for k, w in sorted(done.items())}
+    }
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp, path)